@@ -0,0 +1,636 @@
+'''
+Class representing the checkerboard as bit masks over the dark squares.
+'''
+
+from piece import Piece
+from turn import Turn
+from geometry import geometry_for_size
+
+
+class BitBoard:
+    '''
+        Class -- BitBoard
+            Encodes the pieces on the dark squares of a board as bit masks.
+            Bit i stands for the i-th dark square counted row by row, so an
+            8 x 8 board fits in 32-bit masks. Moves of a whole side are
+            generated at once by shifting masks.
+        Attributes:
+            size -- Number of squares on each row
+            black -- Mask of black pieces
+            red -- Mask of red pieces
+            kings -- Mask of king pieces of either color
+            full -- Mask with one bit set for every dark square
+            bits -- bits[row][col] is the bit of a dark square, 0 for a
+            light one
+            shifts -- Per direction: (even row mask, even row shift,
+            odd row mask, odd row shift)
+            neighbors -- Per direction: list of neighbor index per square,
+            -1 when out of bounds
+            step_moves -- Per direction: the step Move of Geometry from
+            each square, None when out of bounds
+            jump_moves -- Per direction: the capture Move of Geometry from
+            each square, None when out of bounds
+            crown_rows -- Per color: mask of the row where its men are
+            crowned
+        Methods:
+            location_to_index -- Map a location to its bit index
+            index_to_location -- Map a bit index to its location
+            clear -- Empty a square
+            put -- Place a piece on a square
+            load -- Rebuild all masks from a nested list of squares
+            men -- Mask of men of a color
+            count -- Number of pieces of a color
+            count_kings -- Number of kings of a color
+            step -- Shift a mask one square in a direction
+            movers -- Masks of pieces allowed to go in each direction
+            jumps -- All capturing moves of a side as index triples
+            steps -- All non-capturing moves of a side as index pairs
+            has_moves -- Whether a side has any move, using masks only
+            movable -- Mask of the pieces of a side having a move
+            find_moves -- Moves of one piece, as GameState would find them
+            turns -- Every legal turn of a side, as Turn objects
+            children -- Masks of every position one legal turn away
+            count_turns -- Number of legal turns of a side
+            play_hop -- Masks after one step or capture
+            extend_jumps -- Follow a capture chain on masks
+            extend_turn -- Follow a capture chain, collecting its Moves
+    '''
+    DIRECTIONS = [(-1, -1), (-1, 1), (1, -1), (1, 1)]
+
+    def __init__(self, size=8):
+        '''
+            Constructor -- Creates an empty BitBoard
+            Parameters:
+                self -- The current BitBoard object
+                size -- Number of squares on each row, an even number
+        '''
+        self.size = size
+        self.black = 0
+        self.red = 0
+        self.kings = 0
+        half = size // 2
+        self.full = (1 << (size * half)) - 1
+        self.bits = [[1 << self.location_to_index((row, col))
+                      if (row + col) % 2 == 1 else 0
+                      for col in range(size)] for row in range(size)]
+
+        self.shifts = {}
+        self.neighbors = {}
+        self.step_moves = {}
+        self.jump_moves = {}
+        targets = geometry_for_size(size).targets
+        for direction in BitBoard.DIRECTIONS:
+            even_mask = 0
+            odd_mask = 0
+            neighbors = []
+            step_moves = []
+            jump_moves = []
+            for index in range(size * half):
+                row, col = self.index_to_location(index)
+                target = targets[row][col][direction]
+                if target is not None:
+                    neighbors.append(self.location_to_index(target[0]))
+                    step_moves.append(target[1])
+                    jump_moves.append(target[3])
+                    if row % 2 == 0:
+                        even_mask |= 1 << index
+                    else:
+                        odd_mask |= 1 << index
+                else:
+                    neighbors.append(-1)
+                    step_moves.append(None)
+                    jump_moves.append(None)
+            # Columns shift by one bit between rows of opposite parity
+            row_shift = direction[0] * half
+            if direction[1] < 0:
+                shift = (row_shift, row_shift - 1)
+            else:
+                shift = (row_shift + 1, row_shift)
+            self.shifts[direction] = (even_mask, shift[0], odd_mask, shift[1])
+            self.neighbors[direction] = neighbors
+            self.step_moves[direction] = step_moves
+            self.jump_moves[direction] = jump_moves
+
+        first_row = (1 << half) - 1
+        self.crown_rows = {Piece.BLACK: first_row << (half * (size - 1)),
+                           Piece.RED: first_row}
+
+    def location_to_index(self, location):
+        '''
+            Method -- location_to_index
+                Map a dark square location to its bit index
+            Parameters:
+                self -- The current BitBoard object
+                location -- A pair of indices (row, col)
+            Return:
+                Bit index of the square
+        '''
+        return location[0] * (self.size // 2) + location[1] // 2
+
+    def index_to_location(self, index):
+        '''
+            Method -- index_to_location
+                Map a bit index back to its dark square location
+            Parameters:
+                self -- The current BitBoard object
+                index -- Bit index of the square
+            Return:
+                A pair of indices (row, col)
+        '''
+        half = self.size // 2
+        row = index // half
+        return (row, 2 * (index % half) + (1 - row % 2))
+
+    def clear(self, location):
+        '''
+            Method -- clear
+                Remove whatever is on a square
+            Parameters:
+                self -- The current BitBoard object
+                location -- Location of the square
+        '''
+        mask = ~(1 << self.location_to_index(location))
+        self.black &= mask
+        self.red &= mask
+        self.kings &= mask
+
+    def put(self, location, color, is_king):
+        '''
+            Method -- put
+                Place a piece on a square
+            Parameters:
+                self -- The current BitBoard object
+                location -- Location of the square
+                color -- Color of the piece
+                is_king -- Whether the piece is a king
+        '''
+        bit = 1 << self.location_to_index(location)
+        if color == Piece.BLACK:
+            self.black |= bit
+        else:
+            self.red |= bit
+        if is_king:
+            self.kings |= bit
+
+    def load(self, squares):
+        '''
+            Method -- load
+                Rebuild all masks from a nested list of squares
+            Parameters:
+                self -- The current BitBoard object
+                squares -- Nested list of None or Piece objects
+        '''
+        self.black = 0
+        self.red = 0
+        self.kings = 0
+        for row in squares:
+            for square in row:
+                if square is not None:
+                    self.put(square.location, square.color, square.is_king)
+
+    def men(self, color):
+        '''
+            Method -- men
+                Mask of the men, not kings, of a color
+            Parameters:
+                self -- The current BitBoard object
+                color -- Color of the pieces
+        '''
+        if color == Piece.BLACK:
+            return self.black & ~self.kings
+        return self.red & ~self.kings
+
+    def count(self, color):
+        '''
+            Method -- count
+                Number of pieces of a color
+            Parameters:
+                self -- The current BitBoard object
+                color -- Color of the pieces
+        '''
+        if color == Piece.BLACK:
+            return bin(self.black).count("1")
+        return bin(self.red).count("1")
+
+    def count_kings(self, color):
+        '''
+            Method -- count_kings
+                Number of kings of a color
+            Parameters:
+                self -- The current BitBoard object
+                color -- Color of the pieces
+        '''
+        if color == Piece.BLACK:
+            return bin(self.black & self.kings).count("1")
+        return bin(self.red & self.kings).count("1")
+
+    def step(self, mask, direction):
+        '''
+            Method -- step
+                Move every bit of a mask one square in a direction.
+                Bits that would leave the board are dropped.
+            Parameters:
+                self -- The current BitBoard object
+                mask -- Mask of squares to move
+                direction -- Diagonal direction, a pair of offsets
+            Return:
+                Mask of the squares reached
+        '''
+        even_mask, even_shift, odd_mask, odd_shift = self.shifts[direction]
+        even = mask & even_mask
+        odd = mask & odd_mask
+        if even_shift >= 0:
+            even <<= even_shift
+        else:
+            even >>= -even_shift
+        if odd_shift >= 0:
+            odd <<= odd_shift
+        else:
+            odd >>= -odd_shift
+        return even | odd
+
+    def movers(self, color):
+        '''
+            Method -- movers
+                Masks of pieces of a color allowed to go in each direction
+            Parameters:
+                self -- The current BitBoard object
+                color -- Color of the pieces
+            Return:
+                A list of (direction, mask) pairs
+        '''
+        if color == Piece.BLACK:
+            own = self.black
+            forward = Piece.BLACK_MOVES
+        else:
+            own = self.red
+            forward = Piece.RED_MOVES
+        kings = own & self.kings
+        result = []
+        for direction in BitBoard.DIRECTIONS:
+            if direction in forward:
+                result.append((direction, own))
+            elif kings:
+                result.append((direction, kings))
+        return result
+
+    def jumps(self, color):
+        '''
+            Method -- jumps
+                Find all capturing moves of a side
+            Parameters:
+                self -- The current BitBoard object
+                color -- Color of the side to move
+            Return:
+                A list of (start, end, captured) bit index triples
+        '''
+        if color == Piece.BLACK:
+            enemy = self.red
+        else:
+            enemy = self.black
+        empty = self.full & ~(self.black | self.red)
+        result = []
+        for direction, mask in self.movers(color):
+            landings = self.step(self.step(mask, direction) & enemy,
+                                 direction) & empty
+            back = self.neighbors[(-direction[0], -direction[1])]
+            while landings:
+                low = landings & -landings
+                landings ^= low
+                end = low.bit_length() - 1
+                captured = back[end]
+                result.append((back[captured], end, captured))
+        return result
+
+    def steps(self, color):
+        '''
+            Method -- steps
+                Find all non-capturing moves of a side
+            Parameters:
+                self -- The current BitBoard object
+                color -- Color of the side to move
+            Return:
+                A list of (start, end) bit index pairs
+        '''
+        empty = self.full & ~(self.black | self.red)
+        result = []
+        for direction, mask in self.movers(color):
+            targets = self.step(mask, direction) & empty
+            back = self.neighbors[(-direction[0], -direction[1])]
+            while targets:
+                low = targets & -targets
+                targets ^= low
+                end = low.bit_length() - 1
+                result.append((back[end], end))
+        return result
+
+    def has_moves(self, color):
+        '''
+            Method -- has_moves
+                Whether a side has any move at all, using masks only
+            Parameters:
+                self -- The current BitBoard object
+                color -- Color of the side to move
+        '''
+        if color == Piece.BLACK:
+            enemy = self.red
+        else:
+            enemy = self.black
+        empty = self.full & ~(self.black | self.red)
+        for direction, mask in self.movers(color):
+            reached = self.step(mask, direction)
+            if reached & empty:
+                return True
+            if self.step(reached & enemy, direction) & empty:
+                return True
+        return False
+
+    def movable(self, color):
+        '''
+            Method -- movable
+                Find the pieces of a side able to step or capture, by
+                shifting the empty squares back towards them
+            Parameters:
+                self -- The current BitBoard object
+                color -- Color of the pieces
+            Return:
+                Mask of the pieces having at least one move
+        '''
+        if color == Piece.BLACK:
+            enemy = self.red
+        else:
+            enemy = self.black
+        empty = self.full & ~(self.black | self.red)
+        result = 0
+        for direction, mask in self.movers(color):
+            backward = (-direction[0], -direction[1])
+            # Squares whose next square is empty, or an enemy piece
+            # with an empty square behind it
+            before_empty = self.step(empty, backward)
+            before_jump = self.step(before_empty & enemy, backward)
+            result |= mask & (before_empty | before_jump)
+        return result
+
+    def find_moves(self, location):
+        '''
+            Method -- find_moves
+                Find the moves of the piece at a location, in the same order
+                as GameState.find_possible_moves: captures first.
+            Parameters:
+                self -- The current BitBoard object
+                location -- Location of the piece
+            Return:
+                A list of the shared Move objects of Geometry
+        '''
+        start = self.location_to_index(location)
+        bit = 1 << start
+        if self.black & bit:
+            enemy = self.red
+            directions = Piece.BLACK_MOVES
+        else:
+            enemy = self.black
+            directions = Piece.RED_MOVES
+        if self.kings & bit:
+            directions = Piece.KING_MOVES
+        occupied = self.black | self.red
+
+        moves = []
+        for direction in directions:
+            neighbors = self.neighbors[direction]
+            end = neighbors[start]
+            if end < 0:
+                continue
+            if not occupied & (1 << end):
+                moves.append(self.step_moves[direction][start])
+            elif enemy & (1 << end):
+                landing = neighbors[end]
+                if landing >= 0 and not occupied & (1 << landing):
+                    moves.insert(0, self.jump_moves[direction][start])
+        return moves
+
+    def children(self, color):
+        '''
+            Method -- children
+                Find the position after every legal turn of a side, with
+                the same rules as GameState.find_all_turns: captures are
+                mandatory, chains go on to the end, and a man crowned
+                during a chain keeps capturing as a king.
+            Parameters:
+                self -- The current BitBoard object
+                color -- Color of the side to move
+            Return:
+                A list of (black, red, kings) mask triples
+        '''
+        masks = (self.black, self.red, self.kings)
+        result = []
+        jumps = self.jumps(color)
+        if len(jumps) == 0:
+            for start, end in self.steps(color):
+                result.append(self.play_hop(masks, color, start, end, -1))
+            return result
+        for start, end, captured in jumps:
+            self.extend_jumps(
+                self.play_hop(masks, color, start, end, captured),
+                color, end, result)
+        return result
+
+    def count_turns(self, color):
+        '''
+            Method -- count_turns
+                Number of legal turns of a side, len(children(color))
+                without building the positions: steps are counted a
+                direction at a time by shifting masks, and only when
+                there is a capture are its chains followed to the end
+            Parameters:
+                self -- The current BitBoard object
+                color -- Color of the side to move
+        '''
+        if color == Piece.BLACK:
+            enemy = self.red
+        else:
+            enemy = self.black
+        empty = self.full & ~(self.black | self.red)
+        count = 0
+        for direction, mask in self.movers(color):
+            reached = self.step(mask, direction)
+            if self.step(reached & enemy, direction) & empty:
+                break
+            count += bin(reached & empty).count("1")
+        else:
+            return count
+
+        # Captures are mandatory, so only their chains count
+        masks = (self.black, self.red, self.kings)
+        result = []
+        for start, end, captured in self.jumps(color):
+            self.extend_jumps(
+                self.play_hop(masks, color, start, end, captured),
+                color, end, result)
+        return len(result)
+
+    def play_hop(self, masks, color, start, end, captured):
+        '''
+            Method -- play_hop
+                Masks after one step or capture, crowning a man that
+                reaches the last row
+            Parameters:
+                self -- The current BitBoard object
+                masks -- A (black, red, kings) mask triple
+                color -- Color of the moving piece
+                start -- Bit index the piece leaves
+                end -- Bit index the piece lands on
+                captured -- Bit index of the captured piece, or -1
+            Return:
+                The new (black, red, kings) mask triple
+        '''
+        black, red, kings = masks
+        start_bit = 1 << start
+        end_bit = 1 << end
+        if kings & start_bit or end_bit & self.crown_rows[color]:
+            kings = (kings & ~start_bit) | end_bit
+        if color == Piece.BLACK:
+            black = (black & ~start_bit) | end_bit
+        else:
+            red = (red & ~start_bit) | end_bit
+        if captured >= 0:
+            keep = ~(1 << captured)
+            black &= keep
+            red &= keep
+            kings &= keep
+        return (black, red, kings)
+
+    def extend_jumps(self, masks, color, square, result):
+        '''
+            Method -- extend_jumps
+                Follow every further capture of the piece on a square,
+                collecting the masks at the end of each chain
+            Parameters:
+                self -- The current BitBoard object
+                masks -- A (black, red, kings) mask triple
+                color -- Color of the moving piece
+                square -- Bit index of the moving piece
+                result -- List collecting the final mask triples
+        '''
+        black, red, kings = masks
+        if color == Piece.BLACK:
+            enemy = red
+            directions = Piece.BLACK_MOVES
+        else:
+            enemy = black
+            directions = Piece.RED_MOVES
+        if kings & (1 << square):
+            directions = Piece.KING_MOVES
+        occupied = black | red
+
+        extended = False
+        for direction in directions:
+            neighbors = self.neighbors[direction]
+            middle = neighbors[square]
+            if middle < 0 or not enemy & (1 << middle):
+                continue
+            landing = neighbors[middle]
+            if landing >= 0 and not occupied & (1 << landing):
+                extended = True
+                self.extend_jumps(
+                    self.play_hop(masks, color, square, landing, middle),
+                    color, landing, result)
+        if not extended:
+            result.append(masks)
+
+    def turns(self, color):
+        '''
+            Method -- turns
+                Find every legal turn of a side with the rules of
+                GameState.find_all_turns, without touching any square:
+                first moves come from shifting masks and capture chains
+                are followed on masks, as children does. The Move objects
+                are the shared ones of Geometry.
+            Parameters:
+                self -- The current BitBoard object
+                color -- Color of the side to move
+            Return:
+                A list of Turn objects, grouped by direction
+        '''
+        if color == Piece.BLACK:
+            enemy = self.red
+        else:
+            enemy = self.black
+        empty = self.full & ~(self.black | self.red)
+        kings = self.kings
+        masks = (self.black, self.red, kings)
+        movers = self.movers(color)
+        result = []
+        for direction, mask in movers:
+            landings = self.step(self.step(mask, direction) & enemy,
+                                 direction) & empty
+            back = self.neighbors[(-direction[0], -direction[1])]
+            jump_moves = self.jump_moves[direction]
+            while landings:
+                low = landings & -landings
+                landings ^= low
+                end = low.bit_length() - 1
+                captured = back[end]
+                start = back[captured]
+                self.extend_turn(
+                    self.play_hop(masks, color, start, end, captured),
+                    color, end, [jump_moves[start]],
+                    kings & (1 << start) != 0, result)
+        if len(result) > 0:
+            return result
+
+        crown_row = self.crown_rows[color]
+        for direction, mask in movers:
+            targets = self.step(mask, direction) & empty
+            back = self.neighbors[(-direction[0], -direction[1])]
+            step_moves = self.step_moves[direction]
+            while targets:
+                low = targets & -targets
+                targets ^= low
+                start = back[low.bit_length() - 1]
+                promotes = low & crown_row != 0 and \
+                    kings & (1 << start) == 0
+                result.append(Turn([step_moves[start]], promotes))
+        return result
+
+    def extend_turn(self, masks, color, square, moves, was_king, result):
+        '''
+            Method -- extend_turn
+                Follow every further capture of the piece on a square,
+                collecting a Turn at the end of each chain
+            Parameters:
+                self -- The current BitBoard object
+                masks -- A (black, red, kings) mask triple
+                color -- Color of the moving piece
+                square -- Bit index of the moving piece
+                moves -- Captures of the chain so far
+                was_king -- Whether the piece was a king before the turn
+                result -- List collecting the Turn objects
+        '''
+        black, red, kings = masks
+        if color == Piece.BLACK:
+            enemy = red
+            directions = Piece.BLACK_MOVES
+        else:
+            enemy = black
+            directions = Piece.RED_MOVES
+        is_king = kings & (1 << square) != 0
+        if is_king:
+            directions = Piece.KING_MOVES
+        occupied = black | red
+
+        extended = False
+        for direction in directions:
+            neighbors = self.neighbors[direction]
+            middle = neighbors[square]
+            if middle < 0 or not enemy & (1 << middle):
+                continue
+            landing = neighbors[middle]
+            if landing >= 0 and not occupied & (1 << landing):
+                extended = True
+                self.extend_turn(
+                    self.play_hop(masks, color, square, landing, middle),
+                    color, landing,
+                    moves + [self.jump_moves[direction][square]], was_king,
+                    result)
+        if not extended:
+            result.append(Turn(moves, is_king and not was_king))
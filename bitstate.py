@@ -0,0 +1,125 @@
+'''
+Class recording game states on top of a bitboard backend.
+'''
+
+from piece import Piece
+from state import GameState
+from bitboard import BitBoard
+
+
+class BitBoardGameState(GameState):
+    '''
+        Class -- BitBoardGameState
+            A GameState whose move generation and game over checks run on
+            bit masks. The nested list of squares is still kept up to date,
+            so drawing and the rest of the GameState API work unchanged.
+            Pieces must stand on dark squares of an even sized board.
+        Attributes:
+            board -- BitBoard mirroring the squares
+        Methods:
+            load_current_piece_locations -- Also rebuilds the bitboard
+            update_square -- Also updates the bitboard
+            find_possible_moves -- Moves of a piece from the bitboard
+            find_all_turns -- Every legal turn, found on the bitboard
+            count_movable -- Number of pieces of a player able to move,
+            from the bitboard
+            who_wins -- Return the winner of the game from the bitboard
+    '''
+
+    def __init__(self, current_player, state, size=8):
+        '''
+            Constructor -- Creates a new instance of BitBoardGameState
+            Parameters:
+                self -- The current BitBoardGameState object
+                current_player -- current player of the game
+                state -- current game state
+                size -- Number of squares on each row of the board
+        '''
+        super().__init__(current_player, state, size)
+        self.board = BitBoard(size)
+
+    def load_current_piece_locations(self):
+        '''
+            Method -- load_current_piece_locations
+                Collect locations of pieces of same colors and rebuild
+                the bitboard from the squares.
+            Parameter:
+                self -- The current BitBoardGameState object
+        '''
+        super().load_current_piece_locations()
+        self.board = BitBoard(len(self.squares))
+        self.board.load(self.squares)
+
+    def update_square(self, location, square):
+        '''
+            Method -- update_square
+                Update a square as GameState does, then mirror it
+                on the bitboard.
+            Parameters:
+                self -- The current BitBoardGameState object
+                location -- Location to be updated
+                square -- None or the Piece to put there
+        '''
+        super().update_square(location, square)
+        board = self.board
+        bit = board.bits[location[0]][location[1]]
+        keep = ~bit
+        board.black &= keep
+        board.red &= keep
+        board.kings &= keep
+        if square is not None:
+            if square.color == Piece.BLACK:
+                board.black |= bit
+            else:
+                board.red |= bit
+            if square.is_king:
+                board.kings |= bit
+
+    def find_possible_moves(self, start_location):
+        '''
+            Method -- find_possible_moves
+                Find all possible moves given a valid location
+            Parameters:
+                self -- The current BitBoardGameState object
+                start_location -- Current square the piece located
+            Return:
+                All possible moves, captures first
+        '''
+        return self.board.find_moves(start_location)
+
+    def find_all_turns(self):
+        '''
+            Method -- find_all_turns
+                Find every legal turn of the current player from the
+                bitboard, with the rules of GameState.find_all_turns.
+                Turns come grouped by direction rather than by piece.
+            Parameters:
+                self -- The current BitBoardGameState object
+            Return:
+                A list of Turn objects
+        '''
+        return self.board.turns(self.current_player)
+
+    def count_movable(self, player):
+        '''
+            Method -- count_movable
+                Number of pieces of a player having a possible move
+            Parameters:
+                self -- The current BitBoardGameState object
+                player -- Color of the player
+        '''
+        return bin(self.board.movable(player)).count("1")
+
+    def who_wins(self):
+        '''
+            Method -- who_wins
+                Determine which side wins
+            Parameter:
+                self -- The current BitBoardGameState object
+        '''
+        board = self.board
+        for player, own in ((Piece.BLACK, board.black),
+                            (Piece.RED, board.red)):
+            if own == 0 or not board.has_moves(player):
+                return self.get_enemy_color(player)
+        return None
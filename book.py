@@ -0,0 +1,263 @@
+'''
+Opening book -- move statistics of recorded games, keyed by position hash
+and stored as one sorted binary file that is read through mmap. A lookup
+is a binary search over the file, so book moves cost next to nothing.
+
+File layout, all little-endian:
+    header -- magic b"CKBK", version, board size, number of records
+    (struct HEADER)
+    records -- hash key, turn code, games and points, sorted by key and
+    then by points per game, best first (struct RECORD). Points count 2
+    for a win and 1 for a draw of the side that played the turn. The
+    turn code is Turn.code, from the whole path of the turn.
+
+Usage: python book.py BOOK GAMES [GAMES ...] [--turns N] [--size S]
+GAMES are JSON lines files of selfplay or PDN files ending in .pdn.
+'''
+
+import argparse
+import json
+import mmap
+import struct
+import time
+
+from layout import SIZES, new_game
+from pdn import read_games
+from state import GameState
+
+
+MAGIC = b"CKBK"
+VERSION = 2
+HEADER = struct.Struct("<4sBBI")
+RECORD = struct.Struct("<QQII")
+
+
+def rank(record):
+    '''
+        Function -- rank
+            Sort key of the records of a position, best first: points
+            per game, then games
+        Parameters:
+            record -- A (turn code, games, points) tuple
+    '''
+    return (-record[2] / record[1], -record[1])
+
+
+def collect_games(paths, max_turns=20, size=8):
+    '''
+        Function -- collect_games
+            Replay the games of JSON lines files written by selfplay, or
+            of PDN files, and count every turn played in their first
+            max_turns turns. The opening turns selfplay picked at random
+            are replayed but not counted, as no engine chose them.
+            Games on other board sizes are skipped.
+        Parameters:
+            paths -- Paths of JSON lines files, or of files ending in .pdn
+            max_turns -- Number of turns of each game to keep
+            size -- Number of squares on each row of the book
+        Returns:
+            A dictionary mapping (hash key, turn code) to [games, points]
+    '''
+    statistics = {}
+    for path in paths:
+        with open(path) as source:
+            if path.endswith(".pdn"):
+                games = read_games(source)
+            else:
+                games = (json.loads(line) for line in source)
+            for game in games:
+                if game.get("size", 8) != size:
+                    continue
+                state = new_game(GameState, size)
+                random_turns = game.get("random_turns", 0)
+                for index, path_played in enumerate(
+                        game["moves"][:max_turns]):
+                    path_played = [tuple(location)
+                                   for location in path_played]
+                    turn = None
+                    for candidate in state.find_all_turns():
+                        if candidate.path == path_played:
+                            turn = candidate
+                    if turn is None:
+                        break
+                    if index >= random_turns:
+                        if game["winner"] is None:
+                            points = 1
+                        elif game["winner"] == state.current_player:
+                            points = 2
+                        else:
+                            points = 0
+                        entry = statistics.setdefault(
+                            (state.hash_key, turn.code(size)), [0, 0])
+                        entry[0] += 1
+                        entry[1] += points
+                    state.make_turn(turn)
+                    # Nothing takes these turns back
+                    state.undo_stack = []
+    return statistics
+
+
+def write_book(statistics, path, size=8, min_games=1):
+    '''
+        Function -- write_book
+            Write collected statistics as a sorted book file
+        Parameters:
+            statistics -- A dictionary from collect_games
+            path -- Path of the file to write
+            size -- Number of squares on each row
+            min_games -- Fewest games a turn needs to be kept
+        Returns:
+            Number of records written
+    '''
+    records = sorted(
+        ((key, code, games, points)
+         for (key, code), (games, points) in statistics.items()
+         if games >= min_games),
+        key=lambda record: (record[0],) + rank(record[1:]))
+    with open(path, "wb") as output:
+        output.write(HEADER.pack(MAGIC, VERSION, size, len(records)))
+        for record in records:
+            output.write(RECORD.pack(*record))
+    return len(records)
+
+
+class OpeningBook:
+    '''
+        Class -- OpeningBook
+            Read-only view of a book file through mmap
+        Attributes:
+            size -- Number of squares on each row
+            count -- Number of records
+            min_games -- Fewest games a turn needs to be played from
+            the book
+            data -- The mapped file
+        Methods:
+            lookup -- Book statistics of a position
+            choose -- Book turn for a position, if any
+            close -- Unmap the file
+    '''
+
+    MIN_GAMES = 2
+
+    def __init__(self, path, min_games=MIN_GAMES):
+        '''
+            Constructor -- Opens a book file
+            Parameters:
+                self -- The current OpeningBook object
+                path -- Path of a file written by write_book
+                min_games -- Fewest games a turn needs to be played from
+                the book, so one lucky game does not make a book turn
+        '''
+        self.min_games = min_games
+        with open(path, "rb") as source:
+            self.data = mmap.mmap(source.fileno(), 0,
+                                  access=mmap.ACCESS_READ)
+        magic, version, self.size, self.count = \
+            HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC or version != VERSION:
+            self.data.close()
+            raise ValueError("%s is not an opening book file" % path)
+
+    def lookup(self, key):
+        '''
+            Method -- lookup
+                Find the records of a position by binary search
+            Parameters:
+                self -- The current OpeningBook object
+                key -- Hash key of the position
+            Return:
+                A list of (turn code, games, points), the most points per
+                game first
+        '''
+        low = 0
+        high = self.count
+        while low < high:
+            middle = (low + high) // 2
+            offset = HEADER.size + middle * RECORD.size
+            if RECORD.unpack_from(self.data, offset)[0] < key:
+                low = middle + 1
+            else:
+                high = middle
+        records = []
+        while low < self.count:
+            record = RECORD.unpack_from(
+                self.data, HEADER.size + low * RECORD.size)
+            if record[0] != key:
+                break
+            records.append(record[1:])
+            low += 1
+        return records
+
+    def choose(self, state, rng=None):
+        '''
+            Method -- choose
+                Pick a book turn for the current player among the turns
+                played in at least min_games games. Without rng the turn
+                scoring the most points per game is picked, otherwise a
+                turn is drawn in proportion to the points it scored.
+            Parameters:
+                self -- The current OpeningBook object
+                state -- An object of GameState
+                rng -- A random.Random, or None
+            Return:
+                An object of Turn, or None when the position is not in
+                the book
+        '''
+        if len(state.squares) != self.size:
+            return None
+        records = self.lookup(state.hash_key)
+        if len(records) == 0:
+            return None
+        turns = {}
+        for turn in state.find_all_turns():
+            turns[turn.code(self.size)] = turn
+        # A record whose turn is not legal comes from a hash collision
+        records = [record for record in records
+                   if record[0] in turns and record[1] >= self.min_games]
+        if len(records) == 0:
+            return None
+        points = [record[2] for record in records]
+        if rng is None or sum(points) == 0:
+            return turns[records[0][0]]
+        codes = [record[0] for record in records]
+        return turns[rng.choices(codes, points)[0]]
+
+    def close(self):
+        '''
+            Method -- close
+                Unmap the file
+            Parameters:
+                self -- The current OpeningBook object
+        '''
+        self.data.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Build an opening book from self-play games.")
+    parser.add_argument("book")
+    parser.add_argument("games", nargs="+")
+    parser.add_argument("--turns", type=int, default=20)
+    parser.add_argument("--min-games", type=int, default=1)
+    parser.add_argument("--size", type=int, choices=SIZES, default=8)
+    arguments = parser.parse_args()
+
+    statistics = collect_games(arguments.games, arguments.turns,
+                               arguments.size)
+    records = write_book(statistics, arguments.book, arguments.size,
+                         arguments.min_games)
+    print("%d records" % records)
+
+    book = OpeningBook(arguments.book)
+    state = new_game(GameState, arguments.size)
+    lookups = 1000
+    started = time.perf_counter()
+    for index in range(lookups):
+        book.choose(state)
+    elapsed = time.perf_counter() - started
+    print("%.1f us per book turn" % (elapsed / lookups * 1e6))
+    book.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+'''
+Class keeping the thinking time of the computer player.
+'''
+
+import time
+
+
+class Clock:
+    '''
+        Class -- Clock
+            Time budget of each computer turn: either a fixed number of
+            seconds per turn, or a game clock that loses the time used and
+            gains an increment after every turn.
+        Attributes:
+            per_move -- Seconds for every turn, or None for a game clock
+            remaining -- Seconds left on the game clock
+            increment -- Seconds added to the game clock after each turn
+            moves_to_go -- Number of turns the game clock is shared by
+            margin -- Seconds kept back from every budget for the time
+            the search takes to stop and the move to be played
+            started -- perf_counter time the current turn started
+        Methods:
+            budget -- Seconds the current turn may take
+            start -- Start a turn and return its deadline
+            stop -- End a turn, charging the game clock
+    '''
+
+    def __init__(self, per_move=None, remaining=None, increment=0.0,
+                 moves_to_go=30, margin=0.01):
+        '''
+            Constructor -- Creates a new instance of Clock
+            Parameters:
+                self -- The current Clock object
+                per_move -- Seconds for every turn, or None
+                remaining -- Seconds on the game clock, used when
+                per_move is None
+                increment -- Seconds added after each turn
+                moves_to_go -- Number of turns the game clock is shared by
+                margin -- Seconds kept back from every budget
+        '''
+        if per_move is None and remaining is None:
+            raise ValueError("a clock needs per_move or remaining seconds")
+        self.per_move = per_move
+        self.remaining = remaining
+        self.increment = increment
+        self.moves_to_go = moves_to_go
+        self.margin = margin
+        self.started = None
+
+    def budget(self):
+        '''
+            Method -- budget
+                Seconds the current turn may take
+            Parameters:
+                self -- The current Clock object
+        '''
+        if self.per_move is not None:
+            budget = self.per_move
+        else:
+            budget = self.remaining / self.moves_to_go + self.increment
+            # Never stake more than half of what is left on the clock
+            budget = min(budget, self.remaining / 2)
+        return max(budget - self.margin, 0.0)
+
+    def start(self):
+        '''
+            Method -- start
+                Start a turn
+            Parameters:
+                self -- The current Clock object
+            Return:
+                The perf_counter time at which the turn must stop
+        '''
+        self.started = time.perf_counter()
+        return self.started + self.budget()
+
+    def stop(self):
+        '''
+            Method -- stop
+                End a turn. A game clock loses the time used and gains
+                the increment.
+            Parameters:
+                self -- The current Clock object
+            Return:
+                Seconds used by the turn
+        '''
+        used = time.perf_counter() - self.started
+        if self.per_move is None:
+            self.remaining = self.remaining - used + self.increment
+        return used
@@ -11,6 +11,7 @@ class Draw:
             Handles all drawing functions
         Attributes:
             turt -- An instance of turtle
+            num_squares -- The number of squares on each row
         Methods:
             draw_square -- Draws square in the checkerboard.
             color_board -- Creates checkerboard before starting the game
@@ -23,18 +24,23 @@ class Draw:
             add_king_sign -- Draws additional king sign to represent King piece
             claim_winner -- Claims the winner when game ends
     '''
-    NUM_SQUARES = 8  # The number of squares on each row.
+    NUM_SQUARES = 8  # The default number of squares on each row.
     SQUARE = 50  # The size of each square in the checkerboard.
     BLACK = "black"
     RED = "red"
     SQUARE_COLORS = ("light gray", "white")
     PIECE_COLOR = {"black": "black", "red": "firebrick"}
 
-    def __init__(self, turt):
+    def __init__(self, turt, num_squares=NUM_SQUARES):
         '''
             Constructor -- Creates a new instance of Draw
+            Parameters:
+                self -- The current Draw object
+                turt -- An instance of turtle
+                num_squares -- The number of squares on each row
         '''
         self.turt = turt
+        self.num_squares = num_squares
 
     def draw_square(self, size):
         '''
@@ -61,8 +67,8 @@ class Draw:
                 corner -- corner of the checkboard
         '''
         self.turt.color("black", Draw.SQUARE_COLORS[0])
-        for row in range(Draw.NUM_SQUARES):
-            for col in range(Draw.NUM_SQUARES):
+        for row in range(self.num_squares):
+            for col in range(self.num_squares):
                 if (row + col) % 2 == 1:
                     set_x = corner + col * Draw.SQUARE
                     set_y = corner + row * Draw.SQUARE
@@ -94,12 +100,12 @@ class Draw:
             Parameters:
                 self -- The current Draw object
                 corner -- bottom left of the checkboard
-                row -- every row of checkboard (total 8 rows)
+                row -- every row of checkboard
                 color -- color of pieces to be drawn
         '''
         X = corner + Draw.SQUARE / 2
         Y = corner
-        for col in range(Draw.NUM_SQUARES):
+        for col in range(self.num_squares):
             if (row + col) % 2 == 1:
                 set_x = X + col * Draw.SQUARE
                 set_y = Y + row * Draw.SQUARE
@@ -110,17 +116,19 @@ class Draw:
         '''
             Method -- draw_orig_pieces
                 Draws two classes of pieces representing user
-                and computer sides, by two different colors.
+                and computer sides, by two different colors. Each side
+                fills its num_squares / 2 - 1 nearest rows.
             Parameters:
                 self -- The current Draw object
                 corner -- bottom left of the checkboard
             Return:
                 Nothing. Drawing all pieces at start of game.
         '''
-        for row in range(Draw.NUM_SQUARES):
-            if row <= 2:
+        rows = self.num_squares // 2 - 1
+        for row in range(self.num_squares):
+            if row < rows:
                 self.draw_row(corner, row, Draw.PIECE_COLOR[Draw.BLACK])
-            elif row >= 5:
+            elif row >= self.num_squares - rows:
                 self.draw_row(corner, row, Draw.PIECE_COLOR[Draw.RED])
 
     def outline_possible_move(self, pair, color):
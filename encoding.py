@@ -0,0 +1,236 @@
+'''
+Compact encodings of positions, for storage and transport.
+
+Binary: the black, red and king masks of BitBoard, little-endian and just
+wide enough for the dark squares of the board (4 bytes each for 8 x 8),
+then one byte for the side to move: 0 black, 1 red. A position of an
+8 x 8 board takes 13 bytes, against about a kilobyte for a pickled
+GameState.
+
+Text: the FEN of PDN, e.g. "B:W21,22,K30:B1,2,K5" -- the side to move,
+then the squares of each color, kings marked with K. Squares are
+numbered as in pdn.py; red is White.
+
+Usage: python encoding.py [positions]
+'''
+
+import pickle
+import sys
+import time
+
+from bitboard import BitBoard
+from layout import BLACK, RED, random_positions
+from pdn import square_number, square_location
+from piece import Piece
+from state import GameState
+
+
+boards = {}  # BitBoard of each board size, for the index mapping
+
+
+def board_for_size(size):
+    '''
+        Function -- board_for_size
+            The BitBoard used to map locations of a board size to bits,
+            built once
+        Parameters:
+            size -- Number of squares on each row
+    '''
+    if size not in boards:
+        boards[size] = BitBoard(size)
+    return boards[size]
+
+
+def record_size(size=8):
+    '''
+        Function -- record_size
+            Number of bytes of one encoded position
+        Parameters:
+            size -- Number of squares on each row
+    '''
+    return 3 * mask_bytes(size) + 1
+
+
+def mask_bytes(size):
+    '''
+        Function -- mask_bytes
+            Number of bytes of one mask
+        Parameters:
+            size -- Number of squares on each row
+    '''
+    return (size * size // 2 + 7) // 8
+
+
+def encode(state):
+    '''
+        Function -- encode
+            Binary encoding of a position and the side to move
+        Parameters:
+            state -- An object of GameState
+        Returns:
+            A bytes object of record_size bytes
+    '''
+    size = len(state.squares)
+    board = board_for_size(size)
+    masks = {BLACK: 0, RED: 0}
+    kings = 0
+    for color, locations in state.piece_locations_by_player.items():
+        for location in locations:
+            bit = 1 << board.location_to_index(location)
+            masks[color] |= bit
+            if state.squares[location[0]][location[1]].is_king:
+                kings |= bit
+    width = mask_bytes(size)
+    return masks[BLACK].to_bytes(width, "little") + \
+        masks[RED].to_bytes(width, "little") + \
+        kings.to_bytes(width, "little") + \
+        (b"\x00" if state.current_player == BLACK else b"\x01")
+
+
+def decode(data, state_class=GameState, size=8):
+    '''
+        Function -- decode
+            Game state of a binary encoding
+        Parameters:
+            data -- A bytes-like object of record_size bytes
+            state_class -- GameState or a subclass of it
+            size -- Number of squares on each row
+        Returns:
+            A loaded state of state_class
+    '''
+    width = mask_bytes(size)
+    black = int.from_bytes(data[:width], "little")
+    red = int.from_bytes(data[width:2 * width], "little")
+    kings = int.from_bytes(data[2 * width:3 * width], "little")
+    player = BLACK if data[3 * width] == 0 else RED
+    board = board_for_size(size)
+
+    state = state_class(player, state_class.INITIAL_STATE, size)
+    state.squares = [[None] * size for row in range(size)]
+    for color, mask in ((BLACK, black), (RED, red)):
+        index = 0
+        while mask:
+            if mask & 1:
+                row, col = board.index_to_location(index)
+                state.squares[row][col] = Piece(
+                    color, bool(kings >> index & 1), (row, col))
+            mask >>= 1
+            index += 1
+    state.load_current_piece_locations()
+    return state
+
+
+def encode_many(states):
+    '''
+        Function -- encode_many
+            Binary encodings of positions of the same size, back to back
+        Parameters:
+            states -- An iterable of GameState objects
+        Returns:
+            A bytes object
+    '''
+    return b"".join(encode(state) for state in states)
+
+
+def decode_many(data, state_class=GameState, size=8):
+    '''
+        Function -- decode_many
+            Game states of back to back binary encodings
+        Parameters:
+            data -- A bytes-like object from encode_many
+            state_class -- GameState or a subclass of it
+            size -- Number of squares on each row
+        Returns:
+            A generator of loaded states of state_class
+    '''
+    step = record_size(size)
+    view = memoryview(data)
+    for offset in range(0, len(data) - step + 1, step):
+        yield decode(view[offset:offset + step], state_class, size)
+
+
+def to_fen(state):
+    '''
+        Function -- to_fen
+            FEN text of a position
+        Parameters:
+            state -- An object of GameState
+    '''
+    size = len(state.squares)
+    fields = ["B" if state.current_player == BLACK else "W"]
+    for color, letter in ((RED, "W"), (BLACK, "B")):
+        squares = []
+        for location in state.piece_locations_by_player[color]:
+            number = square_number(location, size)
+            is_king = state.squares[location[0]][location[1]].is_king
+            squares.append((number, "K%d" % number if is_king
+                            else str(number)))
+        fields.append(letter + ",".join(text for number, text in
+                                        sorted(squares)))
+    return ":".join(fields)
+
+
+def from_fen(text, state_class=GameState, size=8):
+    '''
+        Function -- from_fen
+            Game state of a FEN text
+        Parameters:
+            text -- FEN text such as "B:W21,K30:B1,2"
+            state_class -- GameState or a subclass of it
+            size -- Number of squares on each row
+        Returns:
+            A loaded state of state_class
+    '''
+    fields = text.strip().rstrip(".").split(":")
+    if fields[0] not in ("B", "W"):
+        raise ValueError("bad side to move in FEN %r" % text)
+    player = BLACK if fields[0] == "B" else RED
+    state = state_class(player, state_class.INITIAL_STATE, size)
+    state.squares = [[None] * size for row in range(size)]
+    for field in fields[1:]:
+        if field[:1] not in ("B", "W"):
+            raise ValueError("bad color in FEN %r" % text)
+        color = BLACK if field[0] == "B" else RED
+        for square in field[1:].split(","):
+            square = square.strip()
+            if square == "":
+                continue
+            is_king = square.startswith("K")
+            location = square_location(int(square.lstrip("K")), size)
+            state.squares[location[0]][location[1]] = Piece(
+                color, is_king, location)
+    state.load_current_piece_locations()
+    return state
+
+
+def main():
+    '''
+        Function -- main
+            Compare the size and speed of the binary encoding with
+            pickling, on positions from random games
+    '''
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    states = random_positions(GameState, count)
+
+    started = time.perf_counter()
+    pickled = [pickle.dumps(state) for state in states]
+    pickle_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    data = encode_many(states)
+    encode_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    decoded = list(decode_many(data))
+    decode_seconds = time.perf_counter() - started
+    assert([state.hash_key for state in decoded] ==
+           [state.hash_key for state in states])
+
+    pickle_bytes = sum(len(item) for item in pickled)
+    print("pickle: %.0f bytes a position, %.0f positions/s" % (
+        pickle_bytes / count, count / pickle_seconds))
+    print("binary: %d bytes a position, %.0f encoded/s, %.0f decoded/s" % (
+        record_size(), count / encode_seconds, count / decode_seconds))
+    print("%.0fx smaller" % (pickle_bytes / len(data)))
+
+
+if __name__ == "__main__":
+    main()
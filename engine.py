@@ -0,0 +1,615 @@
+'''
+Class searching for the best turn of the computer player.
+'''
+
+import sys
+import threading
+import time
+
+import instrument
+from layout import new_game
+from state import GameState
+from tablebase import WIN, LOSS
+from transposition import TranspositionTable
+from weights import Weights
+
+
+class Engine:
+    '''
+        Class -- Engine
+            Negamax search with alpha-beta pruning over full turns,
+            so a multi-jump is searched as a single edge.
+        Attributes:
+            depth -- Number of turns to look ahead
+            node_limit -- Maximum number of nodes per search, or None
+            nodes -- Number of nodes visited by the last search
+            elapsed -- Seconds spent by the last search
+            score -- Score of the best turn, for the side to move
+            best_turn -- Best turn found by the last search
+            table -- TranspositionTable shared between searches, or None
+            tablebase -- Tablebase giving exact endgame scores, or None
+            evaluator -- Object whose evaluate method scores the leaves,
+            or None to score them by material alone
+            orderer -- MoveOrderer adding killer and history ordering, or
+            None to put only the turn of the table first
+            quiescence -- Whether to play out the captures pending at
+            the leaves before evaluating them
+            quiescence_limit -- Maximum of quiescence_nodes per move, over
+            all the depths think searches, or None for no limit
+            quiescence_nodes -- Number of positions whose captures were
+            played out past the leaves, for the last move
+            quiescence_depth -- Most turns a capture line of the last
+            move was followed past the leaves
+            deadline -- perf_counter time at which to give up, or None
+            aborted -- Whether the last search ran out of time
+            truncated -- Whether the node or quiescence budget of the
+            last search ran out; the scores found after that are not
+            stored in the table
+            stopped -- Whether stop was called, ending every search
+            completed_depth -- Deepest search finished by think
+        Methods:
+            search -- Find the best turn for the current player
+            search_steps -- search, pausing after every root turn
+            new_move -- Reset the budgets, statistics and ordering kept
+            per move
+            search_iteration -- One search to a depth, pausing after
+            every root turn
+            think -- Search deeper and deeper until a clock runs out
+            think_steps -- think in a thread, pausing every slice of time
+            stop -- End the search in progress, e.g. from another thread
+            evaluate -- Score a position for the side to move
+            evaluate_material -- Score a position by material alone
+            negamax -- Score a position by searching it
+            quiesce -- Score a leaf once its captures are played out
+            order_turns -- Sort turns, the best turn from the table first
+            score_to_table -- Make a win score independent of the ply
+            score_from_table -- Make a win score relative to the ply
+            tablebase_score -- Score of a tablebase result
+            nodes_per_second -- Search speed of the last search
+    '''
+    WIN_SCORE = 100000
+    # Scores beyond this are wins or losses a number of turns away
+    WIN_THRESHOLD = WIN_SCORE - 1000
+    MAN_VALUE = Weights.MAN_VALUE
+    KING_VALUE = Weights.KING_VALUE
+    CLOCK_INTERVAL = 256  # Nodes between two looks at the clock
+    SLICE_SECONDS = 0.02  # Longest step of think_steps
+
+    def __init__(self, depth=4, node_limit=None, table=None,
+                 tablebase=None, evaluator=None, orderer=None,
+                 quiescence=False, quiescence_limit=None):
+        '''
+            Constructor -- Creates a new instance of Engine
+            Parameters:
+                self -- The current Engine object
+                depth -- Number of turns to look ahead
+                node_limit -- Maximum number of nodes per search, or None
+                for no limit
+                table -- TranspositionTable to use, or None to search
+                without one
+                tablebase -- Tablebase to look endgames up in, or None
+                evaluator -- Evaluation to score the leaves with, e.g. an
+                object of evaluation.Evaluator, having evaluate and
+                prepare, or None for material alone
+                orderer -- An object of ordering.MoveOrderer, or None
+                quiescence -- Whether to follow capture lines past the
+                leaves until the position is quiet
+                quiescence_limit -- Maximum number of positions whose
+                captures are played out per move, or None for no limit
+        '''
+        self.depth = depth
+        self.node_limit = node_limit
+        self.table = table
+        self.tablebase = tablebase
+        self.evaluator = evaluator
+        self.orderer = orderer
+        self.quiescence = quiescence
+        self.quiescence_limit = quiescence_limit
+        self.quiescence_nodes = 0
+        self.quiescence_depth = 0
+        if evaluator is not None:
+            self.evaluate = evaluator.evaluate
+        self.deadline = None
+        self.aborted = False
+        self.truncated = False
+        self.stopped = False
+        self.completed_depth = 0
+        self.nodes = 0
+        self.elapsed = 0.0
+        self.score = 0
+        self.best_turn = None
+
+    def search(self, state, depth=None):
+        '''
+            Method -- search
+                Find the best turn for the current player of a state.
+                Turns are played and taken back on the state itself,
+                which is left as it was found, also when the search runs
+                out of time.
+            Parameters:
+                self -- The current Engine object
+                state -- An object of GameState
+                depth -- Number of turns to look ahead, self.depth if None
+            Return:
+                The best turn, an object of Turn; None if there is no move.
+                After running out of time, the best of the turns searched
+                to the end.
+        '''
+        for step in self.search_steps(state, depth):
+            pass
+        return self.best_turn
+
+    def search_steps(self, state, depth=None):
+        '''
+            Method -- search_steps
+                The search of search, as a generator that pauses after
+                every turn of the root. The state is back at the root
+                position whenever it pauses, and best_turn and score hold
+                the best turn so far.
+            Parameters:
+                self -- The current Engine object
+                state -- An object of GameState
+                depth -- Number of turns to look ahead, self.depth if None
+        '''
+        self.new_move()
+        yield from self.search_iteration(state, depth)
+
+    def new_move(self):
+        '''
+            Method -- new_move
+                Reset what is counted once per move rather than once per
+                depth of iterative deepening: the quiescence budget and
+                statistics, and the killers and history of the orderer,
+                which each depth passes on to the next
+            Parameters:
+                self -- The current Engine object
+        '''
+        self.quiescence_nodes = 0
+        self.quiescence_depth = 0
+        if self.orderer is not None:
+            self.orderer.new_search()
+
+    def search_iteration(self, state, depth=None):
+        '''
+            Method -- search_iteration
+                The search of search_steps without resetting what is kept
+                per move, so think can search one depth after another
+            Parameters:
+                self -- The current Engine object
+                state -- An object of GameState
+                depth -- Number of turns to look ahead, self.depth if None
+        '''
+        if depth is None:
+            depth = self.depth
+        self.nodes = 0
+        self.aborted = False
+        self.truncated = False
+        self.best_turn = None
+        self.score = -Engine.WIN_SCORE
+        started = time.perf_counter()
+
+        if self.evaluator is not None:
+            self.evaluator.prepare(state)
+        alpha = -Engine.WIN_SCORE - 1
+        beta = Engine.WIN_SCORE + 1
+        turns = self.order_turns(state, state.find_all_turns(), 0)
+        for turn in turns:
+            state.make_turn(turn)
+            score = -self.negamax(state, depth - 1, -beta, -alpha, 1)
+            state.unmake_turn(turn)
+            if self.aborted:
+                break
+            if score > alpha:
+                alpha = score
+                self.score = score
+                self.best_turn = turn
+            yield
+
+        if self.table is not None and self.best_turn is not None and \
+                not self.aborted and not self.truncated:
+            self.table.store(
+                state.hash_key, depth,
+                self.score_to_table(self.score, 0), TranspositionTable.EXACT,
+                self.best_turn.code(len(state.squares)))
+        self.elapsed = time.perf_counter() - started
+
+    def think(self, state, clock):
+        '''
+            Method -- think
+                Iterative deepening: search one turn deep, then two, and
+                so on up to self.depth, until the clock runs out. The
+                search that runs out of time is thrown away, so the turn
+                of the deepest finished search is played.
+            Parameters:
+                self -- The current Engine object
+                state -- An object of GameState, left as it was found
+                clock -- An object of Clock giving the time for this turn
+            Return:
+                The best turn, an object of Turn; None if there is no move
+        '''
+        turns = state.find_all_turns()
+        self.deadline = clock.start()
+        started = time.perf_counter()
+        best_turn = turns[0] if len(turns) > 0 else None
+        best_score = 0
+        nodes = 0
+        self.completed_depth = 0
+        self.new_move()
+        # A single legal turn needs no search
+        for depth in range(1, self.depth + 1 if len(turns) > 1 else 1):
+            for step in self.search_iteration(state, depth):
+                pass
+            nodes += self.nodes
+            if self.aborted:
+                break
+            best_turn = self.best_turn
+            best_score = self.score
+            self.completed_depth = depth
+            if abs(best_score) > Engine.WIN_THRESHOLD:
+                break
+            # The next depth takes longer than all before it together
+            if time.perf_counter() - started > clock.budget() / 2:
+                break
+        clock.stop()
+
+        self.deadline = None
+        self.best_turn = best_turn
+        self.score = best_score
+        self.nodes = nodes
+        self.elapsed = time.perf_counter() - started
+        return best_turn
+
+    def think_steps(self, state, clock, slice_seconds=SLICE_SECONDS):
+        '''
+            Method -- think_steps
+                think, as a generator that pauses every slice_seconds,
+                so a caller can spread the thinking over short slices of
+                time. The search runs on a copy of the state in a thread
+                of its own, which goes on while the generator is paused,
+                so no pause waits for a root turn to be searched. When
+                the generator is exhausted, best_turn holds the turn to
+                play; closing it early ends the search.
+            Parameters:
+                self -- The current Engine object
+                state -- An object of GameState, which is not changed
+                clock -- An object of Clock giving the time for this turn
+                slice_seconds -- Longest time between two pauses
+        '''
+        root = state.copy()
+        failures = []
+
+        def run():
+            try:
+                self.think(root, clock)
+            except Exception as error:
+                failures.append(error)
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        try:
+            thread.join(slice_seconds)
+            while thread.is_alive():
+                yield
+                thread.join(slice_seconds)
+        finally:
+            # Closed early: run out the clock of the search at once
+            while thread.is_alive():
+                self.deadline = time.perf_counter()
+                thread.join(slice_seconds)
+            self.deadline = None
+        if len(failures) > 0:
+            raise failures[0]
+
+    def stop(self):
+        '''
+            Method -- stop
+                End the search in progress and every later one of this
+                engine, as if its time had run out. Safe to call from
+                another thread than the one searching.
+            Parameters:
+                self -- The current Engine object
+        '''
+        self.stopped = True
+
+    def evaluate(self, state):
+        '''
+            Method -- evaluate
+                Score a position for the current player, by the evaluator
+                if there is one and by material otherwise. The constructor
+                puts the evaluator's method in place of this one, so a leaf
+                costs a single call either way.
+            Parameters:
+                self -- The current Engine object
+                state -- An object of GameState
+        '''
+        return self.evaluate_material(state)
+
+    def evaluate_material(self, state):
+        '''
+            Method -- evaluate_material
+                Score a position by material, from the point of view of
+                the current player
+            Parameters:
+                self -- The current Engine object
+                state -- An object of GameState
+        '''
+        score = 0
+        for player in state.piece_locations_by_player.keys():
+            kings = state.count_kings(player)
+            material = (state.count_pieces(player) - kings) * \
+                Engine.MAN_VALUE + kings * Engine.KING_VALUE
+            if player == state.current_player:
+                score += material
+            else:
+                score -= material
+        return score
+
+    def negamax(self, state, depth, alpha, beta, ply):
+        '''
+            Method -- negamax
+                Score a position by alpha-beta search
+            Parameters:
+                self -- The current Engine object
+                state -- An object of GameState
+                depth -- Remaining number of turns to search
+                alpha -- Lower bound of the score of interest
+                beta -- Upper bound of the score of interest
+                ply -- Distance from the root, in turns
+            Return:
+                Score of the position for its current player
+        '''
+        self.nodes += 1
+        if self.nodes % Engine.CLOCK_INTERVAL == 0 and (self.stopped or (
+                self.deadline is not None and
+                time.perf_counter() >= self.deadline)):
+            self.aborted = True
+        if self.aborted:
+            return 0
+        if self.tablebase is not None:
+            entry = self.tablebase.probe(state)
+            if entry is not None:
+                return self.tablebase_score(entry, ply)
+        out_of_nodes = self.node_limit is not None and \
+            self.nodes >= self.node_limit
+        if out_of_nodes:
+            # Every node still open now has a score cut short by this
+            self.truncated = True
+            return self.evaluate(state)
+        if depth <= 0:
+            if self.quiescence:
+                return self.quiesce(state, alpha, beta, ply, 0)
+            return self.evaluate(state)
+
+        if self.table is not None:
+            entry = self.table.probe(state.hash_key)
+            if entry is not None and entry[0] >= depth:
+                score = self.score_from_table(entry[1], ply)
+                flag = entry[2]
+                if flag == TranspositionTable.EXACT or \
+                        (flag == TranspositionTable.LOWER and score >= beta) \
+                        or (flag == TranspositionTable.UPPER and
+                            score <= alpha):
+                    return score
+
+        turns = state.find_all_turns()
+        if len(turns) == 0:
+            # No legal move left loses; prefer the quickest win
+            return -Engine.WIN_SCORE + ply
+
+        original_alpha = alpha
+        best_score = -Engine.WIN_SCORE - 1
+        best_turn = None
+        for turn in self.order_turns(state, turns, ply):
+            state.make_turn(turn)
+            score = -self.negamax(state, depth - 1, -beta, -alpha, ply + 1)
+            state.unmake_turn(turn)
+            if self.aborted:
+                return 0
+            if score > best_score:
+                best_score = score
+                best_turn = turn
+            if score > alpha:
+                alpha = score
+            if alpha >= beta:
+                if self.orderer is not None:
+                    self.orderer.record_cutoff(
+                        turn, turn.code(len(state.squares)), ply, depth)
+                break
+
+        if self.table is not None and not self.truncated:
+            if best_score >= beta:
+                flag = TranspositionTable.LOWER
+            elif best_score <= original_alpha:
+                flag = TranspositionTable.UPPER
+            else:
+                flag = TranspositionTable.EXACT
+            self.table.store(state.hash_key, depth,
+                             self.score_to_table(best_score, ply), flag,
+                             best_turn.code(len(state.squares)))
+        return best_score
+
+    def quiesce(self, state, alpha, beta, ply, extension):
+        '''
+            Method -- quiesce
+                Score a leaf of the search. Captures are forced, so while
+                the side to move has one the position is not quiet and
+                standing pat is not an option: every capture is searched,
+                longest chains first. A quiet position is evaluated.
+            Parameters:
+                self -- The current Engine object
+                state -- An object of GameState
+                alpha -- Lower bound of the score of interest
+                beta -- Upper bound of the score of interest
+                ply -- Distance from the root, in turns
+                extension -- Number of turns played past the leaf
+            Return:
+                Score of the position for its current player
+        '''
+        if self.aborted:
+            return 0
+        turns = state.find_all_turns()
+        if len(turns) == 0:
+            return -Engine.WIN_SCORE + ply
+        if not turns[0].is_capture:
+            return self.evaluate(state)
+        if self.quiescence_limit is not None and \
+                self.quiescence_nodes >= self.quiescence_limit:
+            # A capture left unplayed makes the score a guess
+            self.truncated = True
+            return self.evaluate(state)
+        self.quiescence_nodes += 1
+        if self.quiescence_nodes % Engine.CLOCK_INTERVAL == 0 and (
+                self.stopped or (self.deadline is not None and
+                                 time.perf_counter() >= self.deadline)):
+            self.aborted = True
+            return 0
+
+        if extension + 1 > self.quiescence_depth:
+            self.quiescence_depth = extension + 1
+        best_score = -Engine.WIN_SCORE - 1
+        turns = sorted(turns, key=lambda turn: len(turn.captured),
+                       reverse=True)
+        for turn in turns:
+            state.make_turn(turn)
+            score = -self.quiesce(state, -beta, -alpha, ply + 1,
+                                  extension + 1)
+            state.unmake_turn(turn)
+            if self.aborted:
+                return 0
+            if score > best_score:
+                best_score = score
+            if score > alpha:
+                alpha = score
+            if alpha >= beta:
+                break
+        return best_score
+
+    def order_turns(self, state, turns, ply=0):
+        '''
+            Method -- order_turns
+                Put the best turn stored in the table for this position,
+                if any, in front of the others. With an orderer, the
+                others follow by killers and history.
+            Parameters:
+                self -- The current Engine object
+                state -- An object of GameState
+                turns -- A list of turns
+                ply -- Distance of the position from the root
+        '''
+        entry = None
+        if self.table is not None:
+            entry = self.table.probe(state.hash_key)
+        size = len(state.squares)
+        if self.orderer is not None:
+            table_code = None
+            if entry is not None and entry[3] >= 0:
+                table_code = entry[3]
+            codes = [turn.code(size) for turn in turns]
+            return self.orderer.order(turns, codes, ply, table_code)
+        if entry is None or entry[3] < 0:
+            return turns
+        for index in range(len(turns)):
+            if turns[index].code(size) == entry[3]:
+                return [turns[index]] + turns[:index] + turns[index + 1:]
+        return turns
+
+    def score_to_table(self, score, ply):
+        '''
+            Method -- score_to_table
+                Count a win or loss from the stored position instead of
+                from the root
+            Parameters:
+                self -- The current Engine object
+                score -- Score relative to the root
+                ply -- Distance of the position from the root
+        '''
+        if score > Engine.WIN_THRESHOLD:
+            return score + ply
+        if score < -Engine.WIN_THRESHOLD:
+            return score - ply
+        return score
+
+    def score_from_table(self, score, ply):
+        '''
+            Method -- score_from_table
+                Count a stored win or loss from the root again
+            Parameters:
+                self -- The current Engine object
+                score -- Score as stored in the table
+                ply -- Distance of the position from the root
+        '''
+        if score > Engine.WIN_THRESHOLD:
+            return score - ply
+        if score < -Engine.WIN_THRESHOLD:
+            return score + ply
+        return score
+
+    def tablebase_score(self, entry, ply):
+        '''
+            Method -- tablebase_score
+                Score of a tablebase result, counting a win or loss
+                from the root like the search does
+            Parameters:
+                self -- The current Engine object
+                entry -- A (result, distance) pair from Tablebase.probe
+                ply -- Distance of the position from the root
+        '''
+        result, distance = entry
+        if result == WIN:
+            return Engine.WIN_SCORE - ply - distance
+        if result == LOSS:
+            return -Engine.WIN_SCORE + ply + distance
+        return 0
+
+    def nodes_per_second(self):
+        '''
+            Method -- nodes_per_second
+                Search speed of the last search
+            Parameters:
+                self -- The current Engine object
+        '''
+        if self.elapsed == 0:
+            return 0.0
+        return self.nodes / self.elapsed
+
+
+def main():
+    '''
+        Function -- main
+            Search the initial position without a window and report
+            the best turn, nodes searched and nodes per second. With
+            --profile the search runs under cProfile, and with
+            --instrument the calls of the instrumented methods are
+            counted. --quiescence plays out the captures at the leaves.
+            Usage: python engine.py [depth] [node_limit] [table_mb]
+            [--profile] [--instrument] [--quiescence]
+    '''
+    arguments = [argument for argument in sys.argv[1:]
+                 if not argument.startswith("--")]
+    depth = int(arguments[0]) if len(arguments) > 0 else 6
+    node_limit = int(arguments[1]) or None if len(arguments) > 1 else None
+    table_mb = float(arguments[2]) if len(arguments) > 2 else 16
+    engine = Engine(depth, node_limit, TranspositionTable(table_mb),
+                    quiescence="--quiescence" in sys.argv)
+    if "--instrument" in sys.argv:
+        instrument.enable()
+    if "--profile" in sys.argv:
+        turn, report = instrument.profile(engine.search, new_game(GameState))
+    else:
+        turn = engine.search(new_game(GameState))
+    print("best turn:", " -> ".join(str(location) for location in turn.path))
+    print("score:", engine.score)
+    print("nodes:", engine.nodes)
+    print("nodes/s: %.0f" % engine.nodes_per_second())
+    if engine.quiescence:
+        print("quiescence nodes:", engine.quiescence_nodes)
+        print("quiescence depth:", engine.quiescence_depth)
+    if "--profile" in sys.argv:
+        print(report)
+    if instrument.is_enabled():
+        instrument.disable()
+        instrument.dump(sys.stdout)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+'''
+Class scoring positions for the search: piece-square tables, which
+GameState keeps summed up as its moves are made and taken back once an
+Evaluator hands them over, plus the mobility of both sides.
+
+Usage: python evaluation.py [positions] [rounds]
+'''
+
+import sys
+import time
+
+from engine import Engine
+from layout import new_game, random_positions
+from piece import Piece
+from state import GameState
+from weights import weights_for_size
+
+
+class Evaluator:
+    '''
+        Class -- Evaluator
+            Evaluation of a position for the side to move, to plug into
+            Engine. Material, advancement, back-rank guard and center
+            control come from the piece-square score of the state, which
+            costs nothing to read; only mobility is counted per call, from
+            the movable pieces the state refreshes around its latest moves.
+            prepare hands a state the tables to sum up; a state without
+            them is scored from scratch.
+        Attributes:
+            mobility -- Value of every piece of a side able to move
+            weights -- Piece-square tables, or None for those of
+            weights_for_size
+        Methods:
+            tables -- Piece-square tables for a board size
+            prepare -- Have a state keep its piece-square score
+            evaluate -- Score a position for the side to move
+    '''
+    MOBILITY = 2
+
+    def __init__(self, mobility=MOBILITY, weights=None):
+        '''
+            Constructor -- Creates a new instance of Evaluator
+            Parameters:
+                self -- The current Evaluator object
+                mobility -- Value of every piece of a side able to move
+                weights -- An object of weights.Weights to score with, or
+                None for the tables of weights_for_size
+        '''
+        self.mobility = mobility
+        self.weights = weights
+
+    def tables(self, size):
+        '''
+            Method -- tables
+                Piece-square tables for a board size
+            Parameters:
+                self -- The current Evaluator object
+                size -- Number of squares on each row
+        '''
+        if self.weights is None:
+            return weights_for_size(size)
+        return self.weights
+
+    def prepare(self, state):
+        '''
+            Method -- prepare
+                Have a state keep its piece-square score up to date with
+                the tables of this evaluator, before moves are played on
+                it, e.g. at the root of a search
+            Parameters:
+                self -- The current Evaluator object
+                state -- An object of GameState
+        '''
+        weights = self.tables(len(state.squares))
+        if state.weights is not weights:
+            state.use_weights(weights)
+
+    def evaluate(self, state):
+        '''
+            Method -- evaluate
+                Score a position for the side to move
+            Parameters:
+                self -- The current Evaluator object
+                state -- An object of GameState
+            Return:
+                Score for state.current_player, higher is better
+        '''
+        weights = self.tables(len(state.squares))
+        if state.weights is weights:
+            score = state.square_score
+        else:
+            score = weights.score_squares(state.squares)
+        if self.mobility:
+            score += self.mobility * (state.count_movable(Piece.BLACK) -
+                                      state.count_movable(Piece.RED))
+        if state.current_player == Piece.BLACK:
+            return score
+        return -score
+
+
+def main():
+    '''
+        Function -- main
+            Count evaluations per second of the material-only score of
+            Engine and of Evaluator, on positions from random games,
+            and the nodes per second of a search using each
+    '''
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    states = random_positions(GameState, count)
+
+    for name, engine in (("material", Engine(6)),
+                         ("evaluator", Engine(6, evaluator=Evaluator()))):
+        started = time.perf_counter()
+        for index in range(rounds):
+            for state in states:
+                engine.evaluate(state)
+        elapsed = time.perf_counter() - started
+        engine.search(new_game(GameState))
+        print("%s: %.0f evaluations/s, %.0f nodes/s at depth 6" % (
+            name, count * rounds / elapsed, engine.nodes_per_second()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+'''
+Class holding the per-square move tables of a board size.
+'''
+
+from piece import Piece
+from move import Move
+
+
+class Geometry:
+    '''
+        Class -- Geometry
+            Precomputed targets of every square of a board size, so move
+            generation only looks squares up instead of computing and
+            bounds-checking locations. The Move objects in the tables are
+            created once and shared by every search.
+        Attributes:
+            size -- Number of squares on each row
+            targets -- targets[row][col][direction] is None when the step
+            leaves the board, otherwise a (step location, step Move,
+            jump location, jump Move) tuple whose jump entries are None
+            when the jump leaves the board
+            nearby -- nearby[row][col] is a tuple of the square and the
+            squares one or two diagonal steps away from it
+    '''
+    tables = {}
+
+    def __init__(self, size):
+        '''
+            Constructor -- Creates the tables of a board size
+            Parameters:
+                self -- The current Geometry object
+                size -- Number of squares on each row
+        '''
+        self.size = size
+        self.targets = []
+        self.nearby = []
+        for row in range(size):
+            target_row = []
+            nearby_row = []
+            for col in range(size):
+                start = (row, col)
+                targets = {}
+                nearby = [start]
+                for direction in Piece.KING_MOVES:
+                    step = (row + direction[0], col + direction[1])
+                    jump = (row + 2 * direction[0], col + 2 * direction[1])
+                    if not self.is_in_bounds(step):
+                        targets[direction] = None
+                        continue
+                    nearby.append(step)
+                    if self.is_in_bounds(jump):
+                        nearby.append(jump)
+                        targets[direction] = (
+                            step, Move(start, step, False, None),
+                            jump, Move(start, jump, True, step))
+                    else:
+                        targets[direction] = (
+                            step, Move(start, step, False, None), None, None)
+                target_row.append(targets)
+                nearby_row.append(tuple(nearby))
+            self.targets.append(target_row)
+            self.nearby.append(nearby_row)
+
+    def is_in_bounds(self, location):
+        '''
+            Method -- is_in_bounds
+                Check if a location is on the board
+            Parameters:
+                self -- The current Geometry object
+                location -- A pair of indices
+        '''
+        return 0 <= location[0] < self.size and 0 <= location[1] < self.size
+
+
+def geometry_for_size(size):
+    '''
+        Function -- geometry_for_size
+            Tables of a board size, created once and shared
+        Parameters:
+            size -- Number of squares on each row
+    '''
+    geometry = Geometry.tables.get(size)
+    if geometry is None:
+        geometry = Geometry(size)
+        Geometry.tables[size] = geometry
+    return geometry
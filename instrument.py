@@ -0,0 +1,151 @@
+'''
+Opt-in instrumentation: call counts and wall time of move generation,
+game-over checks, state changes and drawing, and cProfile for one turn.
+
+Nothing is wrapped until enable is called, so a disabled game runs the
+original methods untouched. enable swaps wrappers onto the classes,
+disable puts the originals back. Times are inclusive: find_all_turns
+also counts the find_possible_moves calls it makes.
+'''
+
+import cProfile
+import functools
+import io
+import json
+import pstats
+import time
+
+from bitstate import BitBoardGameState
+from draw import Draw
+from renderer import Renderer
+from state import GameState
+
+
+# (class, method, category) of every method that can be instrumented
+TARGETS = [
+    (GameState, "find_possible_moves", "move generation"),
+    (GameState, "find_all_turns", "move generation"),
+    (BitBoardGameState, "find_possible_moves", "move generation"),
+    (BitBoardGameState, "find_all_turns", "move generation"),
+    (GameState, "who_wins", "game over"),
+    (BitBoardGameState, "who_wins", "game over"),
+    (GameState, "move", "state"),
+    (GameState, "unmake", "state"),
+    (GameState, "update_square", "state"),
+    (BitBoardGameState, "update_square", "state"),
+    (Renderer, "render", "rendering"),
+    (Draw, "draw_empty_square", "rendering"),
+    (Draw, "draw_actual_move", "rendering"),
+    (Draw, "outline_possible_move", "rendering"),
+]
+
+originals = {}  # (class, method) to the original, while enabled
+counters = {}  # "Class.method" to [calls, seconds]
+
+
+def wrap(name, function):
+    '''
+        Function -- wrap
+            A method counting its calls and time, then calling function
+        Parameters:
+            name -- Key of the counter, "Class.method"
+            function -- The original method
+    '''
+    counter = counters.setdefault(name, [0, 0.0])
+
+    @functools.wraps(function)
+    def wrapper(*arguments, **keywords):
+        started = time.perf_counter()
+        try:
+            return function(*arguments, **keywords)
+        finally:
+            counter[0] += 1
+            counter[1] += time.perf_counter() - started
+    return wrapper
+
+
+def enable():
+    '''
+        Function -- enable
+            Put the counting wrappers on every target method
+    '''
+    for cls, method, category in TARGETS:
+        if (cls, method) in originals or method not in cls.__dict__:
+            continue
+        function = cls.__dict__[method]
+        originals[(cls, method)] = function
+        setattr(cls, method, wrap(cls.__name__ + "." + method, function))
+
+
+def disable():
+    '''
+        Function -- disable
+            Put the original methods back; the counters are kept
+    '''
+    for (cls, method), function in originals.items():
+        setattr(cls, method, function)
+    originals.clear()
+
+
+def is_enabled():
+    '''
+        Function -- is_enabled
+            Whether the wrappers are in place
+    '''
+    return len(originals) > 0
+
+
+def reset():
+    '''
+        Function -- reset
+            Set every counter back to zero, e.g. at the start of a game
+    '''
+    for counter in counters.values():
+        counter[0] = 0
+        counter[1] = 0.0
+
+
+def snapshot():
+    '''
+        Function -- snapshot
+            The counters of the methods called so far
+        Returns:
+            A dictionary from "Class.method" to a dictionary of its
+            category, calls and seconds
+    '''
+    categories = dict((cls.__name__ + "." + method, category)
+                      for cls, method, category in TARGETS)
+    return dict((name, {"category": categories[name], "calls": calls,
+                        "seconds": seconds})
+                for name, (calls, seconds) in sorted(counters.items())
+                if calls > 0)
+
+
+def dump(output):
+    '''
+        Function -- dump
+            Write the snapshot as JSON
+        Parameters:
+            output -- A text file open for writing
+    '''
+    json.dump(snapshot(), output, indent=2, sort_keys=True)
+    output.write("\n")
+
+
+def profile(function, *arguments, lines=25):
+    '''
+        Function -- profile
+            Run one call, e.g. the search of a turn, under cProfile
+        Parameters:
+            function -- The function to call
+            arguments -- Its arguments
+            lines -- Number of functions to report
+        Returns:
+            (result of the call, report sorted by cumulative time)
+    '''
+    profiler = cProfile.Profile()
+    result = profiler.runcall(function, *arguments)
+    report = io.StringIO()
+    pstats.Stats(profiler, stream=report).sort_stats(
+        "cumulative").print_stats(lines)
+    return result, report.getvalue()
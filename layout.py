@@ -0,0 +1,135 @@
+'''
+Initial layout of the checkerboard, shared by the graphical game and
+headless tools.
+'''
+import random
+
+from piece import Piece
+
+
+EMPTY = ""
+BLACK = "black"
+RED = "red"
+SIZES = (8, 10, 12)  # Board sizes with a standard layout
+
+
+def make_layout(size=8):
+    '''
+        Function -- make_layout
+            The initial layout of a board size: the men of each side fill
+            the dark squares of their size / 2 - 1 nearest rows, leaving
+            the two middle rows empty. Black starts on row 0.
+        Parameters:
+            size -- Number of squares on each row, an even number
+        Returns:
+            A nested list of EMPTY, BLACK and RED, one list per row
+    '''
+    rows = size // 2 - 1
+    nested_list = []
+    for row in range(size):
+        if row < rows:
+            color = BLACK
+        elif row >= size - rows:
+            color = RED
+        else:
+            color = EMPTY
+        nested_list.append([color if (row + col) % 2 == 1 else EMPTY
+                            for col in range(size)])
+    return nested_list
+
+
+NESTED_LIST = make_layout(8)
+
+
+def initiate_squares(current_state, nested_list):
+    '''
+        Function -- initiate_squares
+            Initiate squares in initial game state, a nested list.
+        Parameter:
+            current_state -- An object of GameState class
+            nested_list -- The game board
+    '''
+    initiate_squares = []
+    for i in range(len(nested_list)):
+        row = nested_list[i]
+        list_in_row = []
+        for j in range(len(row)):
+            col = row[j]
+            if col == EMPTY:
+                list_in_row.append(None)
+            else:
+                piece = Piece(col, False, (i, j))
+                list_in_row.append(piece)
+        initiate_squares.append(list_in_row)
+    current_state.squares = initiate_squares
+
+
+def new_game(state_class, size=8):
+    '''
+        Function -- new_game
+            Create a game state holding the initial layout,
+            black to move.
+        Parameter:
+            state_class -- GameState or a subclass of it
+            size -- Number of squares on each row, one of SIZES
+        Returns:
+            A new object of state_class
+    '''
+    current_state = state_class(BLACK, state_class.INITIAL_STATE, size)
+    initiate_squares(current_state, make_layout(size))
+    current_state.load_current_piece_locations()
+    return current_state
+
+
+def make_position(state_class, player, pieces, size=8):
+    '''
+        Function -- make_position
+            Create a game state holding only the given pieces
+        Parameters:
+            state_class -- GameState or a subclass of it
+            player -- Color of the player to move
+            pieces -- (color, is_king, location) triples
+            size -- Number of squares on each row
+        Returns:
+            A new, loaded object of state_class
+    '''
+    state = state_class(player, state_class.INITIAL_STATE, size)
+    state.squares = [[None] * size for row in range(size)]
+    for color, is_king, location in pieces:
+        state.squares[location[0]][location[1]] = \
+            Piece(color, is_king, location)
+    state.load_current_piece_locations()
+    return state
+
+
+def random_positions(state_class, count, seed=0, min_turns=0, max_turns=40,
+                     min_choices=0, size=8):
+    '''
+        Function -- random_positions
+            Play random games and keep the position each one stops at,
+            for benchmarks and tests. The same seed gives the same
+            positions.
+        Parameters:
+            state_class -- GameState or a subclass of it
+            count -- Number of positions
+            seed -- Seed of the random turns
+            min_turns -- Fewest turns played in a game
+            max_turns -- Most turns played in a game; a game also stops
+            when the player to move has no turn
+            min_choices -- Fewest legal turns a kept position must have
+            size -- Number of squares on each row
+        Returns:
+            A list of loaded states of state_class, without undo records
+    '''
+    rng = random.Random(seed)
+    states = []
+    while len(states) < count:
+        state = new_game(state_class, size)
+        for turn_number in range(rng.randint(min_turns, max_turns)):
+            turns = state.find_all_turns()
+            if len(turns) == 0:
+                break
+            state.make_turn(rng.choice(turns))
+        if len(state.find_all_turns()) >= min_choices:
+            states.append(state.copy())
+    return states
@@ -0,0 +1,120 @@
+'''
+Load generator for server.py: many clients at once, each playing games
+against the computer with random legal moves, reporting the throughput
+and the latency of the requests.
+
+Usage: python loadgen.py [--clients N] [--games G] [--port P]
+'''
+
+import argparse
+import asyncio
+import json
+import random
+import time
+
+
+async def request(reader, writer, message):
+    '''
+        Function -- request
+            Send one request and wait for its answer
+        Parameters:
+            reader -- asyncio StreamReader of the connection
+            writer -- asyncio StreamWriter of the connection
+            message -- The request, a dictionary
+        Returns:
+            The answer, a dictionary
+    '''
+    writer.write((json.dumps(message) + "\n").encode())
+    await writer.drain()
+    return json.loads(await reader.readline())
+
+
+async def run_client(host, port, games, seed, latencies):
+    '''
+        Function -- run_client
+            Play games over one connection
+        Parameters:
+            host -- Address of the server
+            port -- Port of the server
+            games -- Number of games to play
+            seed -- Seed of the random moves and colors
+            latencies -- List collecting the seconds of every request
+        Returns:
+            (games finished, games ended by an error answer)
+    '''
+    rng = random.Random(seed)
+    reader, writer = await asyncio.open_connection(host, port)
+    finished = 0
+    errors = 0
+    try:
+        for game in range(games):
+            started = time.perf_counter()
+            answer = await request(reader, writer, {
+                "op": "new", "color": rng.choice(["black", "red"])})
+            latencies.append(time.perf_counter() - started)
+            session = answer["session"]
+            while answer["ok"] and len(answer["moves"]) > 0:
+                started = time.perf_counter()
+                answer = await request(reader, writer, {
+                    "op": "move", "session": session,
+                    "move": rng.choice(answer["moves"])})
+                latencies.append(time.perf_counter() - started)
+            await request(reader, writer, {"op": "close",
+                                           "session": session})
+            if answer["ok"]:
+                finished += 1
+            else:
+                errors += 1
+    finally:
+        writer.close()
+    return finished, errors
+
+
+async def run_load(host, port, clients, games, seed=0):
+    '''
+        Function -- run_load
+            Run clients at the same time
+        Parameters:
+            host -- Address of the server
+            port -- Port of the server
+            clients -- Number of connections
+            games -- Number of games of each connection
+            seed -- Seed of the first client
+        Returns:
+            (games finished, games ended by an error answer, seconds,
+            sorted request latencies)
+    '''
+    latencies = []
+    started = time.perf_counter()
+    results = await asyncio.gather(*[
+        run_client(host, port, games, seed + index, latencies)
+        for index in range(clients)])
+    elapsed = time.perf_counter() - started
+    return sum(finished for finished, errors in results), \
+        sum(errors for finished, errors in results), elapsed, \
+        sorted(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Play many games against server.py at once.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--clients", type=int, default=100)
+    parser.add_argument("--games", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    arguments = parser.parse_args()
+    games, errors, elapsed, latencies = asyncio.run(run_load(
+        arguments.host, arguments.port, arguments.clients, arguments.games,
+        arguments.seed))
+    print("%d games in %.1f s, %.1f games/s, %.0f requests/s" % (
+        games, elapsed, games / elapsed, len(latencies) / elapsed))
+    print("%d games ended by an error" % errors)
+    for percentile in (50, 90, 99):
+        index = min(len(latencies) - 1, len(latencies) * percentile // 100)
+        print("p%d latency: %.1f ms" % (percentile,
+                                         latencies[index] * 1000))
+
+
+if __name__ == "__main__":
+    main()
@@ -2,34 +2,46 @@
 Check-it-all -- a graphical game of Checkers.
 The program implements the main function of this project
 -- handling both user and computer moves.
+
+Usage: python main.py [board size]
 '''
+import os
+import sys
 import turtle
 from draw import Draw
 from state import GameState
-from piece import Piece
-
-
-NUM_SQUARES = 8  # The number of squares on each row.
+from bitstate import BitBoardGameState
+from engine import Engine
+from evaluation import Evaluator
+from ordering import MoveOrderer
+from clock import Clock
+from transposition import TranspositionTable
+from renderer import Renderer
+from book import OpeningBook
+from ponder import Ponderer
+from layout import BLACK, SIZES, initiate_squares, make_layout
+
+
+NUM_SQUARES = 8  # The number of squares on each row, one of SIZES.
 SQUARE = 50  # The size of each square in the checkerboard.
 SQUARE_COLORS = ("light gray", "white")
+AI_DEPTH = 12  # Most turns the computer looks ahead.
+AI_SECONDS = 1.0  # Thinking time of the computer per turn.
+AI_TABLE_MB = 16  # Memory of the computer's transposition table.
+AI_QUIESCENCE_NODES = 200000  # Most capture nodes past the search depth.
+SLICE_SECONDS = 0.02  # Thinking between two looks at the window events.
+BOOK_PATH = "opening.ckbk"  # Opening book, used when the file exists.
 # PIECE_COLOR = {BLACK: "black", RED: "firebrick"}
-EMPTY = ""
-BLACK = "black"
-RED = "red"
-NESTED_LIST = [
-    [EMPTY, BLACK, EMPTY, BLACK, EMPTY, BLACK, EMPTY, BLACK],
-    [BLACK, EMPTY, BLACK, EMPTY, BLACK, EMPTY, BLACK, EMPTY],
-    [EMPTY, BLACK, EMPTY, BLACK, EMPTY, BLACK, EMPTY, BLACK],
-    [EMPTY, EMPTY, EMPTY, EMPTY, EMPTY, EMPTY, EMPTY, EMPTY],
-    [EMPTY, EMPTY, EMPTY, EMPTY, EMPTY, EMPTY, EMPTY, EMPTY],
-    [RED, EMPTY, RED, EMPTY, RED, EMPTY, RED, EMPTY],
-    [EMPTY, RED, EMPTY, RED, EMPTY, RED, EMPTY, RED],
-    [RED, EMPTY, RED, EMPTY, RED, EMPTY, RED, EMPTY],
-]
 
 
 # Black(User) plays first
-current_state = GameState(BLACK, GameState.INITIAL_STATE)
+current_state = BitBoardGameState(BLACK, GameState.INITIAL_STATE,
+                                  NUM_SQUARES)
+renderer = None  # Created with the window in main
+book = None  # Opened in main if BOOK_PATH exists
+engine = None  # Created in main, keeping its table from turn to turn
+thinking = None  # Search of the computer in progress, if any
+ponderer = None  # Thinks on the user's time, sharing the engine's table
 
 
 def convert_to_index(x, y):
@@ -70,87 +82,80 @@ def convert_to_cartesian(index_pair):
     return (x, y)
 
 
-def initiate_squares(current_state, nested_list):
-    '''
-        Function -- initiate_squares
-            Initiate squares in initial game state, a nested list.
-        Parameter:
-            current_state -- An object of GameState class
-            nested_list -- The game board
-    '''
-    initiate_squares = []
-    for i in range(len(nested_list)):
-        row = nested_list[i]
-        list_in_row = []
-        for j in range(len(row)):
-            col = row[j]
-            if col == EMPTY:
-                list_in_row.append(None)
-            else:
-                piece = Piece(col, False, (i, j))
-                list_in_row.append(piece)
-        initiate_squares.append(list_in_row)
-    current_state.squares = initiate_squares
-
-
-def ai_move(pen, ai_state):
+def ai_move(renderer, ai_state):
     '''
         Function -- ai_move
-            Moves implemented automatically by computer player
+            Start the turn of the computer player. A book turn is played
+            at once; otherwise the search runs in a thread, looked at
+            in short slices on the turtle timer, so the window stays
+            responsive, and the turn is played by think_slice when the
+            search is done.
         Parameters:
-            pen -- An instance of turtle
+            renderer -- An object of Renderer
             ai_state -- An object of GameState representing AI moves
     '''
-    move = None
-    current_player = ai_state.current_player
-    piece_locations = ai_state.piece_locations_by_player[current_player]
-    for piece_location in piece_locations:
-        possible_moves = ai_state.find_possible_moves(piece_location)
-        if len(possible_moves) != 0:
-            # Use the first possible move if it exists
-            move = possible_moves[0]
-            ai_state.possible_moves = possible_moves
-            break
-
-    if move is None:
-        winner = ai_state.get_enemy_color(ai_state.current_player)
-        pen.claim_winner(winner)
+    global thinking
+    if ponderer is not None:
+        ponderer.stop(ai_state)
+    turn = None
+    if book is not None:
+        turn = book.choose(ai_state)
+    if turn is not None or len(ai_state.find_all_turns()) == 0:
+        play_ai_turn(renderer, ai_state, turn)
         return
 
-    while move is not None:
-        origin_xy = convert_to_cartesian(move.start)
-        target_xy = convert_to_cartesian(move.end)
+    thinking = engine.think_steps(ai_state, Clock(per_move=AI_SECONDS),
+                                  SLICE_SECONDS)
+    renderer.screen.ontimer(lambda: think_slice(renderer, ai_state), 0)
 
-        pen.draw_empty_square(origin_xy)
 
-        ai_state.move(move)
-        is_king = ai_state.get_square_by_location(move.end).is_king
+def think_slice(renderer, ai_state):
+    '''
+        Function -- think_slice
+            Let the search of the computer player, which runs in a thread
+            of its own, go on for at most SLICE_SECONDS, then hand control
+            back to the window until the next slice
+        Parameters:
+            renderer -- An object of Renderer
+            ai_state -- An object of GameState representing AI moves
+    '''
+    global thinking
+    try:
+        next(thinking)
+    except StopIteration:
+        thinking = None
+        play_ai_turn(renderer, ai_state, engine.best_turn)
+        return
+    renderer.screen.ontimer(lambda: think_slice(renderer, ai_state), 1)
 
-        pen.draw_actual_move(target_xy, ai_state.current_player, is_king)
 
-        if move.is_capture:
-            captured_xy = convert_to_cartesian(move.captured_location)
-            pen.draw_empty_square(captured_xy)
-            # check if there is next capturing move
-            next_possible_moves = ai_state.find_possible_moves(move.end)
-
-            moves_left = len(next_possible_moves)
-            if moves_left != 0 and \
-                    ai_state.is_valid_move(next_possible_moves[0]):
-                ai_state.possible_moves = next_possible_moves
-                move = next_possible_moves[0]
-            else:
-                move = None
-        else:
-            move = None
+def play_ai_turn(renderer, ai_state, turn):
+    '''
+        Function -- play_ai_turn
+            Play and draw the turn chosen for the computer player
+        Parameters:
+            renderer -- An object of Renderer
+            ai_state -- An object of GameState representing AI moves
+            turn -- An object of Turn, or None when there is no move
+    '''
+    if turn is None:
+        winner = ai_state.get_enemy_color(ai_state.current_player)
+        renderer.pen.claim_winner(winner)
+        return
+
+    for move in turn.moves:
+        renderer.mark(ai_state.move(move))
+    renderer.render(ai_state)
 
     # determine if game is over
     winner = current_state.who_wins()
     if winner is None:
         # end this round for current player
         current_state.next_round()
+        if ponderer is not None:
+            ponderer.start(current_state)
     else:
-        pen.claim_winner(winner)
+        renderer.pen.claim_winner(winner)
 
 
 def click_handler(x, y):
@@ -165,14 +170,26 @@ def click_handler(x, y):
             of function automatically called by Turtle. You will not have
             access to anything returned by this function.
     '''
-    turt = turtle.Turtle()
-    turt.penup()
-    pen = Draw(turt)
+    # The board belongs to the computer while it is thinking
+    if thinking is not None:
+        return
     # Clean up red possible move squares before taking action
-    for move in current_state.possible_moves:
-        cartesian_location = convert_to_cartesian(move.end)
-        pen.outline_possible_move(cartesian_location, "black")
+    renderer.highlight([])
+    try:
+        handle_click(x, y)
+    finally:
+        renderer.render(current_state)
 
+
+def handle_click(x, y):
+    '''
+        Function -- handle_click
+            Select a piece or move the selected one, marking the squares
+            to redraw on the renderer.
+        Parameters:
+            x -- X coordinate of the click
+            y -- Y coordinate of the click
+    '''
     # Convert cartesian coordinate to location in squares
     current_location = convert_to_index(x, y)
 
@@ -190,10 +207,8 @@ def click_handler(x, y):
             return
         current_state.possible_moves = \
             current_state.find_possible_moves(current_location)
-        # Draw the outline of possible moves
-        for move in current_state.possible_moves:
-            cartesian_location = convert_to_cartesian(move.end)
-            pen.outline_possible_move(cartesian_location, "red")
+        # Outline possible moves
+        renderer.highlight(move.end for move in current_state.possible_moves)
     else:
         if not current_state.is_valid_move(move):
             # if the selected move is not valid, gives feedback and return
@@ -201,22 +216,9 @@ def click_handler(x, y):
             return
 
         # move the piece if it is valid move
-        origin_xy = convert_to_cartesian(move.start)
-        target_xy = convert_to_cartesian(move.end)
-        # clean up current square:
-        pen.draw_empty_square(origin_xy)
-
-        current_state.move(move)
-        is_king = current_state.get_square_by_location(move.end).is_king
-
-        # draw moved piece
-        pen.draw_actual_move(target_xy, current_state.current_player, is_king)
+        renderer.mark(current_state.move(move))
 
         if move.is_capture:
-            # remove captured sqaure if it's capturing move
-            captured_xy = convert_to_cartesian(move.captured_location)
-            pen.draw_empty_square(captured_xy)
-
             # check if there are multiple-capture moves
             current_state.possible_moves = \
                 current_state.find_possible_moves(move.end)
@@ -230,12 +232,21 @@ def click_handler(x, y):
         if winner is None:
             # end this round for current player
             current_state.next_round()
-            ai_move(pen, current_state)
+            # show the user's move before the computer thinks
+            renderer.render(current_state)
+            ai_move(renderer, current_state)
         else:
-            pen.claim_winner(winner)
+            renderer.pen.claim_winner(winner)
 
 
 def main():
+    global renderer, book, engine, ponderer, current_state, NUM_SQUARES
+    if len(sys.argv) > 1:
+        NUM_SQUARES = int(sys.argv[1])
+        if NUM_SQUARES not in SIZES:
+            sys.exit("board size must be one of %s" % (SIZES,))
+        current_state = BitBoardGameState(BLACK, GameState.INITIAL_STATE,
+                                          NUM_SQUARES)
     board_size = NUM_SQUARES * SQUARE
     # Create the UI window
     window_size = board_size + SQUARE  # The extra + SQUARE is the margin
@@ -256,18 +267,29 @@ def main():
     # Outline of the board
     corner = -board_size / 2    # Bottom left of checkboard
     pen.setposition(corner, corner)
-    turt = Draw(pen)
+    turt = Draw(pen, NUM_SQUARES)
     turt.draw_square(board_size)
     # Draw & fill the squares
     turt.color_board(corner)
     # Draw all pieces
     turt.draw_orig_pieces(corner)
 
-    initiate_squares(current_state, NESTED_LIST)
+    initiate_squares(current_state, make_layout(NUM_SQUARES))
     current_state.load_current_piece_locations()
+    engine = Engine(AI_DEPTH, table=TranspositionTable(AI_TABLE_MB),
+                    evaluator=Evaluator(), orderer=MoveOrderer(),
+                    quiescence=True,
+                    quiescence_limit=AI_QUIESCENCE_NODES)
+    ponderer = Ponderer(engine.table, AI_DEPTH, evaluator=engine.evaluator,
+                        quiescence=True)
+    if os.path.exists(BOOK_PATH):
+        book = OpeningBook(BOOK_PATH)
 
     # Click handling
     screen = turtle.Screen()
+    # The same pen redraws the changed squares for the whole game
+    renderer = Renderer(turt, screen, convert_to_cartesian)
+    screen.update()
     # This will call call the click_handler function when a click occurs
     screen.onclick(click_handler)
     turtle.done()  # Stops the window from closing.
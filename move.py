@@ -12,6 +12,7 @@ class Move:
             is_capture -- Whether a capture move
             captured_location -- Location where a piece got captured
     '''
+    __slots__ = ("start", "end", "is_capture", "captured_location")
 
     def __init__(self, start, end, is_capture, captured_location):
         self.start = start
@@ -0,0 +1,154 @@
+'''
+Class ordering the turns of a position for alpha-beta search: the best
+turn of the transposition table first, then the killer turns of the ply,
+then the rest by capture length, crowning and history.
+
+Usage: python ordering.py [depth] [positions]
+'''
+
+import sys
+
+from engine import Engine
+from evaluation import Evaluator
+from layout import random_positions
+from state import GameState
+from transposition import TranspositionTable
+
+
+class MoveOrderer:
+    '''
+        Class -- MoveOrderer
+            Remembers which turns caused cutoffs and tries them early in
+            other positions. A turn is known by its code, from its path
+            as Turn.code gives it, so a turn that refuted one position is
+            recognized in its siblings.
+        Attributes:
+            killers -- killers[ply] lists the codes of the latest quiet
+            turns that caused a cutoff at that ply, latest first
+            history -- Dictionary from turn code to the sum of depth *
+            depth of the cutoffs the turn caused
+        Methods:
+            order -- Sort the turns of a position, best first
+            record_cutoff -- Remember a turn that caused a cutoff
+            new_search -- Forget the killers and age the history, once
+            per move
+    '''
+    KILLER_SLOTS = 2
+
+    def __init__(self):
+        '''
+            Constructor -- Creates a new instance of MoveOrderer
+            Parameters:
+                self -- The current MoveOrderer object
+        '''
+        self.killers = []
+        self.history = {}
+
+    def order(self, turns, codes, ply, table_code=None):
+        '''
+            Method -- order
+                Sort the turns of a position, best first: the turn of the
+                table, the killers of the ply, then by the number of
+                pieces captured, crowning and history. Ties keep the
+                order of find_all_turns.
+            Parameters:
+                self -- The current MoveOrderer object
+                turns -- A list of turns of the position
+                codes -- The code of every turn, in the same order
+                ply -- Distance of the position from the root
+                table_code -- Code of the best turn stored in the table
+                for the position, or None
+            Return:
+                A new list of the turns
+        '''
+        killers = self.killers[ply] if ply < len(self.killers) else []
+        history = self.history
+        keys = []
+        for index in range(len(turns)):
+            turn = turns[index]
+            code = codes[index]
+            if code == table_code:
+                keys.append((1, 0, 0, False, 0))
+            else:
+                killer = self.KILLER_SLOTS - killers.index(code) \
+                    if code in killers else 0
+                keys.append((0, killer, len(turn.captured), turn.promotes,
+                             history.get(code, 0)))
+        order = sorted(range(len(turns)), key=keys.__getitem__,
+                       reverse=True)
+        return [turns[index] for index in order]
+
+    def record_cutoff(self, turn, code, ply, depth):
+        '''
+            Method -- record_cutoff
+                Remember a turn whose score reached beta
+            Parameters:
+                self -- The current MoveOrderer object
+                turn -- The turn, an object of Turn
+                code -- Code of the turn
+                ply -- Distance of the position from the root
+                depth -- Remaining depth the position was searched to
+        '''
+        self.history[code] = self.history.get(code, 0) + depth * depth
+        # A capture is forced, so it tells nothing about sibling positions
+        if turn.is_capture:
+            return
+        while len(self.killers) <= ply:
+            self.killers.append([])
+        killers = self.killers[ply]
+        if code in killers:
+            killers.remove(code)
+        killers.insert(0, code)
+        del killers[self.KILLER_SLOTS:]
+
+    def new_search(self):
+        '''
+            Method -- new_search
+                Forget the killers, which belong to the plies of the
+                last move, and halve the history so recent cutoffs weigh
+                the most. Called once per move, so the depths of
+                iterative deepening pass the killers and history on.
+            Parameters:
+                self -- The current MoveOrderer object
+        '''
+        self.killers = []
+        for code in list(self.history):
+            self.history[code] //= 2
+            if self.history[code] == 0:
+                del self.history[code]
+
+
+def main():
+    '''
+        Function -- main
+            Compare the nodes searched to a fixed depth with the table
+            move alone, and with killers and history added, on positions
+            from random games
+    '''
+    depth = int(sys.argv[1]) if len(sys.argv) > 1 else 6
+    positions = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    states = random_positions(GameState, positions, max_turns=30,
+                              min_choices=1)
+
+    totals = {}
+    for name in ("none", "table", "table+killers+history"):
+        totals[name] = 0
+        for state in states:
+            table = None if name == "none" else TranspositionTable(16)
+            orderer = MoveOrderer() if name.endswith("history") else None
+            engine = Engine(depth, table=table, evaluator=Evaluator(),
+                            orderer=orderer)
+            # Iterative deepening, as think does, fills table and history
+            engine.new_move()
+            for iteration in range(1, depth + 1):
+                for step in engine.search_iteration(state, iteration):
+                    pass
+                totals[name] += engine.nodes
+        print("%-22s %9d nodes" % (name, totals[name]))
+    print("killers and history save %.0f%% of the nodes of the table "
+          "move alone" % (100 - 100.0 * totals["table+killers+history"] /
+                          totals["table"]))
+
+
+if __name__ == "__main__":
+    main()
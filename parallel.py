@@ -0,0 +1,233 @@
+'''
+Class splitting the search of the computer player over a pool of
+processes, one root turn per task.
+
+Usage: python parallel.py [depth] [positions]
+'''
+
+import multiprocessing
+import sys
+import time
+
+from engine import Engine
+from evaluation import Evaluator
+from layout import random_positions
+from ordering import MoveOrderer
+from state import GameState
+from transposition import TranspositionTable
+
+
+worker_engine = None  # Engine of a worker process, kept between tasks
+
+
+def make_engine(depth, table_mb, evaluate, order, quiescence):
+    '''
+        Function -- make_engine
+            An engine with its own transposition table, set up like the
+            engine of the game unless told otherwise
+        Parameters:
+            depth -- Number of turns to look ahead
+            table_mb -- Memory cap of the table, in MB
+            evaluate -- Whether to score by Evaluator rather than by
+            material alone
+            order -- Whether to order turns by killers and history
+            quiescence -- Whether to play out the captures pending at the
+            leaves
+    '''
+    return Engine(depth, table=TranspositionTable(table_mb),
+                  evaluator=Evaluator() if evaluate else None,
+                  orderer=MoveOrderer() if order else None,
+                  quiescence=quiescence)
+
+
+def start_worker(table_mb, evaluate, order, quiescence):
+    '''
+        Function -- start_worker
+            Give a worker process its engine and transposition table
+        Parameters:
+            table_mb -- Memory cap of the table, in MB
+            evaluate -- Whether to score by Evaluator
+            order -- Whether to order turns by killers and history
+            quiescence -- Whether to play out pending captures
+    '''
+    global worker_engine
+    worker_engine = make_engine(None, table_mb, evaluate, order, quiescence)
+
+
+def search_turn(task):
+    '''
+        Function -- search_turn
+            Score one root turn in a worker process
+        Parameters:
+            task -- (state, index, depth, alpha): the root position, the
+            index of the turn in its find_all_turns, the search depth and
+            the best score of the root so far
+        Returns:
+            (index, score, nodes); the score is exact when it is above
+            alpha, and only an upper bound otherwise
+    '''
+    state, index, depth, alpha = task
+    if worker_engine.evaluator is not None:
+        worker_engine.evaluator.prepare(state)
+    state.make_turn(state.find_all_turns()[index])
+    worker_engine.new_move()
+    worker_engine.nodes = 0
+    score = -worker_engine.negamax(state, depth - 1, -Engine.WIN_SCORE - 1,
+                                   -alpha, 1)
+    return index, score, worker_engine.nodes
+
+
+class ParallelSearch:
+    '''
+        Class -- ParallelSearch
+            Root splitting: the first root turn is searched here to get a
+            score to beat, then the other root turns are searched at once
+            by the processes of a pool, each with its own table. It finds
+            the same score as Engine.search at the same depth and with
+            the same evaluation, ordering and quiescence.
+        Attributes:
+            depth -- Number of turns to look ahead
+            processes -- Number of worker processes
+            engine -- Engine searching the first root turn
+            pool -- The pool of worker processes
+            nodes -- Number of nodes visited by the last search, in all
+            processes
+            elapsed -- Seconds spent by the last search
+            score -- Score of the best turn, for the side to move
+            best_turn -- Best turn found by the last search
+        Methods:
+            search -- Find the best turn for the current player
+            close -- Shut the pool down
+    '''
+
+    def __init__(self, depth=6, processes=None, table_mb=16, evaluate=True,
+                 order=True, quiescence=True):
+        '''
+            Constructor -- Creates a new instance of ParallelSearch
+            Parameters:
+                self -- The current ParallelSearch object
+                depth -- Number of turns to look ahead
+                processes -- Number of worker processes; all cores if None
+                table_mb -- Memory cap of the table of every process
+                evaluate -- Whether to score by Evaluator, as the game
+                does, rather than by material alone
+                order -- Whether to order turns by killers and history,
+                as the game does
+                quiescence -- Whether to play out the captures pending at
+                the leaves, as the game does
+        '''
+        self.depth = depth
+        self.processes = processes or multiprocessing.cpu_count()
+        self.engine = make_engine(depth, table_mb, evaluate, order,
+                                  quiescence)
+        self.pool = multiprocessing.Pool(
+            self.processes, initializer=start_worker,
+            initargs=(table_mb, evaluate, order, quiescence))
+        self.nodes = 0
+        self.elapsed = 0.0
+        self.score = -Engine.WIN_SCORE
+        self.best_turn = None
+
+    def search(self, state):
+        '''
+            Method -- search
+                Find the best turn for the current player of a state,
+                which is left as it was found
+            Parameters:
+                self -- The current ParallelSearch object
+                state -- An object of GameState
+            Return:
+                The best turn, an object of Turn; None if there is no move
+        '''
+        started = time.perf_counter()
+        self.engine.new_move()
+        if self.engine.evaluator is not None:
+            self.engine.evaluator.prepare(state)
+        turns = state.find_all_turns()
+        ordered = self.engine.order_turns(state, turns)
+        self.best_turn = None
+        self.score = -Engine.WIN_SCORE
+        self.nodes = 0
+        if len(turns) == 0:
+            self.elapsed = time.perf_counter() - started
+            return None
+
+        # The first turn gives the score the others have to beat
+        self.engine.nodes = 0
+        state.make_turn(ordered[0])
+        self.score = -self.engine.negamax(
+            state, self.depth - 1, -Engine.WIN_SCORE - 1,
+            Engine.WIN_SCORE + 1, 1)
+        state.unmake_turn(ordered[0])
+        self.best_turn = ordered[0]
+        self.nodes = self.engine.nodes
+
+        root = state.copy()
+        tasks = [(root, turns.index(turn), self.depth, self.score)
+                 for turn in ordered[1:]]
+        for index, score, nodes in self.pool.imap_unordered(search_turn,
+                                                            tasks):
+            self.nodes += nodes
+            if score > self.score:
+                self.score = score
+                self.best_turn = turns[index]
+
+        self.engine.table.store(
+            state.hash_key, self.depth,
+            self.engine.score_to_table(self.score, 0),
+            TranspositionTable.EXACT,
+            self.best_turn.code(len(state.squares)))
+        self.elapsed = time.perf_counter() - started
+        return self.best_turn
+
+    def close(self):
+        '''
+            Method -- close
+                Shut the pool down
+            Parameters:
+                self -- The current ParallelSearch object
+        '''
+        self.pool.close()
+        self.pool.join()
+
+
+def main():
+    '''
+        Function -- main
+            Time the search of the same positions with 1, 2, 4, ...
+            processes up to the number of cores, and report the speedup
+            and efficiency of each against the single engine
+    '''
+    depth = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    positions = random_positions(GameState, count, min_turns=2,
+                                 max_turns=12, min_choices=2)
+
+    started = time.perf_counter()
+    for state in positions:
+        make_engine(depth, 16, True, True, True).search(state)
+    single = time.perf_counter() - started
+    cores = multiprocessing.cpu_count()
+    print("%d cores, depth %d, %d positions" % (cores, depth, count))
+    print("engine: %.2f s" % single)
+    if cores == 1:
+        print("one core: the processes share it, so no speedup can show")
+
+    processes = 1
+    while True:
+        search = ParallelSearch(depth, processes)
+        started = time.perf_counter()
+        for state in positions:
+            search.search(state)
+        elapsed = time.perf_counter() - started
+        search.close()
+        print("%d processes: %.2f s, speedup %.2f, efficiency %.0f%%" % (
+            processes, elapsed, single / elapsed,
+            100 * single / elapsed / processes))
+        if processes >= cores:
+            break
+        processes = min(processes * 2, cores)
+
+
+if __name__ == "__main__":
+    main()
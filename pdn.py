@@ -0,0 +1,303 @@
+'''
+Reading and writing games in PDN, the Portable Draughts Notation.
+
+Squares are numbered 1 to 32 over the dark squares, row by row from row 0,
+so Black starts on 1 to 12 and moves first, as in English draughts. The
+red pieces of this game are White in PDN. Results are from Black's side:
+"1-0" Black won, "0-1" White won, "1/2-1/2" a draw.
+
+Larger boards number their dark squares the same way. Their games carry
+the board size in the width and height fields of the GameType tag, as
+[GameType "21,B,10,10"]; a game without them is played on 8x8.
+
+Games are read one at a time from any iterable of lines, so a file of any
+size is never loaded whole. A game is a dictionary with the same "winner",
+"moves" and "size" keys as the results of selfplay, plus "tags" and
+"result".
+
+Usage: python pdn.py GAMES.pdn
+       python pdn.py GAMES.jsonl OUTPUT.pdn
+'''
+
+import json
+import re
+import sys
+import time
+
+from layout import BLACK, RED, new_game
+from state import GameState
+
+
+RESULTS = {"1-0": BLACK, "2-0": BLACK, "0-1": RED, "0-2": RED,
+           "1/2-1/2": None, "1-1": None, "*": None}
+TAG = re.compile(r'\[\s*(\w+)\s+"(.*)"\s*\]')
+TOKEN = re.compile(r'[{}()]|[^\s{}()]+')
+MOVE_NUMBER = re.compile(r'^\d+\.+')
+MOVE = re.compile(r'^\d+(?:[-x:]\d+)+$')
+LINE_WIDTH = 79
+
+
+def square_number(location, size=8):
+    '''
+        Function -- square_number
+            PDN number of a dark square
+        Parameters:
+            location -- A (row, col) pair
+            size -- Number of squares on each row
+    '''
+    return location[0] * (size // 2) + location[1] // 2 + 1
+
+
+def square_location(number, size=8):
+    '''
+        Function -- square_location
+            Location of the dark square with a PDN number
+        Parameters:
+            number -- Square number, from 1
+            size -- Number of squares on each row
+    '''
+    row, index = divmod(number - 1, size // 2)
+    return (row, 2 * index + 1 - row % 2)
+
+
+def format_path(path, size=8):
+    '''
+        Function -- format_path
+            PDN text of a turn: "11-15" for a step, "22x15x6" for a capture
+        Parameters:
+            path -- Locations the piece passes, from start to end
+            size -- Number of squares on each row
+    '''
+    separator = "x" if abs(path[1][0] - path[0][0]) == 2 else "-"
+    return separator.join(str(square_number(location, size))
+                          for location in path)
+
+
+def parse_path(text, size=8):
+    '''
+        Function -- parse_path
+            Locations of a PDN move
+        Parameters:
+            text -- A move such as "11-15" or "22x15x6"
+            size -- Number of squares on each row
+    '''
+    return [square_location(int(number), size)
+            for number in re.split(r'[-x:]', text)]
+
+
+def game_size(tags, size=8):
+    '''
+        Function -- game_size
+            Board size of a game, from the width field of its GameType
+            tag
+        Parameters:
+            tags -- Dictionary of PDN tags
+            size -- Number of squares on each row when the tag has none
+    '''
+    fields = tags.get("GameType", "").split(",")
+    if len(fields) >= 4 and fields[2].strip().isdigit():
+        return int(fields[2])
+    return size
+
+
+def make_game(tags, moves, result, size=8):
+    '''
+        Function -- make_game
+            A game dictionary from what the parser collected
+        Parameters:
+            tags -- Dictionary of PDN tags
+            moves -- Paths of the turns
+            result -- Result token, or None if the game had none
+            size -- Number of squares on each row
+    '''
+    if result is None:
+        result = tags.get("Result", "*")
+    return {"tags": tags, "moves": moves, "result": result,
+            "winner": RESULTS.get(result), "size": size}
+
+
+def read_games(lines, size=8):
+    '''
+        Function -- read_games
+            Parse PDN games one by one. Comments, variations, move
+            numbers and move strength marks are skipped.
+        Parameters:
+            lines -- An iterable of text lines, such as an open file
+            size -- Number of squares on each row of the games without
+            a GameType tag giving it
+        Returns:
+            A generator of game dictionaries
+    '''
+    tags = {}
+    moves = []
+    comment = False
+    variation = 0
+    for line in lines:
+        if not comment and variation == 0 and line.lstrip().startswith("["):
+            if len(moves) > 0:
+                # A game without a result ends where the next one starts
+                yield make_game(tags, moves, None, game_size(tags, size))
+                tags = {}
+                moves = []
+            for name, value in TAG.findall(line):
+                tags[name] = value
+            continue
+        for token in TOKEN.findall(line):
+            if comment:
+                comment = token != "}"
+            elif token == "{":
+                comment = True
+            elif token == "(":
+                variation += 1
+            elif token == ")":
+                variation -= 1
+            elif variation > 0:
+                continue
+            elif token in RESULTS:
+                yield make_game(tags, moves, token, game_size(tags, size))
+                tags = {}
+                moves = []
+            else:
+                token = MOVE_NUMBER.sub("", token).rstrip("!?*")
+                if MOVE.match(token):
+                    moves.append(parse_path(token, game_size(tags, size)))
+    if len(moves) > 0 or len(tags) > 0:
+        yield make_game(tags, moves, None, game_size(tags, size))
+
+
+def write_game(output, game, size=None):
+    '''
+        Function -- write_game
+            Write one game as PDN
+        Parameters:
+            output -- A text file open for writing
+            game -- A game dictionary; only "moves" is required. Tags
+            missing from "tags" are filled in.
+            size -- Number of squares on each row; the "size" of the
+            game, or 8, if None
+    '''
+    if size is None:
+        size = game.get("size", 8)
+    result = game.get("result")
+    if result is None:
+        result = {BLACK: "1-0", RED: "0-1", None: "1/2-1/2"}[
+            game.get("winner")]
+    tags = {"Event": "?", "Black": "?", "White": "?"}
+    tags.update(game.get("tags", {}))
+    if size != 8:
+        tags["GameType"] = "21,B,%d,%d" % (size, size)
+    tags["Result"] = result
+    for name, value in tags.items():
+        output.write('[%s "%s"]\n' % (name, value.replace('"', "'")))
+
+    line = ""
+    words = []
+    for index, path in enumerate(game["moves"]):
+        if index % 2 == 0:
+            words.append("%d." % (index // 2 + 1))
+        words.append(format_path(path, size))
+    words.append(result)
+    for word in words:
+        if len(line) + 1 + len(word) > LINE_WIDTH:
+            output.write(line + "\n")
+            line = word
+        else:
+            line = word if line == "" else line + " " + word
+    output.write(line + "\n\n")
+
+
+def must_capture(state):
+    '''
+        Function -- must_capture
+            Whether any piece of the current player can capture
+        Parameters:
+            state -- An object of GameState
+    '''
+    for location in state.piece_locations_by_player[state.current_player]:
+        moves = state.find_possible_moves(location)
+        if len(moves) > 0 and moves[0].is_capture:
+            return True
+    return False
+
+
+def replay(moves, state=None, size=8):
+    '''
+        Function -- replay
+            Play the turns of a game from the start, checking every step
+            with is_valid_move the way clicks on the board are checked,
+            and that captures are taken when any piece can capture and
+            followed to the end. A capture written with its start and end
+            squares only is matched against the legal turns.
+        Parameters:
+            moves -- Paths of the turns
+            state -- An object of GameState to play on; a new game if None
+            size -- Number of squares on each row of the new game
+        Returns:
+            The state after the last turn
+    '''
+    if state is None:
+        state = new_game(GameState, size)
+    for number, path in enumerate(moves, 1):
+        start = path[0]
+        piece = state.get_square_by_location(start) \
+            if state.is_in_bounds(start) else None
+        if piece is None or piece.color != state.current_player:
+            raise ValueError("turn %d: no piece of %s on %s" % (
+                number, state.current_player, start))
+        rows = abs(path[1][0] - start[0])
+        cols = abs(path[1][1] - start[1])
+        if len(path) == 2 and (rows > 2 or rows != cols):
+            matches = [turn.path for turn in state.find_all_turns()
+                       if turn.start == start and turn.end == path[1]]
+            if len(matches) != 1:
+                raise ValueError("turn %d: cannot resolve capture %s" % (
+                    number, path))
+            path = matches[0]
+
+        state.possible_moves = state.find_possible_moves(start)
+        forced = must_capture(state)
+        for end in path[1:]:
+            move = state.get_move_by_end_location(end)
+            if move is None or not state.is_valid_move(move) or \
+                    (forced and not move.is_capture):
+                raise ValueError("turn %d: illegal move to %s" % (
+                    number, end))
+            state.move(move)
+            state.possible_moves = state.find_possible_moves(end) \
+                if move.is_capture else []
+        if state.has_capturing_move():
+            raise ValueError("turn %d: capture not finished" % number)
+        state.next_round()
+    # Nothing takes these turns back
+    state.undo_stack = []
+    return state
+
+
+def main():
+    if len(sys.argv) > 2:
+        with open(sys.argv[1]) as games, open(sys.argv[2], "w") as output:
+            for line in games:
+                write_game(output, json.loads(line))
+        return
+
+    path = sys.argv[1] if len(sys.argv) > 1 else "games.pdn"
+    games = 0
+    turns = 0
+    illegal = 0
+    started = time.perf_counter()
+    with open(path) as source:
+        for game in read_games(source):
+            games += 1
+            turns += len(game["moves"])
+            try:
+                replay(game["moves"], size=game["size"])
+            except ValueError as error:
+                illegal += 1
+                print("game %d: %s" % (games, error))
+    elapsed = time.perf_counter() - started
+    print("%d games, %d turns, %d illegal, %.0f games/s" % (
+        games, turns, illegal, games / max(elapsed, 1e-9)))
+
+
+if __name__ == "__main__":
+    main()
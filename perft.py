@@ -0,0 +1,221 @@
+'''
+Perft -- count the leaves of the game tree to a fixed depth, to check move
+generation against known counts and to measure its speed.
+A leaf is a complete turn, so a multi-jump counts once.
+
+Usage: python perft.py [depth] [position name] [--bitboard] [--masks]
+                       [--compare] [--size=N]
+--bitboard plays the turns on a BitBoardGameState, --masks plays them on
+the masks of a BitBoard alone, and --compare times all three at the last
+depth. --size sets the board size of the start position, 8, 10 or 12.
+'''
+
+import sys
+import time
+
+from layout import BLACK, RED, new_game, initiate_squares
+from state import GameState
+from bitstate import BitBoardGameState
+
+
+# Stored positions: the player to move and the board, one string per row.
+# b and r are black and red men, B and R kings, . an empty square.
+POSITIONS = {
+    "kings": (RED, [
+        ".B......",
+        "........",
+        "...r....",
+        "........",
+        ".....B..",
+        "........",
+        "...R....",
+        "R.......",
+    ]),
+    "multi_jump": (BLACK, [
+        ".b...b..",
+        "..r.r...",
+        "........",
+        "..r.r.r.",
+        "........",
+        "..r.r...",
+        "........",
+        "r.....R.",
+    ]),
+    "crowning_capture": (BLACK, [
+        "........",
+        "........",
+        ".......r",
+        "b.......",
+        "........",
+        "..b.....",
+        "...r.r..",
+        "R.......",
+    ]),
+}
+
+# Known leaf counts by depth, starting at depth 1. The initial position
+# agrees with the published perft counts of English draughts.
+KNOWN_COUNTS = {
+    "start": [7, 49, 302, 1469, 7361, 36768, 179740, 845931],
+    "kings": [7, 32, 174, 823, 4838, 24249],
+    "multi_jump": [4, 40, 60, 368, 1179, 8773],
+    "crowning_capture": [1, 2, 10, 40, 170, 584],
+}
+
+
+def load_position(name, state_class=GameState, size=8):
+    '''
+        Function -- load_position
+            Build the start position or a stored position
+        Parameters:
+            name -- "start" or a key of POSITIONS
+            state_class -- GameState or a subclass of it
+            size -- Number of squares on each row of the start position
+        Returns:
+            A loaded state of state_class
+    '''
+    if name == "start":
+        return new_game(state_class, size)
+    player, rows = POSITIONS[name]
+    nested_list = []
+    for row in rows:
+        nested_list.append([{".": "", "b": BLACK, "B": BLACK, "r": RED,
+                             "R": RED}[char] for char in row])
+    state = state_class(player, state_class.MOVE_STATE)
+    initiate_squares(state, nested_list)
+    for row_index, row in enumerate(rows):
+        for col_index, char in enumerate(row):
+            if char in "BR":
+                state.squares[row_index][col_index].is_king = True
+    state.load_current_piece_locations()
+    return state
+
+
+def perft(state, depth):
+    '''
+        Function -- perft
+            Count the turn sequences of a given length from a position
+        Parameters:
+            state -- An object of GameState, left as it was found
+            depth -- Number of turns
+    '''
+    if depth == 0:
+        return 1
+    turns = state.find_all_turns()
+    if depth == 1:
+        return len(turns)
+    leaves = 0
+    for turn in turns:
+        state.make_turn(turn)
+        leaves += perft(state, depth - 1)
+        state.unmake_turn(turn)
+    return leaves
+
+
+def mask_perft(board, color, depth):
+    '''
+        Function -- mask_perft
+            perft on the masks of a BitBoard alone: making a turn is
+            setting the masks of a child position and taking it back is
+            setting the saved masks again, with no squares, hash or
+            undo records to keep up to date. The last turn is counted,
+            not played.
+        Parameters:
+            board -- An object of BitBoard, left as it was found
+            color -- Color of the side to move
+            depth -- Number of turns
+    '''
+    if depth == 0:
+        return 1
+    if depth == 1:
+        return board.count_turns(color)
+    children = board.children(color)
+    saved = (board.black, board.red, board.kings)
+    other = RED if color == BLACK else BLACK
+    leaves = 0
+    for board.black, board.red, board.kings in children:
+        leaves += mask_perft(board, other, depth - 1)
+    board.black, board.red, board.kings = saved
+    return leaves
+
+
+def time_perft(name, size, depth, method):
+    '''
+        Function -- time_perft
+            Count the leaves of a position one way and time it
+        Parameters:
+            name -- "start" or a key of POSITIONS
+            size -- Number of squares on each row of the start position
+            depth -- Number of turns
+            method -- "state", "bitboard" or "masks"
+        Returns:
+            (leaves, seconds)
+    '''
+    state_class = GameState if method == "state" else BitBoardGameState
+    state = load_position(name, state_class, size)
+    started = time.perf_counter()
+    if method == "masks":
+        leaves = mask_perft(state.board, state.current_player, depth)
+    else:
+        leaves = perft(state, depth)
+    return leaves, time.perf_counter() - started
+
+
+def divide(state, depth):
+    '''
+        Function -- divide
+            Perft of each turn from a position, to narrow down where two
+            move generators disagree
+        Parameters:
+            state -- An object of GameState, left as it was found
+            depth -- Number of turns, counting the first one
+        Returns:
+            A list of (path, leaves) pairs
+    '''
+    counts = []
+    for turn in state.find_all_turns():
+        state.make_turn(turn)
+        counts.append((turn.path, perft(state, depth - 1)))
+        state.unmake_turn(turn)
+    return counts
+
+
+def main():
+    arguments = [argument for argument in sys.argv[1:]
+                 if not argument.startswith("--")]
+    method = "state"
+    if "--bitboard" in sys.argv:
+        method = "bitboard"
+    if "--masks" in sys.argv:
+        method = "masks"
+    size = 8
+    for argument in sys.argv[1:]:
+        if argument.startswith("--size="):
+            size = int(argument[len("--size="):])
+    depth = int(arguments[0]) if len(arguments) > 0 else 6
+    name = arguments[1] if len(arguments) > 1 else "start"
+    known = KNOWN_COUNTS.get(name, []) if size == 8 else []
+
+    if "--compare" in sys.argv:
+        base = None
+        for method in ("state", "bitboard", "masks"):
+            leaves, elapsed = time_perft(name, size, depth, method)
+            base = base or elapsed
+            print("%-8s depth %d: %d leaves, %.2f s, %.0f leaves/s, "
+                  "speedup %.1f" % (method, depth, leaves, elapsed,
+                                    leaves / max(elapsed, 1e-9),
+                                    base / max(elapsed, 1e-9)))
+        return
+
+    for current in range(1, depth + 1):
+        leaves, elapsed = time_perft(name, size, current, method)
+        check = ""
+        if current <= len(known):
+            check = "ok" if known[current - 1] == leaves else \
+                "MISMATCH, expected %d" % known[current - 1]
+        print("depth %d: %d leaves, %.0f leaves/s %s" % (
+            current, leaves, leaves / max(elapsed, 1e-9), check))
+
+
+if __name__ == "__main__":
+    main()
@@ -13,10 +13,13 @@ class Piece:
         Methods:
             find_direction -- Helper function
     '''
+    __slots__ = ("color", "is_king", "location", "directions")
+
     BLACK = "black"
     RED = "red"
     BLACK_MOVES = [(1, -1), (1, 1)]
     RED_MOVES = [(-1, -1), (-1, 1)]
+    KING_MOVES = RED_MOVES + BLACK_MOVES
 
     def __init__(self, color, is_king, location):
         self.color = color
@@ -30,4 +33,4 @@ class Piece:
                 return Piece.BLACK_MOVES
             else:
                 return Piece.RED_MOVES
-        return Piece.RED_MOVES + Piece.BLACK_MOVES
+        return Piece.KING_MOVES
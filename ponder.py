@@ -0,0 +1,184 @@
+'''
+Class thinking ahead on the opponent's time.
+
+Usage: python ponder.py [positions] [ponder seconds] [depth]
+'''
+
+import sys
+import threading
+import time
+
+from clock import Clock
+from engine import Engine
+from layout import random_positions
+from state import GameState
+from transposition import TranspositionTable
+
+
+class Ponderer:
+    '''
+        Class -- Ponderer
+            While the user decides on a turn, guess the reply and search
+            the position after it in a background thread. The search
+            fills the transposition table shared with the engine of the
+            computer, so when the guess is right the next search finds
+            most of its work already done.
+        Attributes:
+            table -- TranspositionTable shared with the computer's engine
+            depth -- Deepest search while pondering
+            predict_depth -- Depth of the search guessing the reply
+            seconds -- Longest time spent pondering one position
+            evaluator -- Evaluator of the computer's engine, or None
+            quiescence -- Whether the computer's engine plays out the
+            captures at its leaves
+            engine -- Engine of the current pondering, or None
+            thread -- Thread of the current pondering, or None
+            predicted_key -- Hash key of the position being pondered
+            hits -- Number of times the guess was right
+            misses -- Number of times the guess was wrong
+        Methods:
+            start -- Start pondering on a copy of a position
+            ponder -- Guess the reply and search after it, in the thread
+            stop -- Stop pondering and wait for the thread
+    '''
+
+    def __init__(self, table, depth=12, predict_depth=3, seconds=60.0,
+                 evaluator=None, quiescence=False):
+        '''
+            Constructor -- Creates a new instance of Ponderer
+            Parameters:
+                self -- The current Ponderer object
+                table -- TranspositionTable of the computer's engine
+                depth -- Deepest search while pondering
+                predict_depth -- Depth of the search guessing the reply
+                seconds -- Longest time spent pondering one position
+                evaluator -- Evaluator of the computer's engine, so the
+                scores put in the shared table agree with its own
+                quiescence -- Whether the computer's engine plays out the
+                captures at its leaves, for the same reason
+        '''
+        self.table = table
+        self.depth = depth
+        self.predict_depth = predict_depth
+        self.seconds = seconds
+        self.evaluator = evaluator
+        self.quiescence = quiescence
+        self.engine = None
+        self.thread = None
+        self.predicted_key = None
+        self.hits = 0
+        self.misses = 0
+
+    def start(self, state):
+        '''
+            Method -- start
+                Start pondering on a position with the user to move. The
+                thread works on its own copy, so the state may change
+                while it runs.
+            Parameters:
+                self -- The current Ponderer object
+                state -- An object of GameState, the user to move
+        '''
+        self.stop()
+        self.engine = Engine(self.depth, table=self.table,
+                             evaluator=self.evaluator,
+                             quiescence=self.quiescence)
+        self.predicted_key = None
+        self.thread = threading.Thread(
+            target=self.ponder, args=(state.copy(), self.engine),
+            daemon=True)
+        self.thread.start()
+
+    def ponder(self, state, engine):
+        '''
+            Method -- ponder
+                Body of the thread: guess the reply with a short search,
+                play it and think on the position after it until stopped
+            Parameters:
+                self -- The current Ponderer object
+                state -- The copy of the position to ponder on
+                engine -- Engine doing the thinking, stopped by stop
+        '''
+        guess = Engine(self.predict_depth, table=self.table,
+                       evaluator=self.evaluator, quiescence=self.quiescence)
+        reply = guess.search(state)
+        if reply is None or engine.stopped:
+            return
+        state.make_turn(reply)
+        self.predicted_key = state.hash_key
+        engine.think(state, Clock(per_move=self.seconds))
+
+    def stop(self, state=None):
+        '''
+            Method -- stop
+                Stop the pondering in progress, if any, and wait until
+                its thread is done; it never takes longer than a few
+                hundred nodes
+            Parameters:
+                self -- The current Ponderer object
+                state -- The position the computer is about to search,
+                or None
+            Return:
+                Whether the position is the one pondered on
+        '''
+        if self.thread is None:
+            return False
+        self.engine.stop()
+        self.thread.join()
+        self.thread = None
+        if state is None:
+            return False
+        if state.hash_key == self.predicted_key:
+            self.hits += 1
+            return True
+        self.misses += 1
+        return False
+
+
+def main():
+    '''
+        Function -- main
+            Measure how much pondering shortens the computer's search.
+            For positions from random games, time a search to a fixed
+            depth with a fresh table, then again after pondering on the
+            position before it with the same reply guessed right.
+    '''
+    positions = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 1.0
+    depth = int(sys.argv[3]) if len(sys.argv) > 3 else 10
+    cold_total = 0.0
+    warm_total = 0.0
+    measured = 0
+    states = random_positions(GameState, positions, min_turns=4,
+                              max_turns=16, min_choices=1)
+    for index, state in enumerate(states):
+        engine = Engine(depth, table=TranspositionTable(16))
+        reply = Engine(3, table=engine.table).search(state.copy())
+        if reply is None:
+            continue
+        after = state.copy()
+        after.make_turn(reply)
+        started = time.perf_counter()
+        engine.search(after)
+        cold = time.perf_counter() - started
+
+        engine = Engine(depth, table=TranspositionTable(16))
+        ponderer = Ponderer(engine.table, depth=depth + 4)
+        ponderer.start(state)
+        time.sleep(seconds)
+        hit = ponderer.stop(after)
+        started = time.perf_counter()
+        engine.search(after)
+        warm = time.perf_counter() - started
+        cold_total += cold
+        warm_total += warm
+        measured += 1
+        print("position %d: %.4f s cold, %.4f s after pondering%s" % (
+            index, cold, warm, "" if hit else " (guess missed)"))
+    if measured > 0:
+        print("average: %.4f s cold, %.4f s after pondering" % (
+            cold_total / measured, warm_total / measured))
+
+
+if __name__ == "__main__":
+    main()
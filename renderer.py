@@ -0,0 +1,82 @@
+'''
+Class redrawing only the squares of the checkerboard that changed.
+'''
+
+
+class Renderer:
+    '''
+        Class -- Renderer
+            Owns the one pen of the game and keeps track of the squares
+            changed since the last frame. A frame redraws only those
+            squares, then updates the screen once.
+        Attributes:
+            pen -- An object of Draw, used for all drawing
+            screen -- The turtle screen, updated once per frame
+            to_cartesian -- Function converting a location to (x, y)
+            dirty -- Locations to redraw in the next frame
+            highlighted -- Locations outlined as possible moves
+        Methods:
+            mark -- Mark squares as changed
+            highlight -- Outline possible moves, dropping older outlines
+            render -- Redraw the changed squares and update the screen
+    '''
+
+    def __init__(self, pen, screen, to_cartesian):
+        '''
+            Constructor -- Creates a new instance of Renderer
+            Parameters:
+                self -- The current Renderer object
+                pen -- An object of Draw
+                screen -- The turtle screen
+                to_cartesian -- Function converting a location to (x, y)
+        '''
+        self.pen = pen
+        self.screen = screen
+        self.to_cartesian = to_cartesian
+        self.dirty = set()
+        self.highlighted = set()
+
+    def mark(self, locations):
+        '''
+            Method -- mark
+                Mark squares as changed, e.g. the result of GameState.move
+            Parameters:
+                self -- The current Renderer object
+                locations -- Locations whose square changed
+        '''
+        self.dirty.update(locations)
+
+    def highlight(self, locations):
+        '''
+            Method -- highlight
+                Outline a new set of possible moves. Squares outlined
+                before are redrawn without their outline.
+            Parameters:
+                self -- The current Renderer object
+                locations -- Locations to outline
+        '''
+        locations = set(locations)
+        self.dirty.update(self.highlighted ^ locations)
+        self.highlighted = locations
+
+    def render(self, state):
+        '''
+            Method -- render
+                Redraw every changed square from the game state,
+                then update the screen once.
+            Parameters:
+                self -- The current Renderer object
+                state -- An object of GameState
+        '''
+        if len(self.dirty) == 0:
+            return
+        for location in self.dirty:
+            pair = self.to_cartesian(location)
+            self.pen.draw_empty_square(pair)
+            square = state.get_square_by_location(location)
+            if square is not None:
+                self.pen.draw_actual_move(pair, square.color, square.is_king)
+            if location in self.highlighted:
+                self.pen.outline_possible_move(pair, "red")
+        self.dirty = set()
+        self.screen.update()
@@ -0,0 +1,196 @@
+'''
+Headless engine-versus-engine games, played in parallel by a pool of
+processes. Results and move lists are written to a JSON lines file.
+
+Usage: python selfplay.py GAMES [--processes N] [--depth D] [--output PATH]
+'''
+
+import argparse
+import json
+import multiprocessing
+import random
+import time
+
+from bitstate import BitBoardGameState
+from clock import Clock
+from engine import Engine
+from evaluation import Evaluator
+import instrument
+from layout import SIZES, new_game
+from ordering import MoveOrderer
+from state import GameState
+from tablebase import Tablebase
+from transposition import TranspositionTable
+
+
+def play_game(seed, depth=4, node_limit=None, random_turns=4,
+              max_turns=200, table_mb=8, tablebase_path=None,
+              seconds=None, instrumented=False, size=8, evaluate=True,
+              order=True, quiescence=True, bitboard=True):
+    '''
+        Function -- play_game
+            Play one engine-versus-engine game without any drawing.
+            The first turns are picked at random so that games differ;
+            the same seed always gives the same game. A game is drawn when
+            a position occurs a third time or after max_turns turns.
+        Parameters:
+            seed -- Seed of the random opening turns
+            depth -- Search depth of the engine
+            node_limit -- Node budget per turn, or None
+            random_turns -- Number of opening turns picked at random
+            max_turns -- Number of turns after which the game is a draw
+            table_mb -- Memory cap of the transposition table, in MB
+            tablebase_path -- Path of an endgame tablebase file, or None.
+            Every process maps the same file, sharing its pages.
+            seconds -- Thinking time per turn, searching up to depth
+            turns deep; None searches exactly depth turns. Games with a
+            time limit depend on the speed of the machine.
+            instrumented -- Whether to count the calls and time of the
+            instrumented methods during the game
+            size -- Number of squares on each row of the board
+            evaluate -- Whether the engine scores by Evaluator, as the
+            game does, rather than by material alone
+            order -- Whether the engine orders turns by killers and
+            history, as the game does
+            quiescence -- Whether the engine plays out the captures
+            pending at the leaves of its search, as the game does
+            bitboard -- Whether to play on BitBoardGameState, as the game
+            does, rather than on the list backend
+        Returns:
+            A dictionary with the seed, the board size, the winner (None
+            for a draw), the number of turns, the number of random
+            opening turns and the path of every turn, and the
+            instrumentation snapshot if instrumented
+    '''
+    if instrumented:
+        instrument.enable()
+        instrument.reset()
+    rng = random.Random(seed)
+    tablebase = None
+    if tablebase_path is not None:
+        tablebase = Tablebase(tablebase_path)
+    engine = Engine(depth, node_limit, TranspositionTable(table_mb),
+                    tablebase, Evaluator() if evaluate else None,
+                    MoveOrderer() if order else None, quiescence)
+    state = new_game(BitBoardGameState if bitboard else GameState, size)
+    paths = []
+    winner = None
+    seen = {state.hash_key: 1}
+    while len(paths) < max_turns:
+        if len(paths) < random_turns:
+            turns = state.find_all_turns()
+            turn = rng.choice(turns) if len(turns) > 0 else None
+        elif seconds is not None:
+            turn = engine.think(state, Clock(per_move=seconds))
+        else:
+            turn = engine.search(state)
+        if turn is None:
+            winner = state.get_enemy_color(state.current_player)
+            break
+
+        for move in turn.moves:
+            state.move(move)
+        paths.append(turn.path)
+        winner = state.who_wins()
+        if winner is not None:
+            break
+        state.next_round()
+        # Nothing ever takes these moves back
+        state.undo_stack = []
+        seen[state.hash_key] = seen.get(state.hash_key, 0) + 1
+        if seen[state.hash_key] >= 3:
+            break
+
+    if tablebase is not None:
+        tablebase.close()
+    result = {"seed": seed, "size": size, "winner": winner,
+              "turns": len(paths),
+              "random_turns": min(random_turns, len(paths)), "moves": paths}
+    if instrumented:
+        instrument.disable()
+        result["instrumentation"] = instrument.snapshot()
+    return result
+
+
+def play_game_by_settings(arguments):
+    '''
+        Function -- play_game_by_settings
+            Unpack one task of the process pool and play its game
+        Parameters:
+            arguments -- A (seed, settings) pair, settings being the
+            keyword arguments of play_game
+    '''
+    seed, settings = arguments
+    return play_game(seed, **settings)
+
+
+def run_games(games, output_path, processes=None, seed=0, **settings):
+    '''
+        Function -- run_games
+            Play games across a pool of processes and write each result
+            as one JSON line as soon as it is finished. Game i uses seed
+            seed + i whatever process plays it.
+        Parameters:
+            games -- Number of games to play
+            output_path -- Path of the JSON lines file to write
+            processes -- Number of worker processes; all cores if None
+            seed -- Seed of the first game
+            settings -- Keyword arguments passed on to play_game
+        Returns:
+            A dictionary counting black wins, red wins and draws
+    '''
+    tasks = [(seed + index, settings) for index in range(games)]
+    summary = {"black": 0, "red": 0, "draw": 0}
+    with multiprocessing.Pool(processes) as pool, \
+            open(output_path, "w") as output:
+        for result in pool.imap_unordered(play_game_by_settings, tasks,
+                                          chunksize=4):
+            output.write(json.dumps(result) + "\n")
+            summary[result["winner"] or "draw"] += 1
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Play engine-versus-engine games without a window.")
+    parser.add_argument("games", type=int)
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--depth", type=int, default=4)
+    parser.add_argument("--node-limit", type=int, default=None)
+    parser.add_argument("--random-turns", type=int, default=4)
+    parser.add_argument("--max-turns", type=int, default=200)
+    parser.add_argument("--table-mb", type=float, default=8)
+    parser.add_argument("--tablebase", default=None)
+    parser.add_argument("--seconds", type=float, default=None)
+    parser.add_argument("--instrument", action="store_true")
+    parser.add_argument("--size", type=int, choices=SIZES, default=8)
+    parser.add_argument("--material", action="store_true",
+                        help="score by material alone")
+    parser.add_argument("--no-ordering", action="store_true")
+    parser.add_argument("--no-quiescence", action="store_true")
+    parser.add_argument("--no-bitboard", action="store_true",
+                        help="play on the list backend")
+    parser.add_argument("--output", default="selfplay.jsonl")
+    arguments = parser.parse_args()
+
+    started = time.perf_counter()
+    summary = run_games(
+        arguments.games, arguments.output, arguments.processes,
+        arguments.seed, depth=arguments.depth,
+        node_limit=arguments.node_limit,
+        random_turns=arguments.random_turns,
+        max_turns=arguments.max_turns, table_mb=arguments.table_mb,
+        tablebase_path=arguments.tablebase, seconds=arguments.seconds,
+        instrumented=arguments.instrument, size=arguments.size,
+        evaluate=not arguments.material, order=not arguments.no_ordering,
+        quiescence=not arguments.no_quiescence,
+        bitboard=not arguments.no_bitboard)
+    elapsed = time.perf_counter() - started
+    print("black wins: %d, red wins: %d, draws: %d" % (
+        summary["black"], summary["red"], summary["draw"]))
+    print("%.1f games/s" % (arguments.games / elapsed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,384 @@
+'''
+Game server -- many games at once over TCP, one JSON object per line.
+
+Every game is a session with its own GameState. The computer's turns are
+searched in a pool of worker processes, so the event loop only parses
+requests and plays turns. Positions travel to the workers in the 13 byte
+encoding of encoding.py. Moves are PDN text, as "11-15" or "22x15x6".
+
+Requests and their answers:
+    {"op": "new", "color": "black"} -- start a game, the user playing
+    color; the computer moves first when the user is red
+    {"op": "move", "session": id, "move": "11-15"} -- play a turn of the
+    user, then the computer's reply
+    {"op": "state", "session": id} -- the position again
+    {"op": "close", "session": id} -- end a game
+Every answer has "ok"; a position has "session", "fen", "moves" (legal
+turns of the user), "winner" and, after a computer turn, "reply". An
+error has "error" instead.
+
+Usage: python server.py [--port P] [--workers N] [--depth D] [--seconds S]
+'''
+
+import argparse
+import asyncio
+import concurrent.futures
+import itertools
+import json
+import threading
+
+from clock import Clock
+from encoding import encode, decode, to_fen
+from engine import Engine
+from evaluation import Evaluator
+from layout import BLACK, RED, new_game
+from ordering import MoveOrderer
+from pdn import format_path
+from state import GameState
+from transposition import TranspositionTable
+
+
+MAX_TURNS = 200  # A game is drawn after this many turns
+# Engine of each worker process or thread, kept between turns
+workers = threading.local()
+
+
+def engine_turn(data, depth, seconds, table_mb, evaluate=True, order=True,
+                quiescence=True):
+    '''
+        Function -- engine_turn
+            Search the turn of the computer in a worker. Every process,
+            and every thread of a thread pool, has an engine of its own,
+            so searches running at the same time never share one.
+        Parameters:
+            data -- The position, encoded by encoding.encode
+            depth -- Search depth, or the deepest search with seconds
+            seconds -- Thinking time, or None to search exactly depth
+            table_mb -- Memory cap of the worker's table, in MB
+            evaluate -- Whether the engine scores by Evaluator rather
+            than by material alone
+            order -- Whether the engine orders turns by killers and history
+            quiescence -- Whether the engine plays out pending captures
+        Returns:
+            The path of the best turn, or None if there is no move
+    '''
+    engine = getattr(workers, "engine", None)
+    if engine is None:
+        engine = Engine(depth, table=TranspositionTable(table_mb),
+                        evaluator=Evaluator() if evaluate else None,
+                        orderer=MoveOrderer() if order else None,
+                        quiescence=quiescence)
+        workers.engine = engine
+    engine.depth = depth
+    state = decode(data)
+    if seconds is None:
+        turn = engine.search(state)
+    else:
+        turn = engine.think(state, Clock(per_move=seconds))
+    return None if turn is None else turn.path
+
+
+class SearchError(Exception):
+    '''
+        Class -- SearchError
+            The search of a computer turn failed in the pool: a worker
+            raised, or the pool itself broke
+    '''
+
+
+def play_path(state, path):
+    '''
+        Function -- play_path
+            Play the legal turn with a given path and pass the turn on
+        Parameters:
+            state -- An object of GameState
+            path -- Locations of the turn, from start to end
+        Returns:
+            The winner after the turn, or None
+    '''
+    for turn in state.find_all_turns():
+        if turn.path == path:
+            break
+    else:
+        raise ValueError("illegal move")
+    for move in turn.moves:
+        state.move(move)
+    winner = state.who_wins()
+    if winner is None:
+        state.next_round()
+    # Nothing takes these turns back
+    state.undo_stack = []
+    return winner
+
+
+class GameServer:
+    '''
+        Class -- GameServer
+            Hosts the sessions and answers the requests of all clients
+        Attributes:
+            depth -- Search depth of the computer
+            seconds -- Thinking time of the computer, or None
+            table_mb -- Memory cap of the table of every worker, in MB
+            executor -- Pool of processes searching the computer's turns
+            sessions -- Dictionary from session id to session; a session
+            is a dictionary with "state", "user", "turns", "winner" and
+            "thinking"
+            ids -- Source of new session ids
+        Every session belongs to the connection that started it and ends
+        with it, closed or not.
+        Methods:
+            handle_request -- Answer one request
+            new_session -- Start a game
+            reply -- Play the computer's turn and answer
+            computer_turn -- Search and play a turn of the computer
+            describe -- The answer describing a session
+            handle_client -- Serve one connection
+    '''
+
+    def __init__(self, depth=4, seconds=None, workers=None, table_mb=8,
+                 executor=None, evaluate=True, order=True, quiescence=True):
+        '''
+            Constructor -- Creates a new instance of GameServer
+            Parameters:
+                self -- The current GameServer object
+                depth -- Search depth of the computer
+                seconds -- Thinking time of the computer, or None
+                workers -- Number of worker processes; all cores if None
+                table_mb -- Memory cap of the table of every worker
+                executor -- Executor to search in, instead of a new
+                process pool
+                evaluate -- Whether the computer scores by Evaluator, as
+                the game does, rather than by material alone
+                order -- Whether the computer orders turns by killers and
+                history, as the game does
+                quiescence -- Whether the computer plays out the captures
+                pending at the leaves of its search, as the game does
+        '''
+        self.depth = depth
+        self.evaluate = evaluate
+        self.order = order
+        self.quiescence = quiescence
+        self.seconds = seconds
+        self.table_mb = table_mb
+        self.executor = executor or \
+            concurrent.futures.ProcessPoolExecutor(workers)
+        self.sessions = {}
+        self.ids = itertools.count(1)
+
+    async def handle_request(self, request, owned=None):
+        '''
+            Method -- handle_request
+                Answer one request
+            Parameters:
+                self -- The current GameServer object
+                request -- The request, a dictionary
+                owned -- Set collecting the ids of the sessions started,
+                or None
+            Return:
+                The answer, a dictionary
+        '''
+        operation = request.get("op")
+        if operation == "new":
+            return await self.new_session(request.get("color", BLACK),
+                                          owned)
+        session_id = request.get("session")
+        session = self.sessions.get(session_id)
+        if session is None:
+            return {"ok": False, "error": "unknown session"}
+        if operation == "state":
+            return self.describe(session_id, session)
+        if operation == "close":
+            del self.sessions[session_id]
+            return {"ok": True, "session": session_id}
+        if operation != "move":
+            return {"ok": False, "error": "unknown op"}
+
+        state = session["state"]
+        if session["winner"] is not None or session["turns"] >= MAX_TURNS:
+            return {"ok": False, "error": "game over"}
+        if session["thinking"]:
+            return {"ok": False, "error": "computer is thinking"}
+        if state.current_player != session["user"]:
+            # The last search failed; search the computer's turn again
+            return await self.reply(session_id, session)
+        paths = dict((format_path(turn.path), turn.path)
+                     for turn in state.find_all_turns())
+        if request.get("move") not in paths:
+            return {"ok": False, "error": "illegal move"}
+        session["winner"] = play_path(state, paths[request["move"]])
+        session["turns"] += 1
+        return await self.reply(session_id, session)
+
+    async def reply(self, session_id, session):
+        '''
+            Method -- reply
+                Play the computer's turn, unless the game is over, and
+                answer with the session
+            Parameters:
+                self -- The current GameServer object
+                session_id -- Id of the session
+                session -- The session
+            Return:
+                The answer describing the session, with the computer's
+                turn as "reply", or the error of a failed search
+        '''
+        reply = None
+        if session["winner"] is None and session["turns"] < MAX_TURNS and \
+                session["state"].current_player != session["user"]:
+            try:
+                reply = await self.computer_turn(session)
+            except SearchError as error:
+                return {"ok": False, "session": session_id,
+                        "error": "search failed: %s" % error}
+        answer = self.describe(session_id, session)
+        answer["reply"] = reply
+        return answer
+
+    async def new_session(self, color, owned=None):
+        '''
+            Method -- new_session
+                Start a game
+            Parameters:
+                self -- The current GameServer object
+                color -- Color of the user
+                owned -- Set collecting the ids of the sessions started,
+                or None
+            Return:
+                The answer describing the new session
+        '''
+        if color not in (BLACK, RED):
+            return {"ok": False, "error": "unknown color"}
+        session_id = next(self.ids)
+        session = {"state": new_game(GameState), "user": color,
+                   "turns": 0, "winner": None, "thinking": False}
+        self.sessions[session_id] = session
+        if owned is not None:
+            owned.add(session_id)
+        return await self.reply(session_id, session)
+
+    async def computer_turn(self, session):
+        '''
+            Method -- computer_turn
+                Search the computer's turn in the pool and play it
+            Parameters:
+                self -- The current GameServer object
+                session -- The session to play in
+            Return:
+                PDN text of the turn played, or None
+            Raises:
+                SearchError when the search fails in the pool
+        '''
+        state = session["state"]
+        session["thinking"] = True
+        try:
+            path = await asyncio.get_running_loop().run_in_executor(
+                self.executor, engine_turn, encode(state), self.depth,
+                self.seconds, self.table_mb, self.evaluate, self.order,
+                self.quiescence)
+        except Exception as error:
+            # A broken pool, or anything raised in the worker
+            raise SearchError(str(error) or type(error).__name__)
+        finally:
+            session["thinking"] = False
+        if path is None:
+            session["winner"] = session["user"]
+            return None
+        path = [tuple(location) for location in path]
+        session["winner"] = play_path(state, path)
+        session["turns"] += 1
+        return format_path(path)
+
+    def describe(self, session_id, session):
+        '''
+            Method -- describe
+                The answer describing a session
+            Parameters:
+                self -- The current GameServer object
+                session_id -- Id of the session
+                session -- The session
+        '''
+        state = session["state"]
+        moves = []
+        if session["winner"] is None and session["turns"] < MAX_TURNS and \
+                state.current_player == session["user"]:
+            moves = [format_path(turn.path)
+                     for turn in state.find_all_turns()]
+        return {"ok": True, "session": session_id, "fen": to_fen(state),
+                "moves": moves, "winner": session["winner"],
+                "turns": session["turns"]}
+
+    async def handle_client(self, reader, writer):
+        '''
+            Method -- handle_client
+                Serve one connection, answering its requests in order.
+                The sessions started on the connection end with it.
+            Parameters:
+                self -- The current GameServer object
+                reader -- asyncio StreamReader of the connection
+                writer -- asyncio StreamWriter of the connection
+        '''
+        owned = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                    answer = await self.handle_request(request, owned)
+                except (ValueError, AttributeError, TypeError):
+                    answer = {"ok": False, "error": "bad request"}
+                writer.write((json.dumps(answer) + "\n").encode())
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            for session_id in owned:
+                self.sessions.pop(session_id, None)
+            writer.close()
+
+
+async def serve(host, port, server):
+    '''
+        Function -- serve
+            Accept connections until cancelled
+        Parameters:
+            host -- Address to listen on
+            port -- Port to listen on
+            server -- An object of GameServer
+    '''
+    listener = await asyncio.start_server(server.handle_client, host, port)
+    async with listener:
+        await listener.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Serve games over TCP, one JSON object per line.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--depth", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=None)
+    parser.add_argument("--table-mb", type=float, default=8)
+    parser.add_argument("--material", action="store_true",
+                        help="score by material alone")
+    parser.add_argument("--no-ordering", action="store_true")
+    parser.add_argument("--no-quiescence", action="store_true")
+    arguments = parser.parse_args()
+    server = GameServer(arguments.depth, arguments.seconds,
+                        arguments.workers, arguments.table_mb,
+                        evaluate=not arguments.material,
+                        order=not arguments.no_ordering,
+                        quiescence=not arguments.no_quiescence)
+    print("serving on %s:%d" % (arguments.host, arguments.port))
+    try:
+        asyncio.run(serve(arguments.host, arguments.port, server))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.executor.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -3,7 +3,9 @@ Class representing and recording game states.
 '''
 
 from piece import Piece
-from move import Move
+from turn import Turn
+from zobrist import keys_for_size
+from geometry import geometry_for_size
 
 
 class GameState:
@@ -12,7 +14,20 @@ class GameState:
             Reports current state of each piece in a game
         Attributes:
             squares -- Current square the piece was located
+            size -- Number of squares on each row
             current_player -- The player who's currently making a move
+            hash_key -- Zobrist hash of the pieces and the side to move
+            weights -- Piece-square tables square_score is summed up
+            from, or None to keep no score
+            square_score -- Piece-square value of the black pieces minus
+            that of the red pieces, kept up to date like hash_key; 0
+            without weights
+            undo_stack -- One undo record per move, latest last
+            king_counts -- Number of kings of each player
+            movable_locations_by_player -- Locations of the pieces of each
+            player having at least one possible move
+            dirty_locations -- Squares changed since the movable pieces
+            were last refreshed
         Methods:
             load_current_piece_location -- Helper function
             is_in_bound -- Check if piece is in bound
@@ -21,48 +36,90 @@ class GameState:
             update_square -- Update square attributes while moving
             find_possible_moves -- Find all possible moves given start location
             and return a list of possible moves
+            can_move -- Check whether a piece has any possible move
+            refresh_mobility -- Update movable pieces near changed squares
+            count_movable -- Number of pieces of a player able to move
+            count_pieces -- Number of pieces of a player
+            count_kings -- Number of kings of a player
             get_move_by_end_location -- Check if the chosen piece matches with
             end location of any possible move
             is_valid_move -- Valid capturing and noncapturing moves
             has_capturing_move -- Check whether any capturing move available
+            find_all_turns -- Find every legal turn of the current player
+            extend_captures -- Follow a capture to the end of its chains
+            is_promotion_row -- Check if a man is crowned at a location
+            use_weights -- Sum up square_score from a set of tables
             move -- move a piece
+            unmake -- Take back the latest move
+            make_turn -- Play a whole turn and pass it on
+            unmake_turn -- Take back a turn played by make_turn
             who_wins -- Return the winner of the game
             get_enemy_color -- Find opposite player / color
             next_round -- Update & initialize game state
+            copy -- An independent copy of the position
     '''
     INITIAL_STATE = 0
     MOVE_STATE = 1
 
-    def __init__(self, current_player, state):
+    def __init__(self, current_player, state, size=8):
         '''
             Constructor -- Creates a new instance of GameState
             Parameters:
                 self -- The current GameState object
                 current_player -- current player of the game; User or Computer
                 state -- current game state
+                size -- Number of squares on each row of the board; the
+                size of the squares loaded wins
         '''
         self.squares = []
+        self.size = size
         self.current_player = current_player
         self.state = state
         self.possible_moves = []
         self.piece_locations_by_player = {Piece.BLACK: set(), Piece.RED: set()}
+        self.hash_key = 0
+        self.weights = None
+        self.square_score = 0
+        self.undo_stack = []
+        self.king_counts = {Piece.BLACK: 0, Piece.RED: 0}
+        self.movable_locations_by_player = {
+            Piece.BLACK: set(), Piece.RED: set()}
+        self.dirty_locations = set()
 
     def load_current_piece_locations(self):
         '''
             Method -- load_current_piece_location
                 Collect locations of pieces of same colors.
                 Each color was collected into sets and stored as values
-                related with players(keys).
+                related with players(keys). Also counts kings, finds the
+                pieces able to move, hashes the whole position and scores
+                it by the piece-square tables, if any; move and unmake
+                keep all of these up to date afterwards.
             Parameter:
                 self -- The current GameState object
         '''
+        self.size = len(self.squares)
         piece_locations_by_player = {Piece.BLACK: set(), Piece.RED: set()}
+        king_counts = {Piece.BLACK: 0, Piece.RED: 0}
+        movable_locations_by_player = {Piece.BLACK: set(), Piece.RED: set()}
         for row in self.squares:
             for square in row:
                 if square is not None:
                     piece_locations_by_player[square.color].add(
                         square.location)
+                    if square.is_king:
+                        king_counts[square.color] += 1
+                    if self.can_move(square.location):
+                        movable_locations_by_player[square.color].add(
+                            square.location)
         self.piece_locations_by_player = piece_locations_by_player
+        self.king_counts = king_counts
+        self.movable_locations_by_player = movable_locations_by_player
+        self.dirty_locations = set()
+        self.hash_key = keys_for_size(len(self.squares)).hash_squares(
+            self.squares, self.current_player)
+        self.square_score = 0 if self.weights is None else \
+            self.weights.score_squares(self.squares)
 
     def is_in_bounds(self, location):
         '''
@@ -72,10 +129,8 @@ class GameState:
                 self -- Current GameState object
                 location -- Current piece location, a pair of indices
         '''
-        for index in location:
-            if index >= len(self.squares) or index < 0:
-                return False
-        return True
+        size = len(self.squares)
+        return 0 <= location[0] < size and 0 <= location[1] < size
 
     def get_moved_location(self, start_location, direction):
         '''
@@ -111,25 +166,55 @@ class GameState:
             Method -- update_square:
                 Helper function when moving pieces.
                 Update a piece with location, its allowed moving direction;
-                Also updates the target square on the board.
+                Also updates the target square on the board, the hash and,
+                with weights, the piece-square score.
             Parameters:
                 self -- Current GameState object
                 location -- Location to be updated, with regards with
                 piece(object of Piece) and square(Attribute of GameState)
         '''
+        keys = keys_for_size(len(self.squares))
+        weights = self.weights
+        old_square = self.squares[location[0]][location[1]]
+        # A piece that already moved away no longer counts here
+        if old_square is not None and old_square.location == location:
+            self.hash_key ^= keys.piece_key(location, old_square)
+            if weights is None:
+                pass
+            elif old_square.color == Piece.BLACK:
+                self.square_score -= weights.value(location, old_square)
+            else:
+                self.square_score += weights.value(location, old_square)
+
         if square is not None:
+            old_location = square.location
+            if old_location != location and \
+                    self.is_in_bounds(old_location) and \
+                    self.get_square_by_location(old_location) is square:
+                self.hash_key ^= keys.piece_key(old_location, square)
+                if weights is None:
+                    pass
+                elif square.color == Piece.BLACK:
+                    self.square_score -= weights.value(old_location, square)
+                else:
+                    self.square_score += weights.value(old_location, square)
+
             # Update location in Piece if it's not None
             square.location = location
 
             # Update to King if qualified
-            top = len(self.squares) - 1
-            if location[0] == top and square.color == Piece.BLACK:
-                square.is_king = True
-            elif location[0] == 0 and square.color == Piece.RED:
+            if self.is_promotion_row(location, square.color):
                 square.is_king = True
 
             # Update directions
             square.find_direction()
+            self.hash_key ^= keys.piece_key(location, square)
+            if weights is None:
+                pass
+            elif square.color == Piece.BLACK:
+                self.square_score += weights.value(location, square)
+            else:
+                self.square_score -= weights.value(location, square)
 
         self.squares[location[0]][location[1]] = square
 
@@ -143,30 +228,111 @@ class GameState:
             Return:
                 All possible moves -- a list of tuples
         '''
-        start_square = self.get_square_by_location(start_location)
+        squares = self.squares
+        start_square = squares[start_location[0]][start_location[1]]
+        targets = geometry_for_size(len(squares)).targets[
+            start_location[0]][start_location[1]]
         moves = []
 
         for direction in start_square.find_direction():
-            end_location = self.get_moved_location(start_location, direction)
-            if self.is_in_bounds(end_location):
-                end_square = self.get_square_by_location(end_location)
+            target = targets[direction]
+            if target is not None:
+                end_location, step_move, next_location, jump_move = target
+                end_square = squares[end_location[0]][end_location[1]]
                 if end_square is None:
                     # Uncapturing move
-                    possible_move = Move(
-                        start_square.location, end_location, False, None)
-                    moves.append(possible_move)
-                elif end_square.color != start_square.color:
-                    next_location = \
-                        self.get_moved_location(end_location, direction)
-                    if self.is_in_bounds(next_location) and \
-                            self.get_square_by_location(next_location) is None:
-                        # Capturing move
-                        possible_move = Move(
-                            start_square.location,
-                            next_location, True, end_location)
-                        moves.insert(0, possible_move)
+                    moves.append(step_move)
+                elif end_square.color != start_square.color and \
+                        next_location is not None and \
+                        squares[next_location[0]][next_location[1]] is None:
+                    # Capturing move
+                    moves.insert(0, jump_move)
         return moves
 
+    def can_move(self, location):
+        '''
+            Method -- can_move
+                Check whether the piece at a location has any possible
+                move, without building the moves
+            Parameters:
+                self -- The current GameState object
+                location -- Location of the piece
+        '''
+        squares = self.squares
+        piece = squares[location[0]][location[1]]
+        targets = geometry_for_size(len(squares)).targets[
+            location[0]][location[1]]
+        for direction in piece.find_direction():
+            target = targets[direction]
+            if target is not None:
+                step, jump = target[0], target[2]
+                square = squares[step[0]][step[1]]
+                if square is None:
+                    return True
+                if square.color != piece.color and jump is not None and \
+                        squares[jump[0]][jump[1]] is None:
+                    return True
+        return False
+
+    def refresh_mobility(self):
+        '''
+            Method -- refresh_mobility
+                Update the movable pieces around the squares changed since
+                the last refresh. Only pieces on a changed square, or one
+                or two diagonal steps away from it, can gain or lose moves.
+            Parameters:
+                self -- The current GameState object
+        '''
+        if len(self.dirty_locations) == 0:
+            return
+        geometry = geometry_for_size(len(self.squares))
+        nearby = set()
+        for row, col in self.dirty_locations:
+            nearby.update(geometry.nearby[row][col])
+        self.dirty_locations = set()
+
+        for location in nearby:
+            square = self.get_square_by_location(location)
+            if square is not None and self.can_move(location):
+                self.movable_locations_by_player[square.color].add(location)
+                enemy_color = self.get_enemy_color(square.color)
+                self.movable_locations_by_player[enemy_color].discard(
+                    location)
+            else:
+                for movable in self.movable_locations_by_player.values():
+                    movable.discard(location)
+
+    def count_movable(self, player):
+        '''
+            Method -- count_movable
+                Number of pieces of a player having a possible move
+            Parameters:
+                self -- The current GameState object
+                player -- Color of the player
+        '''
+        self.refresh_mobility()
+        return len(self.movable_locations_by_player[player])
+
+    def count_pieces(self, player):
+        '''
+            Method -- count_pieces
+                Number of pieces of a player
+            Parameters:
+                self -- The current GameState object
+                player -- Color of the player
+        '''
+        return len(self.piece_locations_by_player[player])
+
+    def count_kings(self, player):
+        '''
+            Method -- count_kings
+                Number of kings of a player
+            Parameters:
+                self -- The current GameState object
+                player -- Color of the player
+        '''
+        return self.king_counts[player]
+
     def get_move_by_end_location(self, current_location):
         '''
             Method -- get_move_by_end_location
@@ -212,6 +378,88 @@ class GameState:
         return len(self.possible_moves) > 0 \
             and self.possible_moves[0].is_capture
 
+    def find_all_turns(self):
+        '''
+            Method -- find_all_turns
+                Find every legal turn of the current player, over all
+                its pieces. If any piece can capture, only capturing turns
+                are legal, and a capture goes on while the same piece can
+                capture again. The state is left as it was found.
+            Parameters:
+                self -- The current GameState object
+            Return:
+                A list of Turn objects
+        '''
+        moves = []
+        for location in sorted(
+                self.piece_locations_by_player[self.current_player]):
+            moves.extend(self.find_possible_moves(location))
+        captures = [move for move in moves if move.is_capture]
+        if len(captures) == 0:
+            turns = []
+            for move in moves:
+                piece = self.get_square_by_location(move.start)
+                promotes = not piece.is_king and \
+                    self.is_promotion_row(move.end, piece.color)
+                turns.append(Turn([move], promotes))
+            return turns
+
+        turns = []
+        for move in captures:
+            was_king = self.get_square_by_location(move.start).is_king
+            self.extend_captures([move], was_king, turns)
+        return turns
+
+    def extend_captures(self, moves, was_king, turns):
+        '''
+            Method -- extend_captures
+                Play a chain of captures, then try every further capture
+                of the same piece, collecting each complete chain as a Turn.
+            Parameters:
+                self -- The current GameState object
+                moves -- Captures of the chain so far
+                was_king -- Whether the piece was a king before the turn
+                turns -- List collecting the complete turns
+        '''
+        self.move(moves[-1])
+        end_location = moves[-1].end
+        follow_ups = [move for move in self.find_possible_moves(end_location)
+                      if move.is_capture]
+        if len(follow_ups) == 0:
+            is_king = self.get_square_by_location(end_location).is_king
+            turns.append(Turn(moves, is_king and not was_king))
+        for move in follow_ups:
+            self.extend_captures(moves + [move], was_king, turns)
+        self.unmake()
+
+    def is_promotion_row(self, location, color):
+        '''
+            Method -- is_promotion_row
+                Whether a man of a color becomes king at a location
+            Parameters:
+                self -- The current GameState object
+                location -- An index pair
+                color -- Color of the man
+        '''
+        if color == Piece.BLACK:
+            return location[0] == len(self.squares) - 1
+        return location[0] == 0
+
+    def use_weights(self, weights):
+        '''
+            Method -- use_weights
+                Sum up square_score from a set of piece-square tables
+                from now on, as an evaluation asks for them, or keep no
+                score. Moves played before keep the score they had.
+            Parameters:
+                self -- The current GameState object
+                weights -- An object of weights.Weights for the size of
+                the board, or None
+        '''
+        self.weights = weights
+        self.square_score = 0 if weights is None else \
+            weights.score_squares(self.squares)
+
     def move(self, move):
         '''
             Method -- move
@@ -219,10 +467,22 @@ class GameState:
             Parameters:
                 self -- The current GameState object
                 move -- Current moving piece
+            Return:
+                Locations of the squares that changed
         '''
         start_location = move.start
         end_location = move.end
         start_piece = self.get_square_by_location(start_location)
+        captured_piece = None
+        if move.is_capture:
+            captured_piece = self.get_square_by_location(
+                move.captured_location)
+        was_king = start_piece.is_king
+        self.undo_stack.append((
+            start_location, end_location, start_piece, captured_piece,
+            was_king, self.state, self.current_player,
+            self.possible_moves, self.hash_key, self.square_score))
+
         self.update_square(end_location, start_piece)
         self.update_square(start_location, None)
 
@@ -231,34 +491,104 @@ class GameState:
             start_location)
         self.piece_locations_by_player[start_piece.color].add(end_location)
 
+        if start_piece.is_king and not was_king:
+            self.king_counts[start_piece.color] += 1
+
         if move.is_capture:
             # remove captured piece
             self.update_square(move.captured_location, None)
             enemy_color = self.get_enemy_color(start_piece.color)
             self.piece_locations_by_player[enemy_color].remove(
                 move.captured_location)
+            if captured_piece.is_king:
+                self.king_counts[enemy_color] -= 1
+            self.dirty_locations.add(move.captured_location)
+        self.dirty_locations.add(start_location)
+        self.dirty_locations.add(end_location)
 
         self.state = GameState.MOVE_STATE
+        if move.is_capture:
+            return [start_location, end_location, move.captured_location]
+        return [start_location, end_location]
+
+    def unmake(self):
+        '''
+            Method -- unmake
+                Take back the latest move: put the piece back, crowned or
+                not as it was, restore the captured piece and the state,
+                player and possible moves from before the move. Undoing
+                every move of a turn also undoes next_round.
+            Parameters:
+                self -- The current GameState object
+        '''
+        start_location, end_location, piece, captured_piece, was_king, \
+            state, current_player, possible_moves, hash_key, square_score = \
+            self.undo_stack.pop()
+
+        if piece.is_king and not was_king:
+            self.king_counts[piece.color] -= 1
+        piece.is_king = was_king
+        self.update_square(start_location, piece)
+        self.update_square(end_location, None)
+        self.piece_locations_by_player[piece.color].remove(end_location)
+        self.piece_locations_by_player[piece.color].add(start_location)
+
+        if captured_piece is not None:
+            self.update_square(captured_piece.location, captured_piece)
+            self.piece_locations_by_player[captured_piece.color].add(
+                captured_piece.location)
+            if captured_piece.is_king:
+                self.king_counts[captured_piece.color] += 1
+            self.dirty_locations.add(captured_piece.location)
+        self.dirty_locations.add(start_location)
+        self.dirty_locations.add(end_location)
+
+        self.state = state
+        self.current_player = current_player
+        self.possible_moves = possible_moves
+        self.hash_key = hash_key
+        self.square_score = square_score
+
+    def make_turn(self, turn):
+        '''
+            Method -- make_turn
+                Play every move of a turn, then pass the turn on
+            Parameters:
+                self -- The current GameState object
+                turn -- An object of Turn
+        '''
+        for move in turn.moves:
+            self.move(move)
+        self.next_round()
+
+    def unmake_turn(self, turn):
+        '''
+            Method -- unmake_turn
+                Take back a turn played by make_turn
+            Parameters:
+                self -- The current GameState object
+                turn -- An object of Turn
+        '''
+        for move in turn.moves:
+            self.unmake()
 
     def who_wins(self):
         '''
             Method -- who_wins
-                Determine which side wins
+                Determine which side wins from the piece locations and
+                movable pieces kept by move; only the squares around the
+                latest moves are looked at again.
             Parameter:
                 self -- The current GameState object
         '''
+        self.refresh_mobility()
         for player in self.piece_locations_by_player.keys():
-            piece_location_set = self.piece_locations_by_player[player]
             # win condition 1: no remaining enemy pieces
-            if len(piece_location_set) == 0:
+            if len(self.piece_locations_by_player[player]) == 0:
                 return self.get_enemy_color(player)
 
             # win condition 2: no possible moves for enemy
-            all_possible_moves = []
-            for piece_location in piece_location_set:
-                all_possible_moves.extend(
-                    self.find_possible_moves(piece_location))
-            if len(all_possible_moves) == 0:
+            if len(self.movable_locations_by_player[player]) == 0:
                 return self.get_enemy_color(player)
 
         # No one wins if none of win conditions matches
@@ -287,3 +617,20 @@ class GameState:
         self.state = GameState.INITIAL_STATE
         self.possible_moves = []
         self.current_player = self.get_enemy_color(self.current_player)
+        self.hash_key ^= keys_for_size(len(self.squares)).side_key
+
+    def copy(self):
+        '''
+            Method -- copy
+                An independent copy of the position and the player to
+                move, of the same class, without the undo records
+            Parameters:
+                self -- The current GameState object
+        '''
+        other = type(self)(self.current_player, self.state, self.size)
+        other.weights = self.weights
+        other.squares = [[None if square is None else
+                          Piece(square.color, square.is_king, square.location)
+                          for square in row] for row in self.squares]
+        other.load_current_piece_locations()
+        return other
@@ -0,0 +1,367 @@
+'''
+Endgame tablebase -- the exact result of every position with few pieces,
+found by retrograde analysis and stored in one file that is read through
+mmap. Worker processes opening the same file share its pages through the
+page cache instead of each holding a copy.
+
+File layout, all little-endian:
+    header -- magic b"CKTB", version, board size, max pieces, number of
+    tables (struct HEADER)
+    directory -- per table: black men, black kings, red men, red kings,
+    offset and length of its data (struct ENTRY)
+    data -- one signed byte per position: 0 a draw, d > 0 a win for the
+    side to move in d turns, -(d + 1) a loss in d turns
+
+A table holds every position of one signature (numbers of black men,
+black kings, red men and red kings). The index of a position ranks the
+squares of each kind of piece as a combination, combines the ranks in
+mixed radix, then adds the side to move as the lowest digit.
+
+Usage: python tablebase.py PIECES PATH
+'''
+
+import itertools
+import math
+import mmap
+import struct
+import sys
+import time
+from array import array
+
+from bitboard import BitBoard
+from piece import Piece
+
+
+MAGIC = b"CKTB"
+VERSION = 1
+HEADER = struct.Struct("<4sBBBI")
+ENTRY = struct.Struct("<BBBBQQ")
+WIN = 1
+DRAW = 0
+LOSS = -1
+MAX_DISTANCE = 126  # Longest distance a signed byte holds for both results
+
+
+def signatures(max_pieces):
+    '''
+        Function -- signatures
+            Every signature with at least one piece a side and at most
+            max_pieces in all, in the order they must be solved: captures
+            lead to fewer pieces, promotions to fewer men
+        Parameters:
+            max_pieces -- Largest number of pieces on the board
+        Returns:
+            A list of (black men, black kings, red men, red kings)
+    '''
+    result = []
+    for total in range(2, max_pieces + 1):
+        for counts in itertools.product(range(total + 1), repeat=4):
+            black = counts[0] + counts[1]
+            red = counts[2] + counts[3]
+            if black + red == total and black > 0 and red > 0:
+                result.append(counts)
+    result.sort(key=lambda counts: (sum(counts), counts[0] + counts[2]))
+    return result
+
+
+def table_length(signature, squares):
+    '''
+        Function -- table_length
+            Number of entries of the table of a signature
+        Parameters:
+            signature -- (black men, black kings, red men, red kings)
+            squares -- Number of dark squares of the board
+    '''
+    length = 2
+    for count in signature:
+        length *= math.comb(squares, count)
+    return length
+
+
+def position_index(signature, groups, side, squares):
+    '''
+        Function -- position_index
+            Index of a position in the table of its signature
+        Parameters:
+            signature -- (black men, black kings, red men, red kings)
+            groups -- Sorted bit indices of each of the four kinds
+            side -- 0 when black is to move, 1 when red is
+            squares -- Number of dark squares of the board
+    '''
+    index = 0
+    for count, group in zip(signature, groups):
+        rank = 0
+        for position, square in enumerate(group):
+            rank += math.comb(square, position + 1)
+        index = index * math.comb(squares, count) + rank
+    return index * 2 + side
+
+
+def split_masks(black, red, kings):
+    '''
+        Function -- split_masks
+            Signature and sorted bit indices of each kind of piece
+        Parameters:
+            black -- Mask of black pieces
+            red -- Mask of red pieces
+            kings -- Mask of kings of either color
+        Returns:
+            A (signature, groups) pair
+    '''
+    groups = ([], [], [], [])
+    for kind, mask in enumerate((black & ~kings, black & kings,
+                                 red & ~kings, red & kings)):
+        square = 0
+        while mask:
+            if mask & 1:
+                groups[kind].append(square)
+            mask >>= 1
+            square += 1
+    return tuple(len(group) for group in groups), groups
+
+
+def solve_table(board, signature, tables):
+    '''
+        Function -- solve_table
+            Find the result of every position of one signature. Positions
+            without a move are lost at once. Pass n then finds the wins in
+            n turns, with a turn to a position lost in n - 1, and the
+            losses in n, where every turn leads to a win and the longest
+            one is n - 1. Positions still open when no pass can change
+            anything are draws.
+        Parameters:
+            board -- A BitBoard of the right size
+            signature -- (black men, black kings, red men, red kings)
+            tables -- Solved tables of the signatures before this one
+        Returns:
+            An array of signed bytes, one per position
+    '''
+    squares = board.full.bit_length()
+    half = board.size // 2
+    values = array("b", bytes(table_length(signature, squares)))
+    pending = {}
+    horizon = 0
+
+    # Men standing on their crowning row would already be kings
+    man_squares = (range(squares - half), range(half, squares))
+    ranges = (man_squares[0], range(squares), man_squares[1],
+              range(squares))
+    for groups in itertools.product(*[
+            itertools.combinations(ranges[kind], signature[kind])
+            for kind in range(4)]):
+        occupied = 0
+        for group in groups:
+            for square in group:
+                occupied |= 1 << square
+        if bin(occupied).count("1") != sum(signature):
+            continue
+        black = red = kings = 0
+        for kind, group in enumerate(groups):
+            for square in group:
+                if kind < 2:
+                    black |= 1 << square
+                else:
+                    red |= 1 << square
+                if kind % 2 == 1:
+                    kings |= 1 << square
+
+        for side, color in enumerate((Piece.BLACK, Piece.RED)):
+            index = position_index(signature, groups, side, squares)
+            board.black, board.red, board.kings = black, red, kings
+            children = board.children(color)
+            if len(children) == 0:
+                values[index] = LOSS
+                continue
+            own = []
+            shortest_win = 0
+            longest_win = -1
+            can_lose = True
+            for child in children:
+                child_side = 1 - side
+                child_signature, child_groups = split_masks(*child)
+                if sum(child_signature[2 * child_side:
+                                       2 * child_side + 2]) == 0:
+                    value = LOSS  # The side to move has no piece left
+                else:
+                    child_index = position_index(
+                        child_signature, child_groups, child_side, squares)
+                    if child_signature == signature:
+                        own.append(child_index)
+                        continue
+                    value = tables[child_signature][child_index]
+                if value <= 0:
+                    can_lose = False
+                    if value < 0 and (shortest_win == 0 or
+                                      -value < shortest_win):
+                        shortest_win = -value
+                else:
+                    longest_win = max(longest_win, value)
+            horizon = max(horizon, shortest_win, longest_win + 1)
+            pending[index] = (own, shortest_win, can_lose, longest_win)
+
+    turns = 1
+    changed = True
+    while len(pending) > 0 and (changed or turns <= horizon):
+        if turns > MAX_DISTANCE:
+            raise ValueError("distance to win does not fit in a byte")
+        changed = False
+        for index, (own, shortest_win, can_lose, longest_win) in \
+                list(pending.items()):
+            win = shortest_win == turns
+            longest = longest_win
+            for child_index in own:
+                value = values[child_index]
+                if value == -turns:
+                    win = True
+                    break
+                if value <= 0:
+                    can_lose = False
+                else:
+                    longest = max(longest, value)
+            if win:
+                values[index] = turns
+            elif can_lose and longest == turns - 1:
+                values[index] = -(turns + 1)
+            else:
+                continue
+            del pending[index]
+            changed = True
+        turns += 1
+    return values
+
+
+def build(max_pieces, path, size=8):
+    '''
+        Function -- build
+            Solve every signature of up to max_pieces pieces and write
+            the tablebase file
+        Parameters:
+            max_pieces -- Largest number of pieces on the board
+            path -- Path of the file to write
+            size -- Number of squares on each row
+        Returns:
+            Number of positions written
+    '''
+    board = BitBoard(size)
+    tables = {}
+    for signature in signatures(max_pieces):
+        tables[signature] = solve_table(board, signature, tables)
+
+    offset = HEADER.size + ENTRY.size * len(tables)
+    with open(path, "wb") as output:
+        output.write(HEADER.pack(MAGIC, VERSION, size, max_pieces,
+                                 len(tables)))
+        for signature, values in tables.items():
+            output.write(ENTRY.pack(*signature, offset, len(values)))
+            offset += len(values)
+        for values in tables.values():
+            output.write(values.tobytes())
+    return sum(len(values) for values in tables.values())
+
+
+class Tablebase:
+    '''
+        Class -- Tablebase
+            Read-only view of a tablebase file through mmap. Nothing but
+            the directory is read up front; a probe touches one byte.
+        Attributes:
+            size -- Number of squares on each row
+            max_pieces -- Largest number of pieces covered
+            board -- BitBoard mapping locations to bit indices
+            offsets -- Data offset of the table of each signature
+            data -- The mapped file
+        Methods:
+            probe -- Result and distance of a game state
+            close -- Unmap the file
+    '''
+
+    def __init__(self, path):
+        '''
+            Constructor -- Opens a tablebase file
+            Parameters:
+                self -- The current Tablebase object
+                path -- Path of a file written by build
+        '''
+        with open(path, "rb") as source:
+            self.data = mmap.mmap(source.fileno(), 0,
+                                  access=mmap.ACCESS_READ)
+        magic, version, self.size, self.max_pieces, count = \
+            HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC or version != VERSION:
+            self.data.close()
+            raise ValueError("%s is not a tablebase file" % path)
+        self.board = BitBoard(self.size)
+        self.offsets = {}
+        for number in range(count):
+            entry = ENTRY.unpack_from(
+                self.data, HEADER.size + number * ENTRY.size)
+            self.offsets[entry[:4]] = entry[4]
+
+    def probe(self, state):
+        '''
+            Method -- probe
+                Look up the exact result of a position
+            Parameters:
+                self -- The current Tablebase object
+                state -- An object of GameState
+            Return:
+                A (result, distance) pair for the current player, result
+                being WIN, DRAW or LOSS and distance the number of turns
+                to the end of the game; None if the position has too many
+                pieces or another board size
+        '''
+        if len(state.squares) != self.size:
+            return None
+        locations = state.piece_locations_by_player
+        own = len(locations[state.current_player])
+        enemy = len(locations[state.get_enemy_color(state.current_player)])
+        if own + enemy > self.max_pieces:
+            return None
+        if own == 0:
+            return (LOSS, 0)
+        if enemy == 0:
+            return (WIN, 0)
+
+        groups = ([], [], [], [])
+        for color, kind in ((Piece.BLACK, 0), (Piece.RED, 2)):
+            for location in locations[color]:
+                is_king = state.get_square_by_location(location).is_king
+                groups[kind + is_king].append(
+                    self.board.location_to_index(location))
+        for group in groups:
+            group.sort()
+        signature = tuple(len(group) for group in groups)
+        side = 0 if state.current_player == Piece.BLACK else 1
+        index = position_index(signature, groups, side,
+                               self.board.full.bit_length())
+        value = self.data[self.offsets[signature] + index]
+        if value > 127:
+            value -= 256
+        if value > 0:
+            return (WIN, value)
+        if value < 0:
+            return (LOSS, -value - 1)
+        return (DRAW, 0)
+
+    def close(self):
+        '''
+            Method -- close
+                Unmap the file
+            Parameters:
+                self -- The current Tablebase object
+        '''
+        self.data.close()
+
+
+def main():
+    max_pieces = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    path = sys.argv[2] if len(sys.argv) > 2 else "endgame.cktb"
+    started = time.perf_counter()
+    positions = build(max_pieces, path)
+    elapsed = time.perf_counter() - started
+    print("%d positions up to %d pieces in %.1f s" % (
+        positions, max_pieces, elapsed))
+
+
+if __name__ == "__main__":
+    main()
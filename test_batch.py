@@ -0,0 +1,47 @@
+import numpy
+from state import GameState
+from layout import new_game, random_positions
+from batch import encode_states, move_masks, legal_masks, mask_to_moves
+
+
+def scalar_moves(state):
+    moves = []
+    for location in state.piece_locations_by_player[state.current_player]:
+        for move in state.find_possible_moves(location):
+            moves.append((move.start, move.end, move.is_capture,
+                          move.captured_location if move.is_capture
+                          else None))
+    return sorted(moves)
+
+
+def test_encode_states():
+    boards, sides = encode_states([new_game(GameState)])
+    assert(boards.shape == (1, 8, 8))
+    assert(boards.dtype == numpy.int8)
+    assert(boards[0, 0, 1] == 1)
+    assert(boards[0, 7, 0] == -1)
+    assert(boards[0, 3].sum() == 0)
+    assert(sides.tolist() == [1])
+
+
+def test_move_masks_match_scalar():
+    states = random_positions(GameState, 200, seed=1, max_turns=80)
+    boards, sides = encode_states(states)
+    steps, captures = move_masks(boards, sides)
+    for index, state in enumerate(states):
+        assert(sorted(mask_to_moves(steps, captures, index)) ==
+               scalar_moves(state))
+
+
+def test_legal_masks_match_turns():
+    states = random_positions(GameState, 200, seed=2, max_turns=80)
+    boards, sides = encode_states(states)
+    legal, must_capture = legal_masks(boards, sides)
+    for index, state in enumerate(states):
+        turns = state.find_all_turns()
+        first_moves = set((turn.moves[0].start, turn.moves[0].end)
+                          for turn in turns)
+        found = numpy.nonzero(legal[index])
+        assert(len(found[0]) == len(first_moves))
+        assert(bool(must_capture[index]) ==
+               any(turn.is_capture for turn in turns))
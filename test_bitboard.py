@@ -0,0 +1,111 @@
+from bitboard import BitBoard
+from piece import Piece
+from layout import initiate_squares, NESTED_LIST, random_positions
+from state import GameState
+from bitstate import BitBoardGameState
+
+
+def test_index_mapping():
+    board = BitBoard()
+    assert(board.full == 0xFFFFFFFF)
+    assert(board.location_to_index((0, 1)) == 0)
+    assert(board.location_to_index((1, 0)) == 4)
+    assert(board.location_to_index((7, 6)) == 31)
+    for index in range(32):
+        location = board.index_to_location(index)
+        assert((location[0] + location[1]) % 2 == 1)
+        assert(board.location_to_index(location) == index)
+
+
+def test_load_and_count():
+    state = GameState("black", 0)
+    initiate_squares(state, NESTED_LIST)
+    board = BitBoard()
+    board.load(state.squares)
+    assert(board.black == 0x00000FFF)
+    assert(board.red == 0xFFF00000)
+    assert(board.kings == 0)
+    assert(board.count("black") == 12)
+    assert(board.count("red") == 12)
+    board.clear((0, 1))
+    board.put((3, 0), "black", True)
+    assert(board.count("black") == 12)
+    assert(board.count_kings("black") == 1)
+    assert(board.men("black") & (1 << 12) == 0)
+
+
+def test_step():
+    board = BitBoard()
+    # (2, 1) is bit 8, moving towards (3, 0) and (3, 2)
+    assert(board.step(1 << 8, (1, -1)) == 1 << 12)
+    assert(board.step(1 << 8, (1, 1)) == 1 << 13)
+    # (3, 0) is bit 12, the left edge drops off the board
+    assert(board.step(1 << 12, (1, -1)) == 0)
+    assert(board.step(1 << 12, (-1, 1)) == 1 << 8)
+    # (7, 6) is bit 31, the last row drops off the board
+    assert(board.step(1 << 31, (1, 1)) == 0)
+
+
+def test_steps_and_jumps():
+    board = BitBoard()
+    board.put((2, 1), Piece.BLACK, False)
+    board.put((3, 2), Piece.RED, False)
+    board.put((5, 4), Piece.RED, True)
+    assert(sorted(board.steps(Piece.BLACK)) == [(8, 12)])
+    assert(board.jumps(Piece.BLACK) == [(8, 17, 13)])
+    assert(board.jumps(Piece.RED) == [(13, 4, 8)])
+    assert(len(board.steps(Piece.RED)) == 5)
+    assert(board.has_moves(Piece.BLACK))
+    assert(board.has_moves(Piece.RED))
+
+    blocked = BitBoard()
+    blocked.put((0, 1), Piece.RED, False)
+    assert(not blocked.has_moves(Piece.RED))
+    assert(blocked.has_moves(Piece.BLACK) is False)
+
+
+def test_find_moves_order():
+    board = BitBoard()
+    board.put((2, 1), Piece.BLACK, True)
+    board.put((3, 2), Piece.RED, False)
+    board.put((1, 0), Piece.RED, False)
+    moves = board.find_moves((2, 1))
+    assert([(move.start, move.end) for move in moves] ==
+           [((2, 1), (4, 3)), ((2, 1), (1, 2)), ((2, 1), (3, 0))])
+    assert(moves[0].is_capture)
+    assert(moves[0].captured_location == (3, 2))
+    assert(not moves[1].is_capture)
+
+
+def test_children_match_turns():
+    state = GameState("red", 1)
+    state.squares = [[None] * 8 for i in range(8)]
+    for color, is_king, location in (("black", False, (2, 3)),
+                                     ("black", False, (4, 3)),
+                                     ("black", True, (0, 1)),
+                                     ("red", False, (5, 2)),
+                                     ("red", False, (1, 0))):
+        state.squares[location[0]][location[1]] = \
+            Piece(color, is_king, location)
+    state.load_current_piece_locations()
+    board = BitBoard()
+    board.load(state.squares)
+    children = set(board.children("red"))
+    expected = set()
+    for turn in state.find_all_turns():
+        state.make_turn(turn)
+        board.load(state.squares)
+        expected.add((board.black, board.red, board.kings))
+        state.unmake_turn(turn)
+    assert(len(children) == len(expected))
+    assert(children == expected)
+    board.load(state.squares)
+    assert(board.count_turns("red") == len(state.find_all_turns()))
+
+
+def test_count_turns():
+    for state in random_positions(BitBoardGameState, 20, seed=2,
+                                  max_turns=50):
+        for color in ("black", "red"):
+            assert(state.board.count_turns(color) ==
+                   len(state.board.children(color)))
@@ -0,0 +1,105 @@
+import random
+from bitstate import BitBoardGameState
+from state import GameState
+from piece import Piece
+from layout import initiate_squares, random_positions, NESTED_LIST
+
+
+def new_pair():
+    scalar = GameState("black", 0)
+    fast = BitBoardGameState("black", 0)
+    for state in (scalar, fast):
+        initiate_squares(state, NESTED_LIST)
+        state.load_current_piece_locations()
+    return scalar, fast
+
+
+def all_moves(state, player):
+    moves = []
+    for location in sorted(state.piece_locations_by_player[player]):
+        for move in state.find_possible_moves(location):
+            moves.append((move.start, move.end, move.is_capture,
+                          move.captured_location))
+    return moves
+
+
+def test_load_current_piece_locations():
+    scalar, fast = new_pair()
+    assert(fast.board.count("black") == 12)
+    assert(fast.board.count("red") == 12)
+    assert(fast.piece_locations_by_player == scalar.piece_locations_by_player)
+
+
+def test_update_square():
+    game = BitBoardGameState("black", 1)
+    game.squares = [[None] * 4 for i in range(4)]
+    game.load_current_piece_locations()
+    piece = Piece("black", False, (0, 1))
+    game.update_square((3, 2), piece)
+    assert(piece.is_king)
+    assert(game.board.count_kings("black") == 1)
+    game.update_square((3, 2), None)
+    assert(game.board.count("black") == 0)
+
+
+def test_random_games_match_scalar():
+    rng = random.Random(7)
+    for game in range(20):
+        scalar, fast = new_pair()
+        for turn in range(150):
+            player = scalar.current_player
+            moves = all_moves(scalar, player)
+            assert(all_moves(fast, player) == moves)
+            assert(fast.who_wins() == scalar.who_wins())
+            if scalar.who_wins() is not None:
+                break
+            captures = [move for move in moves if move[2]]
+            choice = rng.choice(captures or moves)
+            for state in (scalar, fast):
+                state.possible_moves = state.find_possible_moves(choice[0])
+                state.move(state.get_move_by_end_location(choice[1]))
+                state.next_round()
+        assert(fast.piece_locations_by_player ==
+               scalar.piece_locations_by_player)
+
+
+def test_unmake_restores_masks():
+    scalar, fast = new_pair()
+    masks = (fast.board.black, fast.board.red, fast.board.kings)
+    rng = random.Random(11)
+    for turn in range(60):
+        moves = all_moves(fast, fast.current_player)
+        if len(moves) == 0:
+            break
+        choice = rng.choice(moves)
+        fast.possible_moves = fast.find_possible_moves(choice[0])
+        fast.move(fast.get_move_by_end_location(choice[1]))
+        fast.next_round()
+    while len(fast.undo_stack) > 0:
+        fast.unmake()
+    assert((fast.board.black, fast.board.red, fast.board.kings) == masks)
+    assert(fast.piece_locations_by_player == scalar.piece_locations_by_player)
+
+
+def test_find_all_turns_match_scalar():
+    for fast in random_positions(BitBoardGameState, 200, seed=5,
+                                 max_turns=80):
+        scalar = GameState(fast.current_player, fast.state)
+        scalar.squares = [[None if square is None else
+                           Piece(square.color, square.is_king,
+                                 square.location)
+                           for square in row] for row in fast.squares]
+        scalar.load_current_piece_locations()
+        expected = sorted((turn.path, turn.captured, turn.promotes)
+                          for turn in scalar.find_all_turns())
+        assert(sorted((turn.path, turn.captured, turn.promotes)
+                      for turn in fast.find_all_turns()) == expected)
+
+
+def test_count_movable_matches_scalar():
+    for fast in random_positions(BitBoardGameState, 100, seed=6,
+                                 max_turns=80):
+        scalar = fast.copy()
+        for player in ("black", "red"):
+            assert(fast.count_movable(player) ==
+                   GameState.count_movable(scalar, player))
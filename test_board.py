@@ -1,6 +1,10 @@
+import main
 from main import convert_to_index, convert_to_cartesian, initiate_squares
 from state import GameState
 from piece import Piece
+from engine import Engine
+from layout import new_game
+from renderer import Renderer
 
 
 def test_convert_to_index():
@@ -36,3 +40,48 @@ def test_initiate_squares():
                 assert(square.color == INIT_LST[i][j])
                 assert(not square.is_king)
                 assert(square.location == (i, j))
+
+
+class TimerScreen:
+    '''
+        Stand-in for the turtle screen keeping the timer callbacks
+    '''
+    def __init__(self):
+        self.timers = []
+
+    def update(self):
+        pass
+
+    def ontimer(self, callback, delay):
+        self.timers.append(callback)
+
+
+class SilentPen:
+    def __getattr__(self, name):
+        return lambda *arguments: None
+
+
+def test_ai_move_thinks_in_slices(monkeypatch):
+    state = new_game(GameState)
+    state.make_turn(state.find_all_turns()[0])
+    screen = TimerScreen()
+    renderer = Renderer(SilentPen(), screen, convert_to_cartesian)
+    monkeypatch.setattr(main, "current_state", state)
+    monkeypatch.setattr(main, "renderer", renderer)
+    monkeypatch.setattr(main, "engine", Engine(12))
+    monkeypatch.setattr(main, "AI_SECONDS", 0.2)
+    monkeypatch.setattr(main, "SLICE_SECONDS", 0.01)
+
+    main.ai_move(renderer, state)
+    assert(state.current_player == "red")
+    slices = 0
+    while len(screen.timers) > 0:
+        # Clicks while the computer thinks are ignored
+        main.click_handler(-175, -75)
+        assert(state.possible_moves == [])
+        screen.timers.pop(0)()
+        slices += 1
+    assert(slices > 1)
+    assert(main.thinking is None)
+    assert(state.current_player == "black")
+    assert(state.count_pieces("red") == 12)
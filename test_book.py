@@ -0,0 +1,76 @@
+import json
+import random
+from book import OpeningBook, collect_games, write_book
+from selfplay import play_game
+from state import GameState
+from layout import new_game
+
+
+def make_book(tmp_path, games=6):
+    '''
+        Helper function to write self-play games and a book built from
+        them, returning the book path and the games
+    '''
+    games_path = tmp_path / "games.jsonl"
+    results = [play_game(seed, depth=1, max_turns=12, random_turns=1)
+               for seed in range(games)]
+    with open(games_path, "w") as output:
+        for result in results:
+            output.write(json.dumps(result) + "\n")
+    book_path = tmp_path / "book.ckbk"
+    statistics = collect_games([str(games_path)], max_turns=6)
+    assert(write_book(statistics, str(book_path)) == len(statistics))
+    return str(book_path), results
+
+
+def test_lookup(tmp_path):
+    book_path, results = make_book(tmp_path)
+    book = OpeningBook(book_path)
+    state = new_game(GameState)
+    # The random first turns are left out of the book
+    assert(book.lookup(state.hash_key) == [])
+    first = results[0]["moves"][0]
+    for turn in state.find_all_turns():
+        if turn.path == [tuple(location) for location in first]:
+            state.make_turn(turn)
+    records = book.lookup(state.hash_key)
+    assert(sum(record[1] for record in records) ==
+           sum(1 for result in results if result["moves"][0] == first))
+    scores = [record[2] / record[1] for record in records]
+    assert(scores == sorted(scores, reverse=True))
+    assert(book.lookup(state.hash_key ^ 1) == [])
+    book.close()
+
+
+def test_choose(tmp_path):
+    state = new_game(GameState)
+    turns = state.find_all_turns()
+    codes = [turn.code(8) for turn in turns]
+    statistics = {(state.hash_key, codes[0]): [5, 2],
+                  (state.hash_key, codes[1]): [2, 4],
+                  (state.hash_key, codes[2]): [1, 2]}
+    book_path = str(tmp_path / "book.ckbk")
+    write_book(statistics, book_path)
+    book = OpeningBook(book_path, min_games=2)
+    # The most points per game wins over the most played; one game is
+    # too few to count
+    assert(book.choose(state).path == turns[1].path)
+    rng = random.Random(1)
+    drawn = set(tuple(book.choose(state, rng).path) for index in range(50))
+    assert(drawn == set([tuple(turns[0].path), tuple(turns[1].path)]))
+    # Far from the opening the book knows nothing
+    state.make_turn(turns[0])
+    assert(book.choose(state) is None)
+    book.close()
+
+
+def test_collect_by_size(tmp_path):
+    games_path = tmp_path / "games.jsonl"
+    with open(games_path, "w") as output:
+        for seed in range(2):
+            output.write(json.dumps(play_game(seed, depth=1, max_turns=8,
+                                              size=10)) + "\n")
+    # A book holds one board size; games on others are left out
+    assert(collect_games([str(games_path)]) == {})
+    statistics = collect_games([str(games_path)], size=10)
+    assert(sum(games for games, points in statistics.values()) == 2 * 4)
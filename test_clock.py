@@ -0,0 +1,29 @@
+import pytest
+from clock import Clock
+
+
+def test_per_move():
+    clock = Clock(per_move=0.5, margin=0.1)
+    assert(abs(clock.budget() - 0.4) < 1e-9)
+    deadline = clock.start()
+    assert(abs(deadline - clock.started - 0.4) < 1e-9)
+    assert(clock.stop() >= 0)
+    assert(abs(clock.budget() - 0.4) < 1e-9)
+
+
+def test_game_clock():
+    clock = Clock(remaining=60, increment=1, moves_to_go=30, margin=0)
+    assert(abs(clock.budget() - 3) < 1e-9)
+    clock.start()
+    used = clock.stop()
+    assert(abs(clock.remaining - (61 - used)) < 1e-9)
+    # Low on time, at most half of what is left is staked
+    clock = Clock(remaining=1, increment=5, margin=0)
+    assert(clock.budget() == 0.5)
+
+
+def test_needs_time():
+    with pytest.raises(ValueError):
+        Clock()
+    with pytest.raises(ValueError):
+        Clock(increment=1)
@@ -0,0 +1,49 @@
+import pytest
+from encoding import (encode, decode, encode_many, decode_many, to_fen,
+                      from_fen, record_size)
+from state import GameState
+from bitstate import BitBoardGameState
+from layout import new_game, random_positions
+
+
+def test_encode_start():
+    data = encode(new_game(GameState))
+    assert(len(data) == record_size() == 13)
+    assert(data == bytes.fromhex("ff0f0000" "0000f0ff" "00000000" "00"))
+    state = decode(data)
+    assert(state.hash_key == new_game(GameState).hash_key)
+    assert(state.undo_stack == [])
+
+
+def test_round_trip():
+    states = random_positions(GameState, 30, seed=2, max_turns=60)
+    assert(any(state.count_kings("black") > 0 for state in states))
+    for state in states:
+        other = decode(encode(state), BitBoardGameState)
+        assert(isinstance(other, BitBoardGameState))
+        assert(other.hash_key == state.hash_key)
+        assert(other.current_player == state.current_player)
+        assert(from_fen(to_fen(state)).hash_key == state.hash_key)
+
+
+def test_bulk():
+    states = random_positions(GameState, 20, seed=2, max_turns=60)
+    data = encode_many(states)
+    assert(len(data) == 20 * record_size())
+    keys = [state.hash_key for state in decode_many(data)]
+    assert(keys == [state.hash_key for state in states])
+
+
+def test_fen():
+    state = from_fen("W:W18,K30:B11,K1")
+    assert(state.current_player == "red")
+    assert(state.squares[4][3].color == "red")
+    assert(state.squares[7][2].is_king)
+    assert(state.squares[2][5].color == "black")
+    assert(state.squares[0][1].is_king)
+    assert(to_fen(state) == "W:W18,K30:BK1,11")
+    assert(to_fen(new_game(GameState)) ==
+           "B:W21,22,23,24,25,26,27,28,29,30,31,32:"
+           "B1,2,3,4,5,6,7,8,9,10,11,12")
+    with pytest.raises(ValueError):
+        from_fen("X:W18:B11")
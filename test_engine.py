@@ -0,0 +1,205 @@
+import random
+import time
+from engine import Engine
+from clock import Clock
+from state import GameState
+from layout import new_game, make_position, random_positions
+from bitstate import BitBoardGameState
+from evaluation import Evaluator
+from ordering import MoveOrderer
+from transposition import TranspositionTable
+
+
+def test_search_takes_free_piece():
+    state = make_position(GameState, "red", [
+        ("black", False, (2, 3)),
+        ("black", False, (0, 7)),
+        ("red", True, (5, 0)),
+        ("red", False, (3, 4)),
+    ])
+    engine = Engine(3)
+    key = state.hash_key
+    turn = engine.search(state)
+    assert(turn.path == [(3, 4), (1, 2)])
+    assert(state.hash_key == key)
+    assert(state.undo_stack == [])
+    assert(engine.nodes > 0)
+    assert(engine.nodes_per_second() > 0)
+
+
+def test_search_finds_win():
+    state = make_position(GameState, "black", [
+        ("black", True, (4, 3)),
+        ("red", False, (5, 4)),
+    ])
+    engine = Engine(2)
+    turn = engine.search(state)
+    assert(turn.path == [(4, 3), (6, 5)])
+    assert(engine.score > Engine.WIN_SCORE - 10)
+
+
+def test_search_no_moves():
+    state = make_position(GameState, "red", [
+        ("black", False, (0, 1)),
+        ("red", False, (1, 0)),
+        ("black", False, (2, 1)),
+        ("black", False, (3, 2)),
+    ])
+    assert(Engine().search(state) is None)
+
+
+def test_node_limit():
+    engine = Engine(6, 50)
+    turn = engine.search(new_game(GameState))
+    assert(turn is not None)
+    assert(engine.nodes < 200)
+
+
+def test_table_keeps_score_and_saves_nodes():
+    plain = Engine(5)
+    plain.search(new_game(GameState))
+    hashed = Engine(5, table=TranspositionTable(1))
+    hashed.search(new_game(GameState))
+    assert(hashed.score == plain.score)
+    assert(hashed.nodes < plain.nodes)
+
+
+def test_think_respects_clock():
+    state = new_game(GameState)
+    key = state.hash_key
+    engine = Engine(40, table=TranspositionTable(1))
+    started = time.perf_counter()
+    turn = engine.think(state, Clock(per_move=0.1))
+    assert(time.perf_counter() - started < 0.2)
+    assert(turn is not None)
+    assert(engine.completed_depth >= 1)
+    assert(engine.completed_depth < 40)
+    # The aborted search has been taken back completely
+    assert(state.hash_key == key)
+    assert(state.undo_stack == [])
+    assert(state.current_player == "black")
+
+
+def test_think_matches_search():
+    state = new_game(GameState)
+    engine = Engine(3)
+    turn = engine.think(state, Clock(per_move=60))
+    assert(engine.completed_depth == 3)
+    plain = Engine(3)
+    assert(plain.search(state).path == turn.path)
+    assert(plain.score == engine.score)
+
+
+def test_think_steps_are_short():
+    state = random_positions(BitBoardGameState, 1, seed=5, min_turns=16,
+                             max_turns=24, min_choices=3)[0]
+    key = state.hash_key
+    engine = Engine(12, table=TranspositionTable(4), evaluator=Evaluator(),
+                    orderer=MoveOrderer(), quiescence=True)
+    longest = 0.0
+    steps = 0
+    thinking = engine.think_steps(state, Clock(per_move=1.0), 0.02)
+    while True:
+        started = time.perf_counter()
+        try:
+            next(thinking)
+        except StopIteration:
+            break
+        longest = max(longest, time.perf_counter() - started)
+        steps += 1
+    assert(steps > 10)
+    assert(longest < 0.1)
+    assert(engine.completed_depth >= 1)
+    assert(engine.best_turn.path in
+           [turn.path for turn in state.find_all_turns()])
+    assert(state.hash_key == key)
+    assert(state.undo_stack == [])
+
+
+def test_closed_think_steps_stop():
+    state = new_game(GameState)
+    engine = Engine(40, table=TranspositionTable(1))
+    thinking = engine.think_steps(state, Clock(per_move=60), 0.01)
+    next(thinking)
+    started = time.perf_counter()
+    thinking.close()
+    assert(time.perf_counter() - started < 0.5)
+    assert(engine.deadline is None)
+    assert(engine.search(state, 2) is not None)
+
+
+def test_quiescence_sees_hanging_piece():
+    pieces = [
+        ("black", False, (2, 1)),
+        ("black", False, (0, 7)),
+        ("red", False, (4, 3)),
+        ("red", False, (7, 0)),
+    ]
+    state = make_position(GameState, "red", pieces)
+    hanging = [turn for turn in state.find_all_turns()
+               if turn.path == [(4, 3), (3, 2)]][0]
+    state.make_turn(hanging)
+    plain = Engine(1)
+    quiet = Engine(1, quiescence=True)
+    limited = Engine(1, quiescence=True, quiescence_limit=0)
+    window = (-Engine.WIN_SCORE - 1, Engine.WIN_SCORE + 1)
+    assert(plain.negamax(state, 0, window[0], window[1], 1) == 0)
+    assert(quiet.negamax(state, 0, window[0], window[1], 1) ==
+           Engine.MAN_VALUE)
+    assert(quiet.quiescence_nodes == 1)
+    assert(quiet.quiescence_depth == 1)
+    assert(limited.negamax(state, 0, window[0], window[1], 1) == 0)
+    state.unmake_turn(hanging)
+
+    engine = Engine(1, quiescence=True)
+    turn = engine.search(state)
+    assert(turn.path != [(4, 3), (3, 2)])
+    assert(engine.score == 0)
+    assert(engine.quiescence_nodes > 0)
+    assert(state.undo_stack == [])
+
+
+def test_quiescence_keeps_search_result():
+    state = new_game(GameState)
+    plain = Engine(4)
+    quiet = Engine(4, quiescence=True)
+    plain.search(state)
+    quiet.search(state)
+    assert(quiet.score == plain.score)
+    assert(quiet.quiescence_nodes > 0)
+
+
+def test_node_limit_keeps_table_exact():
+    state = new_game(GameState)
+    table = TranspositionTable(1)
+    limited = Engine(6, node_limit=30, table=table)
+    limited.search(state)
+    assert(limited.truncated)
+    assert(table.probe(state.hash_key) is None)
+    reused = Engine(4, table=table)
+    fresh = Engine(4, table=TranspositionTable(1))
+    reused.search(state)
+    fresh.search(state)
+    assert(not fresh.truncated)
+    assert(reused.score == fresh.score)
+    assert(table.probe(state.hash_key)[2] == TranspositionTable.EXACT)
+
+
+def test_quiescence_limit_per_move():
+    rng = random.Random(2)
+    state = new_game(GameState)
+    for turn_number in range(8):
+        state.make_turn(rng.choice(state.find_all_turns()))
+    engine = Engine(4, quiescence=True)
+    engine.think(state, Clock(per_move=60))
+    unlimited = engine.quiescence_nodes
+    assert(unlimited > 0)
+
+    table = TranspositionTable(1)
+    engine = Engine(4, table=table, quiescence=True,
+                    quiescence_limit=unlimited // 2)
+    engine.think(state, Clock(per_move=60))
+    # The limit holds over all the depths of the move together
+    assert(engine.quiescence_nodes <= unlimited // 2)
+    assert(engine.truncated)
+    assert(table.probe(state.hash_key)[0] < 4)
@@ -0,0 +1,99 @@
+import random
+from evaluation import Evaluator
+from engine import Engine
+from weights import Weights, weights_for_size
+from piece import Piece
+from state import GameState
+from bitstate import BitBoardGameState
+from layout import new_game
+
+
+def test_square_score_follows_moves():
+    for state_class in (GameState, BitBoardGameState):
+        rng = random.Random(3)
+        state = new_game(state_class)
+        Evaluator().prepare(state)
+        assert(state.weights is weights_for_size(8))
+        assert(state.square_score == 0)
+        played = []
+        scores = []
+        for turn_number in range(60):
+            turns = state.find_all_turns()
+            if len(turns) == 0:
+                break
+            scores.append(state.square_score)
+            turn = rng.choice(turns)
+            state.make_turn(turn)
+            played.append(turn)
+            assert(state.square_score ==
+                   weights_for_size(8).score_squares(state.squares))
+        while len(played) > 0:
+            state.unmake_turn(played.pop())
+            assert(state.square_score == scores.pop())
+        assert(state.square_score == 0)
+
+
+def test_evaluate():
+    state = new_game(GameState)
+    evaluator = Evaluator()
+    assert(evaluator.evaluate(state) == 0)
+    # A red man gone is good for black, bad for red
+    state.update_square((5, 0), None)
+    state.load_current_piece_locations()
+    score = evaluator.evaluate(state)
+    assert(score > 0)
+    state.next_round()
+    assert(evaluator.evaluate(state) == -score)
+
+
+def test_mobility():
+    state = GameState(Piece.BLACK, GameState.INITIAL_STATE)
+    state.squares = [[None] * 4 for row in range(4)]
+    state.squares[0][1] = Piece(Piece.BLACK, False, (0, 1))
+    state.squares[0][3] = Piece(Piece.BLACK, False, (0, 3))
+    # The red man on (3, 0) is blocked by its own man
+    state.squares[3][0] = Piece(Piece.RED, False, (3, 0))
+    state.squares[2][1] = Piece(Piece.RED, False, (2, 1))
+    state.load_current_piece_locations()
+    assert(state.count_movable(Piece.BLACK) == 2)
+    assert(state.count_movable(Piece.RED) == 1)
+    without = Evaluator(mobility=0).evaluate(state)
+    assert(without == weights_for_size(4).score_squares(state.squares))
+    assert(Evaluator(mobility=5).evaluate(state) == without + 5)
+
+
+def test_engine_uses_evaluator():
+    evaluator = Evaluator()
+    engine = Engine(3, evaluator=evaluator)
+    state = new_game(GameState)
+    assert(engine.evaluate(state) == evaluator.evaluate(state))
+    turn = engine.search(state)
+    assert(turn is not None)
+    assert(state.square_score == 0)
+    assert(Engine(3).evaluate(state) == 0)
+
+
+def test_default_state_keeps_no_score():
+    state = new_game(GameState)
+    assert(state.weights is None)
+    state.make_turn(state.find_all_turns()[0])
+    assert(state.square_score == 0)
+    assert(state.copy().weights is None)
+
+
+def test_own_weights():
+    state = new_game(GameState)
+    state.update_square((5, 0), None)
+    state.load_current_piece_locations()
+    default = Evaluator(mobility=0).evaluate(state)
+    weights = Weights(8)
+    for color in weights.values:
+        for row in weights.values[color][False]:
+            row[:] = [Weights.MAN_VALUE] * len(row)
+    evaluator = Evaluator(mobility=0, weights=weights)
+    score = evaluator.evaluate(state)
+    assert(score == weights.score_squares(state.squares))
+    evaluator.prepare(state)
+    assert(state.weights is weights)
+    assert(evaluator.evaluate(state) == score)
+    assert(score != default)
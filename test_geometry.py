@@ -0,0 +1,45 @@
+from geometry import Geometry, geometry_for_size
+from piece import Piece
+from move import Move
+from state import GameState
+from layout import new_game
+
+
+def test_tables_are_shared():
+    assert(geometry_for_size(8) is geometry_for_size(8))
+    assert(geometry_for_size(4).size == 4)
+
+
+def test_targets():
+    geometry = Geometry(4)
+    corner = geometry.targets[0][0]
+    assert(corner[(-1, -1)] is None)
+    assert(corner[(-1, 1)] is None)
+    assert(corner[(1, -1)] is None)
+    step, step_move, jump, jump_move = corner[(1, 1)]
+    assert(step == (1, 1) and jump == (2, 2))
+    assert((step_move.start, step_move.end) == ((0, 0), (1, 1)))
+    assert(not step_move.is_capture)
+    assert(jump_move.is_capture and jump_move.captured_location == (1, 1))
+    # A step on the board whose jump leaves it
+    assert(geometry.targets[2][1][(1, 1)][2:] == (None, None))
+
+
+def test_nearby():
+    geometry = Geometry(8)
+    assert(sorted(geometry.nearby[0][0]) == [(0, 0), (1, 1), (2, 2)])
+    assert(len(geometry.nearby[4][4]) == 9)
+
+
+def test_moves_are_interned():
+    state = new_game(GameState)
+    first = state.find_possible_moves((2, 1))
+    second = state.find_possible_moves((2, 1))
+    assert(all(a is b for a, b in zip(first, second)))
+
+
+def test_slots():
+    piece = Piece("black", False, (0, 1))
+    move = Move((0, 1), (1, 0), False, None)
+    assert(not hasattr(piece, "__dict__"))
+    assert(not hasattr(move, "__dict__"))
@@ -0,0 +1,64 @@
+import io
+import json
+import instrument
+from state import GameState
+from layout import new_game
+from engine import Engine
+
+
+def test_enable_counts_calls():
+    instrument.enable()
+    try:
+        instrument.reset()
+        state = new_game(GameState)
+        turns = state.find_all_turns()
+        state.make_turn(turns[0])
+        counters = instrument.snapshot()
+    finally:
+        instrument.disable()
+    assert(counters["GameState.find_all_turns"]["calls"] == 1)
+    assert(counters["GameState.find_possible_moves"]["calls"] > 0)
+    assert(counters["GameState.move"]["calls"] == 1)
+    assert(counters["GameState.move"]["category"] == "state")
+    assert(counters["GameState.find_all_turns"]["category"] ==
+           "move generation")
+    assert(counters["GameState.move"]["seconds"] >= 0)
+
+
+def test_disable_restores_originals():
+    move = GameState.__dict__["move"]
+    instrument.enable()
+    assert(instrument.is_enabled())
+    assert(GameState.__dict__["move"] is not move)
+    instrument.disable()
+    assert(not instrument.is_enabled())
+    assert(GameState.__dict__["move"] is move)
+
+
+def test_disabled_counts_nothing():
+    instrument.reset()
+    state = new_game(GameState)
+    state.find_all_turns()
+    assert(instrument.snapshot() == {})
+
+
+def test_dump():
+    instrument.enable()
+    try:
+        instrument.reset()
+        new_game(GameState).find_all_turns()
+    finally:
+        instrument.disable()
+    output = io.StringIO()
+    instrument.dump(output)
+    counters = json.loads(output.getvalue())
+    assert(counters["GameState.find_all_turns"]["calls"] == 1)
+
+
+def test_profile():
+    engine = Engine(2)
+    state = new_game(GameState)
+    turn, report = instrument.profile(engine.search, state)
+    assert(turn is not None)
+    assert("cumulative" in report)
+    assert("negamax" in report)
@@ -0,0 +1,57 @@
+from layout import (BLACK, RED, EMPTY, SIZES, NESTED_LIST, make_layout,
+                    new_game, make_position, random_positions)
+from state import GameState
+from bitstate import BitBoardGameState
+
+
+def test_make_layout():
+    assert(make_layout(8) == NESTED_LIST)
+    for size in SIZES:
+        nested_list = make_layout(size)
+        assert(len(nested_list) == size)
+        rows = size // 2 - 1
+        for row in range(size):
+            for col in range(size):
+                color = nested_list[row][col]
+                if (row + col) % 2 == 0 or rows <= row < size - rows:
+                    assert(color == EMPTY)
+                else:
+                    assert(color == (BLACK if row < rows else RED))
+
+
+def test_new_game_sizes():
+    for size in SIZES:
+        men = (size // 2 - 1) * size // 2
+        for state_class in (GameState, BitBoardGameState):
+            state = new_game(state_class, size)
+            assert(state.size == size)
+            assert(len(state.squares) == size)
+            assert(state.count_pieces(BLACK) == men)
+            assert(state.count_pieces(RED) == men)
+            assert(len(state.find_all_turns()) == size - 1)
+            assert(state.square_score == 0)
+    assert(new_game(GameState, 10).copy().size == 10)
+
+
+def test_random_positions():
+    first = random_positions(GameState, 5, seed=4, min_turns=2,
+                             max_turns=10, min_choices=2)
+    second = random_positions(GameState, 5, seed=4, min_turns=2,
+                              max_turns=10, min_choices=2)
+    assert([state.hash_key for state in first] ==
+           [state.hash_key for state in second])
+    start = new_game(GameState).hash_key
+    for state in first:
+        assert(state.undo_stack == [])
+        assert(len(state.find_all_turns()) >= 2)
+        assert(state.hash_key != start)
+    assert(random_positions(BitBoardGameState, 2, size=10)[0].size == 10)
+
+
+def test_make_position():
+    state = make_position(GameState, RED, [(BLACK, True, (3, 2)),
+                                           (RED, False, (4, 7))], size=10)
+    assert(len(state.squares) == 10)
+    assert(state.current_player == RED)
+    assert(state.count_kings(BLACK) == 1)
+    assert(state.piece_locations_by_player[RED] == {(4, 7)})
@@ -0,0 +1,82 @@
+import random
+from ordering import MoveOrderer
+from engine import Engine
+from evaluation import Evaluator
+from state import GameState
+from layout import new_game
+from transposition import TranspositionTable
+from clock import Clock
+
+
+def codes_of(turns):
+    return [turn.code(8) for turn in turns]
+
+
+def test_order_table_then_killers_then_history():
+    state = new_game(GameState)
+    turns = state.find_all_turns()
+    codes = codes_of(turns)
+    orderer = MoveOrderer()
+    assert(orderer.order(turns, codes, 0) == turns)
+    orderer.record_cutoff(turns[5], codes[5], 1, 3)
+    orderer.record_cutoff(turns[4], codes[4], 1, 1)
+    orderer.record_cutoff(turns[3], codes[3], 2, 2)
+    ordered = orderer.order(turns, codes, 1, codes[6])
+    assert(ordered[:4] == [turns[6], turns[4], turns[5], turns[3]])
+    assert(ordered[4:] == [turn for turn in turns if turn not in ordered[:4]])
+    assert(len(ordered) == len(turns))
+
+
+def test_killer_slots():
+    state = new_game(GameState)
+    turns = state.find_all_turns()
+    codes = codes_of(turns)
+    orderer = MoveOrderer()
+    for index in (0, 1, 2, 1):
+        orderer.record_cutoff(turns[index], codes[index], 0, 1)
+    assert(orderer.killers[0] == [codes[1], codes[2]])
+    assert(orderer.history[codes[1]] == 2)
+
+
+def test_new_search():
+    orderer = MoveOrderer()
+    orderer.killers = [[1, 2]]
+    orderer.history = {1: 9, 2: 1}
+    orderer.new_search()
+    assert(orderer.killers == [])
+    assert(orderer.history == {1: 4})
+
+
+def test_same_score_fewer_nodes():
+    rng = random.Random(1)
+    saved = 0
+    for game in range(3):
+        state = new_game(GameState)
+        for turn_number in range(rng.randint(2, 12)):
+            state.make_turn(rng.choice(state.find_all_turns()))
+        plain = Engine(5, evaluator=Evaluator())
+        ordered = Engine(5, table=TranspositionTable(1),
+                         evaluator=Evaluator(), orderer=MoveOrderer())
+        plain.search(state)
+        nodes = 0
+        ordered.new_move()
+        for depth in range(1, 6):
+            for step in ordered.search_iteration(state, depth):
+                pass
+            nodes += ordered.nodes
+        assert(ordered.score == plain.score)
+        saved += plain.nodes - nodes
+    assert(saved > 0)
+
+
+def test_think_keeps_ordering_between_depths():
+    state = new_game(GameState)
+    orderer = MoveOrderer()
+    engine = Engine(5, table=TranspositionTable(1), orderer=orderer)
+    calls = []
+    new_search = orderer.new_search
+    orderer.new_search = lambda: calls.append(1) or new_search()
+    engine.think(state, Clock(per_move=60))
+    assert(engine.completed_depth == 5)
+    assert(len(calls) == 1)
+    assert(len(orderer.killers) > 0)
@@ -0,0 +1,51 @@
+from parallel import ParallelSearch, make_engine
+from engine import Engine
+from state import GameState
+from layout import new_game, random_positions
+
+
+def test_same_score_as_engine():
+    search = ParallelSearch(4, processes=2, table_mb=1, evaluate=False,
+                            order=False, quiescence=False)
+    try:
+        state = new_game(GameState)
+        state.make_turn(state.find_all_turns()[2])
+        key = state.hash_key
+        turn = search.search(state)
+        engine = Engine(4)
+        engine.search(state)
+        assert(search.score == engine.score)
+        assert(turn.path in
+               [other.path for other in state.find_all_turns()])
+        assert(state.hash_key == key)
+        assert(len(state.undo_stack) == 1)
+        assert(search.nodes > 0)
+    finally:
+        search.close()
+
+
+def test_no_moves():
+    search = ParallelSearch(2, processes=1, table_mb=1)
+    try:
+        state = new_game(GameState)
+        for row in state.squares:
+            for col in range(len(row)):
+                if row[col] is not None and row[col].color == "black":
+                    row[col] = None
+        state.load_current_piece_locations()
+        assert(search.search(state) is None)
+    finally:
+        search.close()
+
+
+def test_same_score_as_game_engine():
+    search = ParallelSearch(4, processes=2, table_mb=1)
+    try:
+        for state in random_positions(GameState, 4, seed=3, min_turns=6,
+                                      max_turns=20, min_choices=2):
+            search.search(state)
+            engine = make_engine(4, 1, True, True, True)
+            engine.search(state)
+            assert(search.score == engine.score)
+    finally:
+        search.close()
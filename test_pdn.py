@@ -0,0 +1,104 @@
+import io
+import pytest
+from pdn import (read_games, write_game, replay, square_number,
+                 square_location, format_path, parse_path)
+from selfplay import play_game
+
+
+SAMPLE = """[Event "Club match"]
+[Black "A"]
+[White "B"]
+[Result "1-0"]
+1. 11-15 {a quiet
+opening} 23-19 2. 8-11 (2. 9-14 22-17) 22-17
+3. 9-13! 17-14 4. 10x17 *
+
+[Event "Second"]
+1. 11-15 22-18 2. 15x22 25x18 1-0
+"""
+SHORT_CAPTURE = ["11-15", "22-18", "15x22", "25x18", "12-16", "29-25",
+                 "9-13", "18-14", "10x17", "21x14", "8-11", "25-22", "6-9",
+                 "24-20", "9x18x25"]
+
+
+def test_square_numbers():
+    assert(square_number((0, 1)) == 1)
+    assert(square_number((2, 5)) == 11)
+    assert(square_number((7, 6)) == 32)
+    for number in range(1, 33):
+        location = square_location(number)
+        assert((location[0] + location[1]) % 2 == 1)
+        assert(square_number(location) == number)
+    assert(format_path([(5, 0), (3, 2), (1, 4)]) == "21x14x7")
+    assert(parse_path("11-15") == [(2, 5), (3, 4)])
+
+
+def test_read_games():
+    games = list(read_games(io.StringIO(SAMPLE)))
+    assert(len(games) == 2)
+    first, second = games
+    assert(first["tags"]["Event"] == "Club match")
+    assert(first["result"] == "*")
+    assert(first["winner"] is None)
+    assert([format_path(path) for path in first["moves"]] == [
+        "11-15", "23-19", "8-11", "22-17", "9-13", "17-14", "10x17"])
+    assert(second["tags"] == {"Event": "Second"})
+    assert(second["winner"] == "black")
+    replay(first["moves"])
+
+
+def test_round_trip():
+    game = play_game(7, depth=1, max_turns=60)
+    output = io.StringIO()
+    write_game(output, game)
+    write_game(output, game)
+    output.seek(0)
+    games = list(read_games(output))
+    assert(len(games) == 2)
+    assert(games[0]["moves"] == [[tuple(location) for location in path]
+                                 for path in game["moves"]])
+    assert(games[0]["winner"] == game["winner"])
+    for line in output.getvalue().splitlines():
+        assert(len(line) <= 79)
+    state = replay(games[0]["moves"])
+    assert(state.undo_stack == [])
+
+
+def test_larger_board_round_trip():
+    game = play_game(7, depth=1, max_turns=40, size=10)
+    output = io.StringIO()
+    write_game(output, game)
+    assert('[GameType "21,B,10,10"]' in output.getvalue())
+    output.seek(0)
+    games = list(read_games(output))
+    assert(games[0]["size"] == 10)
+    assert(games[0]["moves"] == [[tuple(location) for location in path]
+                                 for path in game["moves"]])
+    state = replay(games[0]["moves"], size=10)
+    assert(len(state.squares) == 10)
+
+
+def test_replay_rejects_illegal_turns():
+    with pytest.raises(ValueError):
+        replay([parse_path("11-14")])
+    with pytest.raises(ValueError):
+        replay([parse_path("22-18")])
+    # 10x17 is forced, a step instead is illegal
+    with pytest.raises(ValueError):
+        replay([parse_path(move) for move in
+                ("11-15", "23-19", "8-11", "22-17", "9-13", "17-14",
+                 "15-18")])
+    # The capture goes on to the end
+    with pytest.raises(ValueError):
+        replay([parse_path(move) for move in SHORT_CAPTURE[:-1]] +
+               [parse_path("9x18")])
+
+
+def test_replay_short_capture():
+    full = replay([parse_path(move) for move in SHORT_CAPTURE])
+    # The double capture written with its first and last squares only
+    short = replay([parse_path(move) for move in SHORT_CAPTURE[:-1]] +
+                   [parse_path("9x25")])
+    assert(short.hash_key == full.hash_key)
+    assert(short.current_player == "red")
+    assert(short.count_pieces("red") == 8)
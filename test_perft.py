@@ -0,0 +1,70 @@
+from perft import (POSITIONS, KNOWN_COUNTS, load_position, perft, divide,
+                   mask_perft)
+from state import GameState
+from bitstate import BitBoardGameState
+
+
+def test_positions_use_dark_squares():
+    for name in POSITIONS:
+        state = load_position(name)
+        for locations in state.piece_locations_by_player.values():
+            for row, col in locations:
+                assert((row + col) % 2 == 1)
+
+
+def test_start_counts():
+    state = load_position("start")
+    for depth in range(1, 7):
+        assert(perft(state, depth) == KNOWN_COUNTS["start"][depth - 1])
+    assert(state.undo_stack == [])
+
+
+def test_stored_position_counts():
+    for name in POSITIONS:
+        for state_class in (GameState, BitBoardGameState):
+            state = load_position(name, state_class)
+            key = state.hash_key
+            counts = [perft(state, depth)
+                      for depth in range(1, len(KNOWN_COUNTS[name]) + 1)]
+            assert(counts == KNOWN_COUNTS[name])
+            assert(state.hash_key == key)
+
+
+def test_larger_boards_agree():
+    for size in (10, 12):
+        counts = []
+        for state_class in (GameState, BitBoardGameState):
+            state = load_position("start", state_class, size)
+            counts.append([perft(state, depth) for depth in range(1, 5)])
+        assert(counts[0] == counts[1])
+        assert(counts[0][0] == size - 1)
+
+
+def test_crowning_capture_goes_on_as_king():
+    state = load_position("crowning_capture")
+    turns = state.find_all_turns()
+    assert([turn.path for turn in turns] == [[(5, 2), (7, 4), (5, 6)]])
+    assert(turns[0].promotes)
+
+
+def test_divide():
+    state = load_position("start")
+    counts = divide(state, 3)
+    assert(len(counts) == 7)
+    assert(sum(leaves for path, leaves in counts) == 302)
+
+
+def test_mask_perft_counts():
+    for name in ["start"] + list(POSITIONS):
+        state = load_position(name, BitBoardGameState)
+        board = state.board
+        masks = (board.black, board.red, board.kings)
+        known = KNOWN_COUNTS[name][:6]
+        counts = [mask_perft(board, state.current_player, depth)
+                  for depth in range(1, len(known) + 1)]
+        assert(counts == known)
+        assert((board.black, board.red, board.kings) == masks)
+    for size in (10, 12):
+        state = load_position("start", BitBoardGameState, size)
+        assert(mask_perft(state.board, state.current_player, 4) ==
+               perft(state, 4))
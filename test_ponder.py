@@ -0,0 +1,41 @@
+import time
+from ponder import Ponderer
+from engine import Engine
+from state import GameState
+from layout import new_game
+from transposition import TranspositionTable
+
+
+def test_ponder_hit_fills_table():
+    state = new_game(GameState)
+    table = TranspositionTable(1)
+    ponderer = Ponderer(table, depth=6)
+    ponderer.start(state)
+    time.sleep(0.2)
+    reply = Engine(3, table=TranspositionTable(1)).search(state)
+    state.make_turn(reply)
+    assert(ponderer.stop(state))
+    assert(ponderer.hits == 1)
+    assert(ponderer.thread is None)
+    # The pondered position is in the shared table
+    assert(table.probe(state.hash_key) is not None)
+
+
+def test_ponder_miss():
+    state = new_game(GameState)
+    ponderer = Ponderer(TranspositionTable(1), depth=6)
+    ponderer.start(state)
+    state.make_turn(state.find_all_turns()[-1])
+    state.make_turn(state.find_all_turns()[0])
+    assert(not ponderer.stop(state))
+    assert(ponderer.misses == 1)
+    assert(not ponderer.stop(state))
+
+
+def test_stop_is_quick():
+    ponderer = Ponderer(TranspositionTable(1), depth=30, seconds=60)
+    ponderer.start(new_game(GameState))
+    time.sleep(0.1)
+    started = time.perf_counter()
+    ponderer.stop()
+    assert(time.perf_counter() - started < 0.1)
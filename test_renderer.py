@@ -0,0 +1,66 @@
+from renderer import Renderer
+from state import GameState
+from move import Move
+from layout import new_game
+
+
+class RecordingPen:
+    '''
+        Stand-in for Draw that records the drawing calls
+    '''
+    def __init__(self):
+        self.calls = []
+
+    def draw_empty_square(self, pair):
+        self.calls.append(("empty", pair))
+
+    def draw_actual_move(self, pair, color, is_king):
+        self.calls.append(("piece", pair, color, is_king))
+
+    def outline_possible_move(self, pair, color):
+        self.calls.append(("outline", pair, color))
+
+
+class RecordingScreen:
+    def __init__(self):
+        self.updates = 0
+
+    def update(self):
+        self.updates += 1
+
+
+def new_renderer():
+    return Renderer(RecordingPen(), RecordingScreen(),
+                    lambda location: (location[1], location[0]))
+
+
+def test_render_only_changed_squares():
+    state = new_game(GameState)
+    renderer = new_renderer()
+    changed = state.move(Move((2, 1), (3, 2), False, None))
+    assert(changed == [(2, 1), (3, 2)])
+    renderer.mark(changed)
+    renderer.render(state)
+    assert(sorted(renderer.pen.calls) == [
+        ("empty", (1, 2)), ("empty", (2, 3)),
+        ("piece", (2, 3), "black", False)])
+    assert(renderer.screen.updates == 1)
+    # Nothing changed, nothing drawn
+    renderer.render(state)
+    assert(len(renderer.pen.calls) == 3)
+    assert(renderer.screen.updates == 1)
+
+
+def test_highlight():
+    state = new_game(GameState)
+    renderer = new_renderer()
+    renderer.highlight([(3, 0), (3, 2)])
+    renderer.render(state)
+    assert(("outline", (0, 3), "red") in renderer.pen.calls)
+    assert(("outline", (2, 3), "red") in renderer.pen.calls)
+    renderer.pen.calls = []
+    renderer.highlight([(3, 2), (3, 4)])
+    renderer.render(state)
+    # (3, 0) loses its outline, (3, 2) keeps it untouched
+    assert(sorted(renderer.pen.calls) == [
+        ("empty", (0, 3)), ("empty", (4, 3)), ("outline", (4, 3), "red")])
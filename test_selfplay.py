@@ -0,0 +1,44 @@
+import json
+from selfplay import play_game, run_games
+from state import GameState
+from layout import new_game
+
+
+def test_play_game_is_reproducible():
+    first = play_game(3, depth=2, max_turns=40)
+    second = play_game(3, depth=2, max_turns=40)
+    other = play_game(4, depth=2, max_turns=40)
+    assert(first == second)
+    assert(first["moves"] != other["moves"])
+    assert(first["turns"] == len(first["moves"]))
+    assert(first["size"] == 8)
+    assert(first["winner"] in ("black", "red", None))
+
+
+def test_material_engine_option():
+    result = play_game(3, depth=2, max_turns=40, evaluate=False,
+                       order=False, quiescence=False)
+    assert(result == play_game(3, depth=2, max_turns=40, evaluate=False,
+                               order=False, quiescence=False))
+    assert(result["turns"] == len(result["moves"]))
+
+
+def test_moves_replay():
+    result = play_game(5, depth=1, max_turns=60)
+    state = new_game(GameState)
+    for path in result["moves"]:
+        turns = [turn for turn in state.find_all_turns()
+                 if turn.path == [tuple(location) for location in path]]
+        assert(len(turns) == 1)
+        state.make_turn(turns[0])
+
+
+def test_run_games(tmp_path):
+    output = tmp_path / "games.jsonl"
+    summary = run_games(6, str(output), processes=2, seed=10,
+                        depth=1, max_turns=30)
+    lines = output.read_text().splitlines()
+    assert(len(lines) == 6)
+    assert(sum(summary.values()) == 6)
+    seeds = sorted(json.loads(line)["seed"] for line in lines)
+    assert(seeds == list(range(10, 16)))
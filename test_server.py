@@ -0,0 +1,149 @@
+import asyncio
+import concurrent.futures
+import concurrent.futures.process
+import threading
+from server import GameServer, engine_turn
+from encoding import encode
+from layout import new_game
+from state import GameState
+from loadgen import run_load
+
+
+def make_server():
+    '''
+        Helper function to build a server searching in threads
+    '''
+    return GameServer(depth=2,
+                      executor=concurrent.futures.ThreadPoolExecutor(2))
+
+
+def test_session_flow():
+    server = make_server()
+
+    async def play():
+        answer = await server.handle_request({"op": "new"})
+        assert(answer["ok"])
+        assert(answer["reply"] is None)
+        assert(sorted(answer["moves"]) == ["10-14", "10-15", "11-15",
+                                           "11-16", "12-16", "9-13", "9-14"])
+        session = answer["session"]
+        answer = await server.handle_request(
+            {"op": "move", "session": session, "move": "11-15"})
+        assert(answer["ok"])
+        assert(answer["reply"] is not None)
+        assert(answer["turns"] == 2)
+        assert(answer["fen"].startswith("B:"))
+        bad = await server.handle_request(
+            {"op": "move", "session": session, "move": "11-15"})
+        assert(bad == {"ok": False, "error": "illegal move"})
+        state = await server.handle_request({"op": "state",
+                                             "session": session})
+        assert(state["fen"] == answer["fen"])
+        await server.handle_request({"op": "close", "session": session})
+        assert(server.sessions == {})
+        missing = await server.handle_request({"op": "state",
+                                               "session": session})
+        assert(not missing["ok"])
+
+        answer = await server.handle_request({"op": "new", "color": "red"})
+        assert(answer["reply"] is not None)
+        assert(answer["fen"].startswith("W:"))
+        assert(len(answer["moves"]) > 0)
+
+    asyncio.run(play())
+    server.executor.shutdown()
+
+
+def test_load_over_tcp():
+    server = make_server()
+
+    async def load():
+        listener = await asyncio.start_server(server.handle_client,
+                                              "127.0.0.1", 0)
+        port = listener.sockets[0].getsockname()[1]
+        async with listener:
+            return await run_load("127.0.0.1", port, 5, 1)
+
+    games, errors, elapsed, latencies = asyncio.run(load())
+    assert(errors == 0)
+    assert(games == 5)
+    assert(len(latencies) >= 10)
+    assert(latencies == sorted(latencies))
+    # Every client closed its session
+    assert(server.sessions == {})
+    server.executor.shutdown()
+
+
+def test_threads_have_own_engines():
+    data = encode(new_game(GameState))
+    paths = []
+    threads = [threading.Thread(
+        target=lambda: paths.append(engine_turn(data, 3, None, 1)))
+        for index in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert(len(paths) == 4)
+    legal = [turn.path for turn in new_game(GameState).find_all_turns()]
+    for path in paths:
+        assert(path in legal)
+
+
+class BrokenExecutor(concurrent.futures.ThreadPoolExecutor):
+    '''
+        Helper class: an executor whose every search fails as a broken
+        process pool does
+    '''
+
+    def submit(self, function, *arguments):
+        future = concurrent.futures.Future()
+        future.set_exception(concurrent.futures.process.BrokenProcessPool(
+            "a worker died"))
+        return future
+
+
+def test_search_failure_is_answered():
+    server = GameServer(depth=2, executor=BrokenExecutor(1))
+
+    async def play():
+        answer = await server.handle_request({"op": "new", "color": "red"})
+        assert(not answer["ok"])
+        assert(answer["error"] == "search failed: a worker died")
+        session = answer["session"]
+        # Once the pool works again the computer's turn is searched anew
+        server.executor = concurrent.futures.ThreadPoolExecutor(1)
+        answer = await server.handle_request(
+            {"op": "move", "session": session, "move": "11-15"})
+        assert(answer["ok"])
+        assert(answer["reply"] is not None)
+        assert(len(answer["moves"]) > 0)
+
+    asyncio.run(play())
+    server.executor.shutdown()
+
+
+def test_disconnect_ends_sessions():
+    server = make_server()
+
+    async def leave():
+        listener = await asyncio.start_server(server.handle_client,
+                                              "127.0.0.1", 0)
+        port = listener.sockets[0].getsockname()[1]
+        async with listener:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            for index in range(3):
+                writer.write(b'{"op": "new"}\n')
+                await writer.drain()
+                await reader.readline()
+            assert(len(server.sessions) == 3)
+            # Gone without closing its games
+            writer.close()
+            for index in range(100):
+                if len(server.sessions) == 0:
+                    break
+                await asyncio.sleep(0.01)
+
+    asyncio.run(leave())
+    assert(server.sessions == {})
+    server.executor.shutdown()
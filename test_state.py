@@ -1,6 +1,8 @@
+import random
 from state import GameState
 from piece import Piece
 from move import Move
+from layout import new_game
 
 SQUARE = [
     [None, Piece("black", False, (0, 1))],
@@ -27,6 +29,8 @@ def test_constructor():
     assert(state2.state == move)
     assert(state2.current_player == player2)
     assert(state1.possible_moves == [])
+    assert(state1.size == 8)
+    assert(GameState(player1, init, 10).size == 10)
 
 
 def test_load_current_piece_locations():
@@ -136,6 +140,64 @@ def test_has_capturing_move():
     assert(not game2.has_capturing_move())
 
 
+def test_find_all_turns():
+    state = new_game(GameState)
+    turns = state.find_all_turns()
+    assert(len(turns) == 7)
+    assert(all(not turn.is_capture for turn in turns))
+
+    state = GameState("black", 1)
+    state.squares = [[None] * 8 for i in range(8)]
+    for color, location in (("black", (0, 1)), ("black", (2, 7)),
+                            ("red", (1, 2)), ("red", (3, 4)),
+                            ("red", (3, 2)), ("red", (6, 1))):
+        state.squares[location[0]][location[1]] = \
+            Piece(color, False, location)
+    state.load_current_piece_locations()
+    key = state.hash_key
+    turns = state.find_all_turns()
+    # Captures are mandatory for every piece and chains are completed
+    assert(sorted(turn.path for turn in turns) ==
+           [[(0, 1), (2, 3), (4, 1)], [(0, 1), (2, 3), (4, 5)]])
+    assert(sorted(turn.captured for turn in turns) ==
+           [[(1, 2), (3, 2)], [(1, 2), (3, 4)]])
+    assert(state.hash_key == key)
+    assert(state.undo_stack == [])
+
+
+def test_find_all_turns_promotion():
+    state = GameState("black", 1)
+    state.squares = [[None] * 4 for i in range(4)]
+    state.squares[1][0] = Piece("black", False, (1, 0))
+    state.squares[2][1] = Piece("red", False, (2, 1))
+    state.squares[1][2] = Piece("red", False, (1, 2))
+    state.load_current_piece_locations()
+    turns = state.find_all_turns()
+    assert(len(turns) == 1)
+    assert(turns[0].path == [(1, 0), (3, 2)])
+    assert(turns[0].promotes)
+    assert(not state.squares[1][0].is_king)
+
+    state.next_round()
+    turns = state.find_all_turns()
+    assert(sorted(turn.path for turn in turns) ==
+           [[(1, 2), (0, 1)], [(1, 2), (0, 3)]])
+    assert(all(turn.promotes for turn in turns))
+
+
+def test_make_turn():
+    state = new_game(GameState)
+    key = state.hash_key
+    turn = state.find_all_turns()[0]
+    state.make_turn(turn)
+    assert(state.current_player == "red")
+    assert(state.get_square_by_location(turn.end) is not None)
+    state.unmake_turn(turn)
+    assert(state.current_player == "black")
+    assert(state.hash_key == key)
+    assert(state.get_square_by_location(turn.end) is None)
+
+
 def test_move():
     BOARD_FOR_MOVE = [
         [None, Piece("black", False, (0, 1)), None,
@@ -156,6 +218,46 @@ def test_move():
     assert(state.piece_locations_by_player["black"] == {(2, 3), (1, 2)})
 
 
+def test_unmake():
+    BOARD_FOR_UNMAKE = [
+        [None, Piece("black", False, (0, 1)), None, None],
+        [None, None, Piece("red", False, (1, 2)), None],
+        [None, None, None, None],
+        [None, None, None, None]
+    ]
+    state = GameState("black", 0)
+    state.squares = BOARD_FOR_UNMAKE
+    state.load_current_piece_locations()
+    mover = state.squares[0][1]
+    captured = state.squares[1][2]
+    key = state.hash_key
+    state.possible_moves = state.find_possible_moves((0, 1))
+    possible_moves = state.possible_moves
+
+    state.move(Move((0, 1), (2, 3), True, (1, 2)))
+    state.next_round()
+    state.move(Move((2, 3), (3, 2), False, None))
+    assert(mover.is_king)
+    assert(len(state.undo_stack) == 2)
+
+    state.unmake()
+    assert(state.squares[2][3] is mover)
+    assert(not mover.is_king)
+    assert(state.current_player == "red")
+    state.unmake()
+    assert(state.squares[0][1] is mover)
+    assert(state.squares[1][2] is captured)
+    assert(state.squares[2][3] is None)
+    assert(mover.location == (0, 1))
+    assert(state.piece_locations_by_player["black"] == {(0, 1)})
+    assert(state.piece_locations_by_player["red"] == {(1, 2)})
+    assert(state.current_player == "black")
+    assert(state.state == 0)
+    assert(state.possible_moves is possible_moves)
+    assert(state.hash_key == key)
+    assert(state.undo_stack == [])
+
+
 def test_who_wins():
     NO_ENEMY_LEFT_WIN = [
         [Piece("black", True, (0, 0)), None, None],
@@ -178,6 +280,29 @@ def test_who_wins():
     assert(win2.who_wins() == "black")
 
 
+def test_incremental_index():
+    rng = random.Random(5)
+    for game in range(10):
+        state = new_game(GameState)
+        for turn in range(120):
+            if state.who_wins() is not None:
+                break
+            state.make_turn(rng.choice(state.find_all_turns()))
+            rebuilt = GameState(state.current_player, state.state)
+            rebuilt.squares = state.squares
+            rebuilt.load_current_piece_locations()
+            assert(state.who_wins() == rebuilt.who_wins())
+            assert(state.king_counts == rebuilt.king_counts)
+            assert(state.movable_locations_by_player ==
+                   rebuilt.movable_locations_by_player)
+        while len(state.undo_stack) > 0:
+            state.unmake()
+        assert(state.king_counts == {"black": 0, "red": 0})
+        assert(state.count_movable("black") == 4)
+        assert(state.count_movable("red") == 4)
+        assert(state.count_pieces("red") == 12)
+
+
 def test_get_enemy_color():
     game = GameState("black", 1)
     assert(game.get_enemy_color("black") == "red")
@@ -214,3 +339,15 @@ def assert_eq_move(move1, move2):
     if move1.is_capture and move2.is_capture:
         assert(move1.captured_location == move2.captured_location)
 
+
+def test_copy():
+    state = new_game(GameState)
+    state.make_turn(state.find_all_turns()[0])
+    other = state.copy()
+    assert(other.hash_key == state.hash_key)
+    assert(other.current_player == state.current_player)
+    assert(other.undo_stack == [])
+    other.make_turn(other.find_all_turns()[0])
+    assert(other.hash_key != state.hash_key)
+    assert(state.count_pieces("black") == 12)
+    assert(len(state.undo_stack) == 1)
@@ -0,0 +1,69 @@
+import pytest
+from tablebase import Tablebase, build, signatures, WIN, DRAW, LOSS
+from engine import Engine
+from state import GameState
+from layout import make_position
+
+
+@pytest.fixture(scope="module")
+def tablebase(tmp_path_factory):
+    path = tmp_path_factory.mktemp("tablebase") / "two.cktb"
+    assert(build(2, str(path)) == 4 * 32 * 32 * 2)
+    tablebase = Tablebase(str(path))
+    yield tablebase
+    tablebase.close()
+
+
+def test_signatures_order():
+    order = signatures(3)
+    assert(len(order) == 4 + 12)
+    # A promotion or a capture always leads to an earlier table
+    assert(order.index((0, 1, 1, 0)) < order.index((1, 0, 1, 0)))
+    assert(order.index((1, 0, 1, 0)) < order.index((0, 1, 1, 1)))
+
+
+def test_probe(tablebase):
+    assert(tablebase.max_pieces == 2)
+    # Red cannot move and loses at once
+    state = make_position(GameState, "red", [("black", True, (0, 1)),
+                                             ("red", False, (1, 0))])
+    assert(state.find_all_turns() == [])
+    assert(tablebase.probe(state) == (LOSS, 0))
+    # Black takes the last red piece
+    state = make_position(GameState, "black", [("black", True, (5, 2)),
+                                               ("red", False, (6, 3))])
+    assert(tablebase.probe(state) == (WIN, 1))
+    # Two kings in the open cannot force anything
+    state = make_position(GameState, "black", [("black", True, (3, 2)),
+                                               ("red", True, (4, 7))])
+    assert(tablebase.probe(state) == (DRAW, 0))
+    # Too many pieces
+    state = make_position(GameState, "black", [("black", True, (3, 2)),
+                                               ("black", True, (1, 2)),
+                                               ("red", True, (4, 7))])
+    assert(tablebase.probe(state) is None)
+
+
+def test_probe_agrees_with_turns(tablebase):
+    state = make_position(GameState, "red", [("black", False, (2, 1)),
+                                             ("red", True, (6, 5))])
+    result, distance = tablebase.probe(state)
+    outcomes = []
+    for turn in state.find_all_turns():
+        state.make_turn(turn)
+        outcomes.append(tablebase.probe(state))
+        state.unmake_turn(turn)
+    if result == WIN:
+        assert(min(child[1] for child in outcomes
+                   if child[0] == LOSS) + 1 == distance)
+    else:
+        assert(result == LOSS or (DRAW, 0) in outcomes)
+
+
+def test_engine_uses_tablebase(tablebase):
+    state = make_position(GameState, "black", [("black", True, (5, 2)),
+                                               ("red", False, (6, 3))])
+    engine = Engine(2, tablebase=tablebase)
+    turn = engine.search(state)
+    assert(turn.path == [(5, 2), (7, 4)])
+    assert(engine.score == Engine.WIN_SCORE - 1)
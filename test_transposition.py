@@ -0,0 +1,44 @@
+from transposition import TranspositionTable
+
+
+def test_memory_cap():
+    table = TranspositionTable(1)
+    assert(table.size_in_bytes() <= 1024 * 1024)
+    assert(table.size_in_bytes() > 1024 * 1024 -
+           2 * TranspositionTable.SLOT_BYTES)
+    small = TranspositionTable(0.25)
+    assert(small.buckets < table.buckets)
+
+
+def test_store_and_probe():
+    table = TranspositionTable(1)
+    key = 0xDEADBEEFCAFEF00D
+    assert(table.probe(key) is None)
+    table.store(key, 4, -25, TranspositionTable.LOWER, 1234)
+    assert(table.probe(key) == (4, -25, TranspositionTable.LOWER, 1234))
+    # A result without a best move keeps the known one
+    table.store(key, 5, 30, TranspositionTable.EXACT, -1)
+    assert(table.probe(key) == (5, 30, TranspositionTable.EXACT, 1234))
+    table.clear()
+    assert(table.probe(key) is None)
+
+
+def test_bucket_replacement():
+    table = TranspositionTable(0.001)
+    buckets = table.buckets
+    deep = 7
+    shallow = deep + buckets
+    other = deep + 2 * buckets
+    table.store(deep, 6, 1, TranspositionTable.EXACT, 1)
+    # Shallower results go to the always-replace slot
+    table.store(shallow, 2, 2, TranspositionTable.EXACT, 2)
+    assert(table.probe(deep)[1] == 1)
+    assert(table.probe(shallow)[1] == 2)
+    table.store(other, 1, 3, TranspositionTable.EXACT, 3)
+    assert(table.probe(deep)[1] == 1)
+    assert(table.probe(shallow) is None)
+    assert(table.probe(other)[1] == 3)
+    # A deeper result takes over the depth-preferred slot
+    table.store(shallow, 8, 4, TranspositionTable.EXACT, 4)
+    assert(table.probe(deep) is None)
+    assert(table.probe(shallow)[1] == 4)
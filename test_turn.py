@@ -0,0 +1,36 @@
+from turn import Turn
+from move import Move
+
+
+def test_constructor():
+    step = Turn([Move((2, 1), (3, 0), False, None)], False)
+    chain = Turn([Move((0, 1), (2, 3), True, (1, 2)),
+                  Move((2, 3), (4, 5), True, (3, 4))], True)
+    assert(step.start == (2, 1))
+    assert(step.end == (3, 0))
+    assert(step.path == [(2, 1), (3, 0)])
+    assert(step.captured == [])
+    assert(not step.is_capture)
+    assert(not step.promotes)
+    assert(chain.start == (0, 1))
+    assert(chain.end == (4, 5))
+    assert(chain.path == [(0, 1), (2, 3), (4, 5)])
+    assert(chain.captured == [(1, 2), (3, 4)])
+    assert(chain.is_capture)
+    assert(chain.promotes)
+
+
+def test_code():
+    step = Turn([Move((2, 1), (3, 0), False, None)], False)
+    assert(step.code(8) == (2 * 8 + 1) * 64 + 3 * 8)
+    # Two chains between the same squares, around either side
+    left = Turn([Move((2, 3), (4, 1), True, (3, 2)),
+                 Move((4, 1), (6, 3), True, (5, 2))], False)
+    right = Turn([Move((2, 3), (4, 5), True, (3, 4)),
+                  Move((4, 5), (6, 3), True, (5, 4))], False)
+    assert(left.start == right.start and left.end == right.end)
+    assert(left.code(8) != right.code(8))
+    # A path too long for 64 bits still gets a code that fits
+    loop = Turn([Move((0, 1), (2, 3), True, (1, 2)),
+                 Move((2, 3), (0, 1), True, (1, 2))] * 6, True)
+    assert(0 <= loop.code(12) < Turn.CODE_LIMIT)
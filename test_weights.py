@@ -0,0 +1,42 @@
+from weights import Weights, weights_for_size
+from piece import Piece
+
+
+def test_tables_are_shared():
+    assert(weights_for_size(8) is weights_for_size(8))
+    assert(weights_for_size(10).size == 10)
+
+
+def test_values():
+    weights = Weights(8)
+    man = Piece(Piece.BLACK, False, (0, 1))
+    king = Piece(Piece.BLACK, True, (0, 1))
+    # A guarding man on the back row, against one that left it
+    assert(weights.value((0, 1), man) ==
+           Weights.MAN_VALUE + Weights.BACK_RANK)
+    assert(weights.value((1, 2), man) ==
+           Weights.MAN_VALUE + Weights.ADVANCE + Weights.MAN_CENTER)
+    assert(weights.value((4, 3), man) > weights.value((4, 7), man))
+    assert(weights.value((0, 1), king) == Weights.KING_VALUE)
+    assert(weights.value((3, 4), king) > weights.value((0, 1), king))
+
+
+def test_colors_mirror():
+    weights = Weights(8)
+    for row in range(8):
+        for col in range(8):
+            for is_king in (False, True):
+                black = Piece(Piece.BLACK, is_king, (row, col))
+                red = Piece(Piece.RED, is_king, (7 - row, 7 - col))
+                assert(weights.value((row, col), black) ==
+                       weights.value((7 - row, 7 - col), red))
+
+
+def test_score_squares():
+    squares = [[None] * 4 for row in range(4)]
+    squares[0][1] = Piece(Piece.BLACK, False, (0, 1))
+    squares[3][2] = Piece(Piece.RED, False, (3, 2))
+    assert(Weights(4).score_squares(squares) == 0)
+    squares[3][2] = None
+    assert(Weights(4).score_squares(squares) ==
+           Weights.MAN_VALUE + Weights.BACK_RANK)
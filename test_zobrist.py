@@ -0,0 +1,76 @@
+import random
+from zobrist import Zobrist, keys_for_size
+from state import GameState
+from piece import Piece
+from move import Move
+from layout import new_game
+
+
+def test_keys_are_shared_and_stable():
+    keys = keys_for_size(8)
+    assert(keys_for_size(8) is keys)
+    again = Zobrist(8)
+    assert(again.side_key == keys.side_key)
+    assert(again.piece_keys == keys.piece_keys)
+    assert(keys_for_size(10).side_key != keys.side_key)
+
+
+def test_hash_squares():
+    keys = keys_for_size(2)
+    piece = Piece("black", False, (0, 1))
+    squares = [[None, piece], [None, None]]
+    assert(keys.hash_squares(squares, "black") ==
+           keys.piece_key((0, 1), piece))
+    assert(keys.hash_squares(squares, "red") ==
+           keys.piece_key((0, 1), piece) ^ keys.side_key)
+
+
+def test_incremental_hash_matches_scratch():
+    rng = random.Random(3)
+    state = new_game(GameState)
+    keys = keys_for_size(8)
+    for turn in range(200):
+        player = state.current_player
+        moves = []
+        for location in sorted(state.piece_locations_by_player[player]):
+            moves.extend(state.find_possible_moves(location))
+        if len(moves) == 0:
+            break
+        state.move(rng.choice(moves))
+        assert(state.hash_key ==
+               keys.hash_squares(state.squares, state.current_player))
+        state.next_round()
+        assert(state.hash_key ==
+               keys.hash_squares(state.squares, state.current_player))
+
+
+def test_promotion_changes_hash():
+    state = GameState("black", 1)
+    state.squares = [[None] * 4 for i in range(4)]
+    state.squares[2][1] = Piece("black", False, (2, 1))
+    state.load_current_piece_locations()
+    before = state.hash_key
+    state.move(Move((2, 1), (3, 2), False, None))
+    keys = keys_for_size(4)
+    king = Piece("black", True, (3, 2))
+    assert(state.squares[3][2].is_king)
+    assert(state.hash_key == before ^
+           keys.piece_key((2, 1), Piece("black", False, (2, 1))) ^
+           keys.piece_key((3, 2), king))
+
+
+def test_transposed_move_orders_hash_alike():
+    first = new_game(GameState)
+    second = new_game(GameState)
+    for state, order in ((first, [0, 1]), (second, [1, 0])):
+        black = [Move((2, 1), (3, 0), False, None),
+                 Move((2, 7), (3, 6), False, None)]
+        red = [Move((5, 0), (4, 1), False, None),
+               Move((5, 6), (4, 7), False, None)]
+        for index in order:
+            state.move(black[index])
+            state.next_round()
+            state.move(red[index])
+            state.next_round()
+    assert(first.hash_key == second.hash_key)
+    assert(first.hash_key != new_game(GameState).hash_key)
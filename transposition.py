@@ -0,0 +1,112 @@
+'''
+Class storing search results of positions already seen.
+'''
+
+from array import array
+
+
+class TranspositionTable:
+    '''
+        Class -- TranspositionTable
+            Fixed-size table of search results keyed by Zobrist hash.
+            Entries live in flat arrays sized from a memory cap, so the
+            table never grows while searching. Each bucket has two slots:
+            the first keeps the deepest result, the second is always
+            replaced.
+        Attributes:
+            buckets -- Number of buckets
+            keys -- Hash key of each slot
+            depths -- Search depth of each slot, -1 when empty
+            scores -- Score of each slot
+            flags -- Whether the score is EXACT, a LOWER or an UPPER bound
+            moves -- Code of the best move of each slot, -1 when unknown
+        Methods:
+            probe -- Look up a position
+            store -- Record the result of a search
+            clear -- Empty the table
+            size_in_bytes -- Memory used by the entries
+    '''
+    EXACT = 0
+    LOWER = 1
+    UPPER = 2
+    # Bytes per slot: key, score, move, depth and flag
+    SLOT_BYTES = 8 + 4 + 8 + 1 + 1
+
+    def __init__(self, megabytes=16):
+        '''
+            Constructor -- Creates an empty TranspositionTable
+            Parameters:
+                self -- The current TranspositionTable object
+                megabytes -- Memory cap of the entries, in MB
+        '''
+        slots = int(megabytes * 1024 * 1024) // TranspositionTable.SLOT_BYTES
+        self.buckets = max(1, slots // 2)
+        self.clear()
+
+    def clear(self):
+        '''
+            Method -- clear
+                Empty the table
+            Parameters:
+                self -- The current TranspositionTable object
+        '''
+        slots = 2 * self.buckets
+        self.keys = array("Q", bytes(8 * slots))
+        self.scores = array("i", bytes(4 * slots))
+        self.moves = array("q", [-1]) * slots
+        self.depths = array("b", [-1]) * slots
+        self.flags = array("b", bytes(slots))
+
+    def probe(self, key):
+        '''
+            Method -- probe
+                Look up a position
+            Parameters:
+                self -- The current TranspositionTable object
+                key -- Zobrist hash of the position
+            Return:
+                A (depth, score, flag, move) tuple, or None if the position
+                is not in the table
+        '''
+        slot = 2 * (key % self.buckets)
+        for index in (slot, slot + 1):
+            if self.keys[index] == key and self.depths[index] >= 0:
+                return (self.depths[index], self.scores[index],
+                        self.flags[index], self.moves[index])
+        return None
+
+    def store(self, key, depth, score, flag, move):
+        '''
+            Method -- store
+                Record the result of a search. It goes into the first slot
+                of its bucket if it is at least as deep as what is there,
+                otherwise into the second slot.
+            Parameters:
+                self -- The current TranspositionTable object
+                key -- Zobrist hash of the position
+                depth -- Depth the position was searched to
+                score -- Score found by the search
+                flag -- EXACT, LOWER or UPPER
+                move -- Code of the best move, or -1
+        '''
+        slot = 2 * (key % self.buckets)
+        if self.keys[slot] != key and depth < self.depths[slot]:
+            slot += 1
+        elif self.keys[slot] == key and move < 0:
+            # Keep the best move of a shallower search of this position
+            move = self.moves[slot]
+        self.keys[slot] = key
+        self.depths[slot] = min(depth, 127)
+        self.scores[slot] = score
+        self.flags[slot] = flag
+        self.moves[slot] = move
+
+    def size_in_bytes(self):
+        '''
+            Method -- size_in_bytes
+                Memory used by the entries
+            Parameters:
+                self -- The current TranspositionTable object
+        '''
+        return sum(table.itemsize * len(table) for table in (
+            self.keys, self.scores, self.moves, self.depths, self.flags))
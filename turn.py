@@ -0,0 +1,55 @@
+'''
+Class recording a complete turn of one player
+'''
+
+
+class Turn:
+    '''
+        Class -- Turn
+            All the moves one piece makes before the other player moves:
+            a single step, a single capture or a chain of captures.
+        Attributes:
+            moves -- The moves of the turn, in order
+            start -- Start location of the turn
+            end -- End location of the turn
+            path -- Every location the piece stands on, start to end
+            captured -- Locations of the captured pieces, in order
+            is_capture -- Whether the turn captures
+            promotes -- Whether the piece becomes a king during the turn
+        Methods:
+            code -- Compact code of the turn, from its whole path
+    '''
+    # Codes fit a signed 64-bit field, as the table and the book store them
+    CODE_LIMIT = 1 << 63
+
+    def __init__(self, moves, promotes):
+        self.moves = moves
+        self.start = moves[0].start
+        self.end = moves[-1].end
+        self.path = [self.start] + [move.end for move in moves]
+        self.captured = [move.captured_location for move in moves
+                         if move.is_capture]
+        self.is_capture = moves[0].is_capture
+        self.promotes = promotes
+
+    def code(self, size):
+        '''
+            Method -- code
+                Compact code of the turn: the squares of its path as the
+                digits of a number in base size * size. A step or single
+                capture codes as start * size * size + end, and capture
+                chains sharing start and end squares differ. The rare path
+                too long for 64 bits is folded into them.
+            Parameters:
+                self -- The current Turn object
+                size -- Number of squares on each row
+            Return:
+                A non-negative integer below Turn.CODE_LIMIT
+        '''
+        squares = size * size
+        code = 0
+        for location in self.path:
+            code = code * squares + location[0] * size + location[1]
+        if code >= Turn.CODE_LIMIT:
+            code %= Turn.CODE_LIMIT - 1
+        return code
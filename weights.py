@@ -0,0 +1,106 @@
+'''
+Class holding the piece-square tables of the evaluation of a board size.
+'''
+
+from piece import Piece
+
+
+class Weights:
+    '''
+        Class -- Weights
+            Precomputed value of every (color, king, square) combination:
+            material, advancement towards the crowning row, guarding the
+            own back row and standing near the center. A position is worth
+            the sum of the values of its pieces, so a move only needs to
+            update the squares it changes, as with the Zobrist hash.
+        Attributes:
+            size -- Number of squares on each row
+            values -- Values indexed by [color][is_king][row][col], for
+            the owner of the piece
+        Methods:
+            value -- Value of a piece standing on a location
+            score_squares -- Score of a whole board, computed from scratch
+    '''
+    MAN_VALUE = 100  # Also the material of Engine.evaluate_material
+    KING_VALUE = 160
+    ADVANCE = 3  # Per row a man stands away from its own back row
+    BACK_RANK = 8  # For a man still guarding its own back row
+    MAN_CENTER = 2  # Per row or column a man stands away from the edge
+    KING_CENTER = 4  # Per row or column a king stands away from the edge
+    tables = {}
+
+    def __init__(self, size):
+        '''
+            Constructor -- Creates the tables of a board size
+            Parameters:
+                self -- The current Weights object
+                size -- Number of squares on each row
+        '''
+        self.size = size
+        self.values = {}
+        for color in (Piece.BLACK, Piece.RED):
+            back_row = 0 if color == Piece.BLACK else size - 1
+            men = []
+            kings = []
+            for row in range(size):
+                advance = abs(row - back_row)
+                men_row = []
+                kings_row = []
+                for col in range(size):
+                    center = min(row, size - 1 - row, col, size - 1 - col)
+                    man = Weights.MAN_VALUE + advance * Weights.ADVANCE + \
+                        center * Weights.MAN_CENTER
+                    if row == back_row:
+                        man += Weights.BACK_RANK
+                    men_row.append(man)
+                    kings_row.append(
+                        Weights.KING_VALUE + center * Weights.KING_CENTER)
+                men.append(men_row)
+                kings.append(kings_row)
+            self.values[color] = {False: men, True: kings}
+
+    def value(self, location, piece):
+        '''
+            Method -- value
+                Value of a piece standing on a location, for its owner
+            Parameters:
+                self -- The current Weights object
+                location -- A pair of indices
+                piece -- An object of Piece
+        '''
+        return self.values[piece.color][piece.is_king][
+            location[0]][location[1]]
+
+    def score_squares(self, squares):
+        '''
+            Method -- score_squares
+                Score of a whole board, computed from scratch
+            Parameters:
+                self -- The current Weights object
+                squares -- Nested list of None or Piece objects
+            Return:
+                Value of the black pieces minus value of the red pieces
+        '''
+        score = 0
+        for row in squares:
+            for square in row:
+                if square is not None:
+                    if square.color == Piece.BLACK:
+                        score += self.value(square.location, square)
+                    else:
+                        score -= self.value(square.location, square)
+        return score
+
+
+def weights_for_size(size):
+    '''
+        Function -- weights_for_size
+            Tables of a board size, created once and shared
+        Parameters:
+            size -- Number of squares on each row
+    '''
+    weights = Weights.tables.get(size)
+    if weights is None:
+        weights = Weights(size)
+        Weights.tables[size] = weights
+    return weights
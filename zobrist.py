@@ -0,0 +1,89 @@
+'''
+Class holding the random keys used to hash game positions.
+'''
+
+import random
+
+from piece import Piece
+
+
+class Zobrist:
+    '''
+        Class -- Zobrist
+            Random 64-bit keys for every (square, color, king) combination
+            and for the side to move. The hash of a position is the XOR of
+            the keys of its pieces, XOR the side key when red is to move,
+            so a move only needs to XOR the squares it changes.
+            Keys come from a fixed seed and are the same in every process.
+        Attributes:
+            size -- Number of squares on each row
+            piece_keys -- Keys indexed by [color][is_king][row][col]
+            side_key -- Key XORed in when red is to move
+        Methods:
+            piece_key -- Key of a piece standing on a location
+            hash_squares -- Hash of a whole board, computed from scratch
+    '''
+    SEED = 0x5EED
+    tables = {}
+
+    def __init__(self, size):
+        '''
+            Constructor -- Creates the keys for a board size
+            Parameters:
+                self -- The current Zobrist object
+                size -- Number of squares on each row
+        '''
+        rng = random.Random(Zobrist.SEED * 1000 + size)
+        self.size = size
+        self.piece_keys = {}
+        for color in (Piece.BLACK, Piece.RED):
+            self.piece_keys[color] = {}
+            for is_king in (False, True):
+                self.piece_keys[color][is_king] = [
+                    [rng.getrandbits(64) for col in range(size)]
+                    for row in range(size)]
+        self.side_key = rng.getrandbits(64)
+
+    def piece_key(self, location, piece):
+        '''
+            Method -- piece_key
+                Key of a piece standing on a location
+            Parameters:
+                self -- The current Zobrist object
+                location -- A pair of indices
+                piece -- An object of Piece
+        '''
+        return self.piece_keys[piece.color][piece.is_king][
+            location[0]][location[1]]
+
+    def hash_squares(self, squares, current_player):
+        '''
+            Method -- hash_squares
+                Hash of a whole board, computed from scratch
+            Parameters:
+                self -- The current Zobrist object
+                squares -- Nested list of None or Piece objects
+                current_player -- The player to move
+        '''
+        key = 0
+        for row in squares:
+            for square in row:
+                if square is not None:
+                    key ^= self.piece_key(square.location, square)
+        if current_player == Piece.RED:
+            key ^= self.side_key
+        return key
+
+
+def keys_for_size(size):
+    '''
+        Function -- keys_for_size
+            Zobrist keys of a board size, created once and shared
+        Parameters:
+            size -- Number of squares on each row
+    '''
+    keys = Zobrist.tables.get(size)
+    if keys is None:
+        keys = Zobrist(size)
+        Zobrist.tables[size] = keys
+    return keys